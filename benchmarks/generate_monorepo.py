@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Synthetic Monorepo Generator
+Builds benchmark trees of NPM repositories: workspace manifests, one lockfile per repository
+(npm v1/v2/v3, yarn or pnpm, cycling through the requested formats) and source files
+Monitored names are drawn from the compromise database so scans produce realistic findings
+"""
+
+import argparse
+import json
+import os
+import random
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATABASE = os.path.join(REPO_ROOT, 'compromised_packages_2025.json')
+
+# Lockfile formats and the file each one is written to
+LOCKFILE_FORMATS = {
+    'npm-v1': 'package-lock.json',
+    'npm-v2': 'package-lock.json',
+    'npm-v3': 'package-lock.json',
+    'yarn': 'yarn.lock',
+    'pnpm': 'pnpm-lock.yaml'
+}
+SOURCE_EXTENSIONS = ('.js', '.ts', '.mjs', '.jsx')
+# Share of lockfile entries installed below another package (node_modules/a/node_modules/b)
+NESTED_RATIO = 0.15
+# Filler code repeated to reach the requested source file size
+SOURCE_FILLER = (
+    "export function handler{n}(request, response) {{\n"
+    "  const payload = JSON.stringify({{ id: {n}, status: 'ok', items: request.items || [] }});\n"
+    "  return response.status(200).send(payload);\n"
+    "}}\n\n"
+)
+
+
+@dataclass
+class MonorepoSpec:
+    """
+    Shape of a generated benchmark tree.
+
+    Attributes:
+        repos: Number of repositories (top-level directories)
+        manifests_per_repo: package.json files per repository (root + workspaces)
+        dependencies_per_manifest: Dependencies declared by each package.json
+        lockfile_packages: Entries per lockfile
+        lockfile_formats: Formats assigned to repositories in turn (see LOCKFILE_FORMATS)
+        source_files_per_repo: Source files per repository, spread over its workspaces
+        source_file_kb: Size of each source file
+        compromised_ratio: Share of dependencies drawn from the compromise database
+        indicator_ratio: Share of source files containing malicious indicators
+        seed: Random seed; the same spec always produces the same tree
+    """
+    repos: int = 8
+    manifests_per_repo: int = 4
+    dependencies_per_manifest: int = 25
+    lockfile_packages: int = 1500
+    lockfile_formats: List[str] = field(default_factory=lambda: list(LOCKFILE_FORMATS))
+    source_files_per_repo: int = 25
+    source_file_kb: int = 8
+    compromised_ratio: float = 0.02
+    indicator_ratio: float = 0.05
+    seed: int = 2025
+
+
+class _PackagePicker:
+    """Draws (name, version) pairs: mostly filler packages, some from the compromise database"""
+
+    def __init__(self, rng: random.Random, database: Dict, compromised_ratio: float):
+        self.rng = rng
+        self.compromised_ratio = compromised_ratio
+        self.monitored = []
+        for name, data in sorted(database.get('compromised_packages', {}).items()):
+            versions = data.get('compromised_versions', [])
+            if versions:
+                self.monitored.append((name, versions, data.get('safe_version')))
+        for name in sorted(database.get('potentially_compromised_packages', [])):
+            self.monitored.append((name, [], None))
+
+    def pick(self) -> Tuple[str, str]:
+        """Return a package name and the version installed"""
+        rng = self.rng
+        if self.monitored and rng.random() < self.compromised_ratio:
+            name, versions, safe_version = rng.choice(self.monitored)
+            # Half compromised versions, half safe ones
+            if versions and rng.random() < 0.5:
+                return name, rng.choice(versions)
+            return name, safe_version or f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 30)}"
+
+        number = rng.randint(0, 20000)
+        name = f"@bench/util-{number}" if number % 7 == 0 else f"bench-lib-{number}"
+        return name, f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 30)}"
+
+
+def _lock_entries(picker: _PackagePicker, count: int) -> List[Tuple[str, str, str]]:
+    """
+    Draw the installed packages of a lockfile.
+
+    Returns:
+        [(parent_name, name, version), ...]; parent_name is '' for top-level packages
+    """
+    entries = []
+    top_level = {}
+    seen = set()
+    attempts = 0
+    while len(entries) < count and attempts < count * 10:
+        attempts += 1
+        name, version = picker.pick()
+        if top_level and picker.rng.random() < NESTED_RATIO:
+            parent = picker.rng.choice(list(top_level))
+        elif name not in top_level:
+            parent = ''
+        else:
+            continue
+        if (parent, name) in seen:
+            continue
+        seen.add((parent, name))
+        if not parent:
+            top_level[name] = version
+        entries.append((parent, name, version))
+    return entries
+
+
+def _integrity(rng: random.Random) -> str:
+    """Fake (but realistically sized) sha512 integrity string"""
+    return f"sha512-{rng.getrandbits(512):0128x}"
+
+
+def _resolved(name: str, version: str) -> str:
+    """Registry tarball URL of a package"""
+    return f"https://registry.npmjs.org/{name}/-/{name.split('/')[-1]}-{version}.tgz"
+
+
+def _npm_lock(repo_name: str, entries: List[Tuple[str, str, str]], lockfile_version: int,
+              rng: random.Random) -> Dict:
+    """Build a package-lock.json of the given lockfileVersion"""
+    lock = {'name': repo_name, 'version': '1.0.0', 'lockfileVersion': lockfile_version, 'requires': True}
+
+    if lockfile_version >= 2:
+        packages = {'': {
+            'name': repo_name,
+            'version': '1.0.0',
+            'dependencies': {name: f"^{version}" for parent, name, version in entries if not parent}
+        }}
+        for parent, name, version in entries:
+            path = f"node_modules/{parent}/node_modules/{name}" if parent else f"node_modules/{name}"
+            packages[path] = {'version': version, 'resolved': _resolved(name, version), 'integrity': _integrity(rng)}
+        lock['packages'] = packages
+
+    if lockfile_version <= 2:
+        dependencies = {}
+        for parent, name, version in entries:
+            info = {'version': version, 'resolved': _resolved(name, version), 'integrity': _integrity(rng)}
+            if parent:
+                dependencies[parent].setdefault('dependencies', {})[name] = info
+            else:
+                dependencies[name] = info
+        lock['dependencies'] = dependencies
+
+    return lock
+
+
+def _yarn_lock(entries: List[Tuple[str, str, str]], rng: random.Random) -> str:
+    """Build a yarn.lock (v1 classic) with one entry per resolved name@version"""
+    lines = [
+        "# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.",
+        "# yarn lockfile v1",
+        "",
+        ""
+    ]
+    resolved = sorted({(name, version) for _, name, version in entries})
+    for name, version in resolved:
+        lines.append(f'"{name}@^{version}":')
+        lines.append(f'  version "{version}"')
+        lines.append(f'  resolved "{_resolved(name, version)}"')
+        lines.append(f'  integrity {_integrity(rng)}')
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _pnpm_lock(entries: List[Tuple[str, str, str]], rng: random.Random) -> str:
+    """Build a pnpm-lock.yaml (lockfileVersion 5.4 layout)"""
+    top_level = [(name, version) for parent, name, version in entries if not parent]
+    lines = ["lockfileVersion: 5.4", "", "specifiers:"]
+    lines.extend(f"  '{name}': ^{version}" for name, version in top_level)
+    lines.extend(["", "dependencies:"])
+    lines.extend(f"  '{name}': {version}" for name, version in top_level)
+    lines.extend(["", "packages:", ""])
+    for name, version in sorted({(name, version) for _, name, version in entries}):
+        lines.append(f"  /{name}/{version}:")
+        lines.append(f"    resolution: {{integrity: {_integrity(rng)}}}")
+        lines.append("    dev: false")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _source_file(rng: random.Random, size_bytes: int, indicator: str) -> str:
+    """Build a source file of about size_bytes, containing indicator when given"""
+    parts = []
+    total = 0
+    n = 0
+    while total < size_bytes:
+        chunk = SOURCE_FILLER.format(n=n)
+        parts.append(chunk)
+        total += len(chunk)
+        n += 1
+    if indicator:
+        parts.insert(rng.randint(0, len(parts)), indicator)
+    return "".join(parts)
+
+
+def _write(path: str, content: str) -> int:
+    """Write a text file, creating its directory; returns its size"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return len(content.encode('utf-8'))
+
+
+def generate_monorepo(root: str, spec: MonorepoSpec, database_file: str = DEFAULT_DATABASE) -> Dict:
+    """
+    Generate a synthetic tree of NPM repositories.
+
+    Args:
+        root: Directory to create the tree in (created if missing)
+        spec: Shape of the tree
+        database_file: Compromise database the monitored package names come from
+
+    Returns:
+        Statistics: file counts and bytes per kind, lockfiles per format
+
+    Examples:
+        >>> stats = generate_monorepo("/tmp/bench-tree", MonorepoSpec(repos=2, lockfile_packages=500))
+        >>> stats["files"]["lockfile"]
+        2
+    """
+    unknown = [fmt for fmt in spec.lockfile_formats if fmt not in LOCKFILE_FORMATS]
+    if unknown or not spec.lockfile_formats:
+        raise ValueError(f"Unknown lockfile format(s): {', '.join(unknown) or 'none given'}")
+
+    with open(database_file, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    rng = random.Random(spec.seed)
+    picker = _PackagePicker(rng, database, spec.compromised_ratio)
+    indicators = (
+        database.get('malicious_indicators', {}).get('urls', []) +
+        database.get('malicious_indicators', {}).get('domains', []) +
+        database.get('crypto_indicators', [])
+    )
+
+    stats = {
+        'files': {'manifest': 0, 'lockfile': 0, 'source': 0},
+        'bytes': {'manifest': 0, 'lockfile': 0, 'source': 0},
+        'lockfile_formats': {}
+    }
+
+    def record(kind: str, size: int):
+        stats['files'][kind] += 1
+        stats['bytes'][kind] += size
+
+    for repo_index in range(spec.repos):
+        repo_name = f"repo-{repo_index:03d}"
+        repo_dir = os.path.join(root, repo_name)
+        lockfile_format = spec.lockfile_formats[repo_index % len(spec.lockfile_formats)]
+
+        entries = _lock_entries(picker, spec.lockfile_packages)
+        if lockfile_format.startswith('npm-'):
+            content = json.dumps(_npm_lock(repo_name, entries, int(lockfile_format[-1]), rng), indent=2) + "\n"
+        elif lockfile_format == 'yarn':
+            content = _yarn_lock(entries, rng)
+        else:
+            content = _pnpm_lock(entries, rng)
+        record('lockfile', _write(os.path.join(repo_dir, LOCKFILE_FORMATS[lockfile_format]), content))
+        stats['lockfile_formats'][lockfile_format] = stats['lockfile_formats'].get(lockfile_format, 0) + 1
+
+        # Root manifest declares the workspaces; every manifest depends on installed packages
+        installed = [(name, version) for parent, name, version in entries if not parent]
+        workspaces = [f"packages/pkg-{n:02d}" for n in range(max(0, spec.manifests_per_repo - 1))]
+        for manifest_index, manifest_dir in enumerate([''] + workspaces):
+            if manifest_index >= spec.manifests_per_repo:
+                break
+            chosen = rng.sample(installed, min(spec.dependencies_per_manifest, len(installed)))
+            split = len(chosen) * 3 // 4
+            manifest = {
+                'name': repo_name if not manifest_dir else f"@{repo_name}/{os.path.basename(manifest_dir)}",
+                'version': '1.0.0',
+                'private': True,
+                'dependencies': {name: f"^{version}" for name, version in chosen[:split]},
+                'devDependencies': {name: f"~{version}" for name, version in chosen[split:]}
+            }
+            if not manifest_dir:
+                manifest['workspaces'] = ['packages/*']
+            path = os.path.join(repo_dir, manifest_dir, 'package.json')
+            record('manifest', _write(path, json.dumps(manifest, indent=2) + "\n"))
+
+        source_dirs = [os.path.join(repo_dir, workspace, 'src') for workspace in workspaces] or [os.path.join(repo_dir, 'src')]
+        for source_index in range(spec.source_files_per_repo):
+            indicator = ''
+            if indicators and rng.random() < spec.indicator_ratio:
+                indicator = f"// sync endpoint: {rng.choice(indicators)}\n"
+            extension = SOURCE_EXTENSIONS[source_index % len(SOURCE_EXTENSIONS)]
+            path = os.path.join(source_dirs[source_index % len(source_dirs)], f"module-{source_index:04d}{extension}")
+            record('source', _write(path, _source_file(rng, spec.source_file_kb * 1024, indicator)))
+
+    return stats
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    """Add the MonorepoSpec options to a command line parser"""
+    defaults = MonorepoSpec()
+    parser.add_argument('--repos', type=int, default=defaults.repos,
+                        help=f'Number of repositories (default: {defaults.repos})')
+    parser.add_argument('--manifests-per-repo', type=int, default=defaults.manifests_per_repo,
+                        help=f'package.json files per repository (default: {defaults.manifests_per_repo})')
+    parser.add_argument('--dependencies-per-manifest', type=int, default=defaults.dependencies_per_manifest,
+                        help=f'Dependencies per package.json (default: {defaults.dependencies_per_manifest})')
+    parser.add_argument('--lockfile-packages', type=int, default=defaults.lockfile_packages,
+                        help=f'Entries per lockfile (default: {defaults.lockfile_packages})')
+    parser.add_argument('--lockfile-formats', default=','.join(defaults.lockfile_formats),
+                        help=f'Comma-separated lockfile formats assigned to repositories in turn '
+                             f'(default: {",".join(defaults.lockfile_formats)})')
+    parser.add_argument('--source-files-per-repo', type=int, default=defaults.source_files_per_repo,
+                        help=f'Source files per repository (default: {defaults.source_files_per_repo})')
+    parser.add_argument('--source-file-kb', type=int, default=defaults.source_file_kb,
+                        help=f'Size of each source file in KB (default: {defaults.source_file_kb})')
+    parser.add_argument('--compromised-ratio', type=float, default=defaults.compromised_ratio,
+                        help=f'Share of dependencies taken from the compromise database (default: {defaults.compromised_ratio})')
+    parser.add_argument('--indicator-ratio', type=float, default=defaults.indicator_ratio,
+                        help=f'Share of source files containing malicious indicators (default: {defaults.indicator_ratio})')
+    parser.add_argument('--seed', type=int, default=defaults.seed,
+                        help=f'Random seed (default: {defaults.seed})')
+
+
+def spec_from_args(args: argparse.Namespace) -> MonorepoSpec:
+    """Build a MonorepoSpec from options added by add_spec_arguments"""
+    return MonorepoSpec(
+        repos=args.repos,
+        manifests_per_repo=args.manifests_per_repo,
+        dependencies_per_manifest=args.dependencies_per_manifest,
+        lockfile_packages=args.lockfile_packages,
+        lockfile_formats=[fmt.strip() for fmt in args.lockfile_formats.split(',') if fmt.strip()],
+        source_files_per_repo=args.source_files_per_repo,
+        source_file_kb=args.source_file_kb,
+        compromised_ratio=args.compromised_ratio,
+        indicator_ratio=args.indicator_ratio,
+        seed=args.seed
+    )
+
+
+def format_stats(stats: Dict) -> str:
+    """One-line summary of generate_monorepo statistics"""
+    parts = [f"{stats['files'][kind]} {kind} file(s) ({stats['bytes'][kind] / (1024 * 1024):.1f} MB)"
+             for kind in ('manifest', 'lockfile', 'source')]
+    formats = ', '.join(f"{fmt}: {count}" for fmt, count in sorted(stats['lockfile_formats'].items()))
+    return f"{', '.join(parts)}; lockfiles by format: {formats}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic NPM monorepo tree for benchmarks')
+    parser.add_argument('output', help='Directory to create the tree in')
+    parser.add_argument('--database', default=DEFAULT_DATABASE,
+                        help='Compromise database the monitored package names come from')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    print(f"🏗️  Generating {spec.repos} repositories in {os.path.abspath(args.output)}")
+    stats = generate_monorepo(args.output, spec, args.database)
+    print(f"✅ {format_stats(stats)}")
+    print(json.dumps(asdict(spec), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Detector Benchmarks
+Times both detectors and the universal NPMScanner on a synthetic monorepo (see generate_monorepo.py)
+and writes a JSON results file; --compare reports the change against the results of another commit
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from generate_monorepo import REPO_ROOT, DEFAULT_DATABASE, add_spec_arguments, spec_from_args, generate_monorepo, \
+    format_stats
+
+sys.path.insert(0, REPO_ROOT)
+
+from npm_package_compromise_detector_2025 import NPMCompromiseDetector2025
+from enhanced_npm_compromise_detector_phoenix import EnhancedNPMCompromiseDetectorPhoenix
+from universal_vulnerability_scanner.main import generate_report as generate_scanner_report
+from universal_vulnerability_scanner.models.finding import Verdict
+from universal_vulnerability_scanner.models.vulnerability import VulnerabilityDatabase
+from universal_vulnerability_scanner.scanners.npm_scanner import NPMScanner
+
+BENCHMARKS = (
+    'detector_2025.scan_directory',
+    'detector_2025.generate_report',
+    'enhanced.process_package_file',
+    'enhanced.generate_report',
+    'npm_scanner.scan_path',
+    'npm_scanner.generate_report'
+)
+# Files the enhanced detector's directory mode picks up (as in its main())
+ENHANCED_PATTERNS = ('package.json', 'package-lock.json', 'yarn.lock')
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool = True):
+    """Silence the detectors' progress output while they are timed"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _git_commit() -> Optional[str]:
+    """Commit the benchmarked code is at, when run from a git checkout"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def build_vulnerability_database(database_file: str, output_file: str) -> Path:
+    """
+    Convert the compromise database into the VulnerabilityDatabase layout used by NPMScanner.
+
+    Args:
+        database_file: compromised_packages_2025.json style database
+        output_file: Where to write the converted database
+
+    Returns:
+        Path of the converted database
+    """
+    with open(database_file, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    packages = {}
+    for name, data in database.get('compromised_packages', {}).items():
+        packages[name] = {
+            'exact_versions': data.get('compromised_versions', []),
+            'safe_versions': [data['safe_version']] if data.get('safe_version') else [],
+            'description': 'Compromised package (benchmark database)'
+        }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'source': os.path.basename(database_file)}, 'vulnerabilities': {'npm': packages}}, f)
+    return Path(output_file)
+
+
+def measure(runs: int, run_once: Callable[[], Tuple[float, Dict]]) -> Dict:
+    """
+    Time a benchmark several times.
+
+    Args:
+        runs: Number of timed runs
+        run_once: Performs one run, returning (seconds, details of the run)
+
+    Returns:
+        Timings (each run, min, median, mean) plus the details of the last run
+    """
+    timings = []
+    details = {}
+    for _ in range(runs):
+        seconds, details = run_once()
+        timings.append(seconds)
+    return {
+        'runs': timings,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        **details
+    }
+
+
+def run_benchmarks(tree: str, workdir: str, options: argparse.Namespace) -> Dict[str, Dict]:
+    """
+    Run the selected benchmarks against a generated tree.
+
+    Detectors are created outside the timed section, so database loading is not
+    included; report generators are timed on the results of the last scan run.
+
+    Args:
+        tree: Root of the tree to scan
+        workdir: Scratch directory for reports and the converted database
+        options: Parsed command line options
+
+    Returns:
+        Mapping of benchmark name to its measure() result
+    """
+    selected = set(options.only.split(',')) if options.only else set(BENCHMARKS)
+    results = {}
+    quiet = not options.verbose
+    last = {}
+
+    def announce(name: str):
+        print(f"⏱️  {name} ({options.runs} run(s))")
+
+    def report(name: str):
+        print(f"   min {results[name]['min']:.3f}s, median {results[name]['median']:.3f}s")
+
+    def scan_directory_2025():
+        with _quiet(quiet):
+            detector = NPMCompromiseDetector2025(config_file=options.database)
+            # Worker options are skipped on commits from before the detectors had pools
+            if options.source_workers and hasattr(detector, 'set_source_workers'):
+                detector.set_source_workers(options.source_workers)
+            if options.lockfile_workers and hasattr(detector, 'set_lockfile_workers'):
+                detector.set_lockfile_workers(options.lockfile_workers)
+            started = time.perf_counter()
+            detector.scan_directory(tree)
+            elapsed = time.perf_counter() - started
+        last['detector_2025'] = detector
+        return elapsed, {
+            'files': len(detector.scanned_files),
+            'packages': len(detector.scanned_packages),
+            'findings': len(detector.findings)
+        }
+
+    def process_package_files():
+        package_files = []
+        for pattern in ENHANCED_PATTERNS:
+            package_files.extend(Path(tree).rglob(pattern))
+        with _quiet(quiet):
+            detector = EnhancedNPMCompromiseDetectorPhoenix(config_file=options.database)
+            pooled = hasattr(detector, 'start_lockfile_parsing')
+            if options.lockfile_workers and pooled:
+                detector.set_lockfile_workers(options.lockfile_workers)
+            started = time.perf_counter()
+            if pooled:
+                detector.start_lockfile_parsing(package_files)
+            assets = [detector.process_package_file(str(package_file)) for package_file in package_files]
+            if pooled:
+                detector.close_lockfile_workers()
+            elapsed = time.perf_counter() - started
+        last['enhanced'] = detector
+        return elapsed, {
+            'files': len(package_files),
+            'assets': len(assets),
+            'findings': len(detector.findings)
+        }
+
+    def scan_path():
+        scanner = NPMScanner(vulnerability_db)
+        started = time.perf_counter()
+        findings = scanner.scan_path(Path(tree))
+        elapsed = time.perf_counter() - started
+        last['npm_scanner'] = findings
+        return elapsed, {
+            'findings': len(findings),
+            'vulnerable': sum(1 for finding in findings if finding.verdict == Verdict.VULNERABLE)
+        }
+
+    def timed_report(generate: Callable[[], str]):
+        def run_once():
+            with _quiet(quiet):
+                started = time.perf_counter()
+                report_text = generate()
+                elapsed = time.perf_counter() - started
+            return elapsed, {'report_bytes': len(report_text.encode('utf-8'))}
+        return run_once
+
+    vulnerability_db = None
+    if selected & {'npm_scanner.scan_path', 'npm_scanner.generate_report'}:
+        db_path = build_vulnerability_database(options.database, os.path.join(workdir, 'vulnerability_database.json'))
+        vulnerability_db = VulnerabilityDatabase(db_path)
+
+    # Report benchmarks need the results of a scan; run it (once, untimed) when it was not selected
+    for scan_name, report_name, scan in (
+        ('detector_2025.scan_directory', 'detector_2025.generate_report', scan_directory_2025),
+        ('enhanced.process_package_file', 'enhanced.generate_report', process_package_files),
+        ('npm_scanner.scan_path', 'npm_scanner.generate_report', scan_path)
+    ):
+        if scan_name in selected:
+            announce(scan_name)
+            results[scan_name] = measure(options.runs, scan)
+            report(scan_name)
+        elif report_name in selected:
+            scan()
+
+    if 'detector_2025.generate_report' in selected:
+        announce('detector_2025.generate_report')
+        output = os.path.join(workdir, 'report_2025.txt')
+        results['detector_2025.generate_report'] = measure(
+            options.runs, timed_report(lambda: last['detector_2025'].generate_report(output)))
+        report('detector_2025.generate_report')
+    if 'enhanced.generate_report' in selected:
+        announce('enhanced.generate_report')
+        output = os.path.join(workdir, 'report_enhanced.txt')
+        results['enhanced.generate_report'] = measure(
+            options.runs, timed_report(lambda: last['enhanced'].generate_report(output)))
+        report('enhanced.generate_report')
+    if 'npm_scanner.generate_report' in selected:
+        announce('npm_scanner.generate_report')
+        output = os.path.join(workdir, 'report_npm_scanner.txt')
+        results['npm_scanner.generate_report'] = measure(
+            options.runs, timed_report(lambda: generate_scanner_report(last['npm_scanner'], output)))
+        report('npm_scanner.generate_report')
+
+    return results
+
+
+def compare_results(previous: Dict, current: Dict) -> List[str]:
+    """
+    Compare the median timings of two results files.
+
+    Args:
+        previous: Results written by an earlier run (e.g., on the base commit)
+        current: Results of this run
+
+    Returns:
+        One line per benchmark present in both
+    """
+    lines = []
+    if previous.get('spec') and current.get('spec') and previous['spec'] != current['spec']:
+        lines.append("⚠️  The trees were generated with different specs; timings are not directly comparable")
+    for name, result in current['benchmarks'].items():
+        before = previous.get('benchmarks', {}).get(name)
+        if not before:
+            continue
+        ratio = result['median'] / before['median'] if before['median'] else float('inf')
+        marker = '🟢' if ratio <= 0.95 else '🔴' if ratio >= 1.05 else '⚪'
+        lines.append(f"{marker} {name}: {before['median']:.3f}s -> {result['median']:.3f}s ({ratio:.2f}x)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the NPM compromise detectors on a synthetic monorepo',
+        epilog='Example: python benchmarks/run_benchmarks.py --repos 20 --output base.json, then on another '
+               'commit: python benchmarks/run_benchmarks.py --repos 20 --output new.json --compare base.json'
+    )
+    parser.add_argument('--output', '-o', default='benchmark_results.json',
+                        help='Results JSON file (default: benchmark_results.json)')
+    parser.add_argument('--compare', metavar='RESULTS',
+                        help='Earlier results file to compare the median timings with')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--only',
+                        help=f'Comma-separated benchmarks to run (default: all of {", ".join(BENCHMARKS)})')
+    parser.add_argument('--tree',
+                        help='Benchmark an existing tree instead of generating one (the spec options are then ignored)')
+    parser.add_argument('--keep-tree', metavar='DIR',
+                        help='Generate the tree in DIR and keep it after the run')
+    parser.add_argument('--database', default=DEFAULT_DATABASE,
+                        help='Compromise database used by the generator and the detectors')
+    parser.add_argument('--source-workers', type=int, default=None,
+                        help='Source scanning processes of the 2025 detector (default: its own default)')
+    parser.add_argument('--lockfile-workers', type=int, default=None,
+                        help='Lockfile parsing processes of both detectors (default: their own default)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Show the detectors\' output while they run')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    if args.only:
+        unknown = [name for name in args.only.split(',') if name not in BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    args.runs = max(1, args.runs)
+    args.database = os.path.abspath(args.database)
+
+    workdir = tempfile.mkdtemp(prefix='npm-detector-bench-')
+    try:
+        spec = None
+        tree_stats = None
+        if args.tree:
+            tree = os.path.abspath(args.tree)
+            print(f"📁 Benchmarking existing tree: {tree}")
+        else:
+            spec = spec_from_args(args)
+            tree = os.path.abspath(args.keep_tree) if args.keep_tree else os.path.join(workdir, 'tree')
+            print(f"🏗️  Generating synthetic monorepo: {tree}")
+            started = time.perf_counter()
+            tree_stats = generate_monorepo(tree, spec, args.database)
+            print(f"✅ {format_stats(tree_stats)} in {time.perf_counter() - started:.1f}s")
+
+        results = {
+            'created': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'runs': args.runs,
+            'spec': asdict(spec) if spec else None,
+            'tree': tree_stats if tree_stats else {'path': tree},
+            'benchmarks': run_benchmarks(tree, workdir, args)
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"\n📊 Compared with {args.compare} (commit {previous.get('commit') or 'unknown'}):")
+        for line in compare_results(previous, results):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
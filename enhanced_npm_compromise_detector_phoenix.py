@@ -15,19 +15,131 @@ import re
 import sys
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional, Any
+from typing import Dict, List, Set, Tuple, Optional, Any, Union, Iterable
 import argparse
 from datetime import datetime
-import tempfile
 import shutil
 import requests
 from requests.auth import HTTPBasicAuth
 import configparser
 import uuid
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote
+import asyncio
 import base64
+import io
+import time
+import copy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from universal_vulnerability_scanner.core.lockfile_parser import parse_yarn_lock_lines, iter_package_lock_entries, LOCKFILE_STREAM_THRESHOLD
+from universal_vulnerability_scanner.core.version_parser import strip_version_prefix, version_cache_stats
+from universal_vulnerability_scanner.core.git_remote import find_git_root, read_origin_url, read_head_commit, normalize_remote_url, \
+    resolve_origin_url, clear_git_caches
+from universal_vulnerability_scanner.core.blob_cache import BlobCache, ParseCache, git_blob_sha
+from universal_vulnerability_scanner.core.scan_state import ScanStateStore, compute_fingerprint, hash_bytes, hash_file
+from universal_vulnerability_scanner.integrations.http_session import get_http_session, TokenBucket, ConditionalRequestCache, conditional_get
+from universal_vulnerability_scanner.integrations.github_rate_limit import GitHubRateLimitScheduler, RateLimitWaitExceeded, \
+    github_resource_for_url
+
+
+def _lock_dependency_entries(packages: Iterable[Tuple[str, str]]):
+    """Turn (path, version) entries of a package-lock.json "packages" map into (package_name, version, path)
+    for every installed package that has a version"""
+    for package_path, version in packages:
+        if not version or not package_path.startswith('node_modules/'):
+            continue
+        # Handle scoped packages correctly
+        path_parts = package_path.replace('node_modules/', '').split('/')
+        if path_parts[0].startswith('@'):
+            package_name = '/'.join(path_parts[:2])  # @scope/name
+        else:
+            package_name = path_parts[0]
+        yield package_name, version, package_path
+
+
+# Names of the compiled compromise index in a lockfile worker process, installed by the pool initializer
+_worker_monitored_names = None
+
+
+def _init_lockfile_worker(monitored_names: frozenset):
+    """Process pool initializer: keep the compromise index names for every lockfile the worker parses"""
+    global _worker_monitored_names
+    _worker_monitored_names = monitored_names
+
+
+def _parse_lockfile_in_worker(file_path: str):
+    """Parse one lockfile in a worker process, keeping only packages in the compromise index
+    
+    package-lock.json gives [(package_name, version, path), ...]; yarn.lock gives the
+    {package_name: [resolved_version, ...]} index that _scan_yarn_lock accepts as content.
+    """
+    if file_path.endswith('yarn.lock'):
+        with open(file_path, 'rb') as f:
+            yarn_index = parse_yarn_lock_lines(f.read().decode('utf-8', errors='ignore').splitlines())
+        return {name: versions for name, versions in yarn_index.items() if name in _worker_monitored_names}
+        
+    if os.path.getsize(file_path) > LOCKFILE_STREAM_THRESHOLD:
+        packages = ((package_path, version if version is not None else '')
+                    for package_path, _, version in iter_package_lock_entries(file_path, 'packages'))
+    else:
+        with open(file_path, 'rb') as f:
+            lock_data = json.loads(f.read())
+        packages = ((package_path, package_info.get('version', ''))
+                    for package_path, package_info in lock_data.get('packages', {}).items())
+    return [entry for entry in _lock_dependency_entries(packages) if entry[0] in _worker_monitored_names]
+
 
 class EnhancedNPMCompromiseDetectorPhoenix:
+    # Tracking lists filled while fetching repositories (cloning, API discovery, downloads)
+    FETCH_TRACKING_ATTRS = (
+        'cloned_repositories',
+        'found_repositories',
+        'api_failed_repositories',
+        'fallback_success_repositories',
+        'completely_failed_repositories'
+    )
+    
+    # File names picked out of a repository tree by light-scan discovery
+    NPM_DISCOVERY_FILES = ('package.json', 'package-lock.json', 'yarn.lock')
+    
+    # One page of the repository inventory (--graphql-inventory); viewer.repositories is limited to 100 per page
+    GRAPHQL_INVENTORY_QUERY = """
+    query($cursor: String) {
+      viewer {
+        repositories(first: 100, after: $cursor,
+                     affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER],
+                     ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]) {
+          pageInfo { hasNextPage endCursor }
+          nodes {
+            nameWithOwner
+            url
+            isArchived
+            isFork
+            isPrivate
+            pushedAt
+            defaultBranchRef {
+              name
+              target { ... on Commit { oid tree { oid } } }
+            }
+          }
+        }
+      }
+    }
+    """
+    
+    # Paths materialized by --sparse-clone (non-cone patterns, matched at any depth)
+    SPARSE_CHECKOUT_PATTERNS = (
+        'package.json',
+        'package-lock.json',
+        'yarn.lock',
+        'pnpm-lock.yaml'
+    )
+    
+    # Lockfiles handed to start_lockfile_parsing go to worker processes once together they are at least this large
+    LOCKFILE_POOL_MIN_BYTES = 8 * 1024 * 1024
+    
     def __init__(self, config_file: str = None, phoenix_config_file: str = None):
         """Initialize the detector with compromised package data and Phoenix API configuration"""
         self.config_file = config_file or "compromised_packages_2025.json"
@@ -38,6 +150,9 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         
         # Initialize all attributes first
         self.findings = []
+        # Findings registry: recorded (package, version, file, dependency_type) keys, plus first repo_url seen per file
+        self._finding_keys = set()
+        self._file_repo_urls = {}
         self.scanned_files = []
         self.scanned_packages = []
         self.package_sources = {}
@@ -55,6 +170,7 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         self.processed_repositories = []  # Track all processed repositories with details
         self.all_scanned_libraries = []  # Track all libraries found during scan
         self.clean_libraries = []     # Track clean libraries
+        self._clean_libraries_by_file = {}  # file -> clean libraries, for per-file --import-all lookups
         self.compromised_libraries = []  # Track compromised libraries
         self.api_failed_repositories = []  # Track repositories where API failed
         self.fallback_success_repositories = []  # Track repositories successfully accessed via fallback
@@ -73,7 +189,28 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         self.enable_phoenix_import = False
         self.import_all_libraries = False  # Import all libraries including clean ones
         self.light_scan_mode = False
+        self.workers = 1  # Repositories fetched (cloned/downloaded) concurrently
+        self.async_light_scan = False  # Light scan through AsyncLightScanEngine
+        self.discovery_mode = 'trees'  # Light-scan file discovery: 'trees' (git trees API) or 'search' (code search)
+        self.max_concurrency = 16  # Concurrent GitHub requests for the async light scan
+        self.rate_limit = 10.0  # GitHub requests per second for the async light scan (0 = unlimited)
+        self.request_bucket = None  # TokenBucket charged by every GitHub request while the async light scan runs
+        self.sparse_clone = False  # Shallow, blobless, sparse clones of package manifests only
+        self.scan_state = None  # ScanStateStore when --incremental is enabled
+        self.blob_cache = None  # On-disk BlobCache of downloaded files when --blob-cache is enabled
+        self.parse_cache = ParseCache()  # Parsed manifests and compact lockfile results keyed by git blob SHA of their content
+        self.lockfile_workers = os.cpu_count() or 1  # Processes parsing large batches of local lockfiles
+        self._lockfile_executor = None  # ProcessPoolExecutor of the lockfile workers, started on first use
+        self._lockfile_parses = {}  # Lockfile path -> pending worker parse (see start_lockfile_parsing)
         self.github_token = None  # Will be loaded from config or environment
+        self.github_tokens = []  # All configured tokens (GITHUB_TOKENS / github_tokens); requests are spread across them
+        self.rate_limiter = None  # GitHubRateLimitScheduler shared by every GitHub request
+        self.max_rate_limit_wait = 900.0  # Longest wait for a rate limit reset before a GitHub request gives up (seconds)
+        self.graphql_inventory = False  # --pull-all lists repositories with batched GraphQL queries
+        self.skip_archived = False  # --pull-all leaves archived repositories out
+        self.repository_inventory = {}  # Clone URL -> default branch, commit and root tree OID (GraphQL inventory)
+        self.http_session = get_http_session()  # Pooled keep-alive session shared by GitHub and Phoenix calls
+        self.http_cache = None  # ConditionalRequestCache (ETag / Last-Modified) for GitHub GETs when --http-cache is enabled
         self.use_embedded_credentials = False
         
         # Tag configuration
@@ -85,6 +222,7 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         self.github_pull_dir = os.path.join('github-pull', self.timestamp)
         self.result_dir = os.path.join('result', self.timestamp)
         self.organize_folders = False
+        self.save_light_scan_files = False  # Write light-scan downloads to github-pull/ (explicit --organize-folders only)
         
         # 🔐 EMBEDDED CREDENTIALS FOR LOCAL LAPTOP USE
         # Replace with your actual Phoenix Security credentials for personal use
@@ -99,6 +237,7 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         # Load Phoenix configuration and GitHub token after initializing all attributes
         self.phoenix_config = self.load_phoenix_config()
         self.load_github_token()
+        self.load_github_token_pool()
         self.load_tag_config()
         
     def load_phoenix_config(self) -> Dict:
@@ -191,6 +330,38 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         # No token found
         print("💡 No GitHub token found - API rate limits may apply for light scan mode")
         
+    def load_github_token_pool(self):
+        """Collect additional GitHub tokens (GITHUB_TOKENS env or github_tokens config, comma-separated) and set up the rate limit scheduler"""
+        tokens = [self.github_token]
+        tokens.extend(os.getenv('GITHUB_TOKENS', '').split(','))
+        
+        if os.path.exists(self.phoenix_config_file):
+            try:
+                parser = configparser.ConfigParser()
+                parser.read(self.phoenix_config_file)
+                if 'phoenix' in parser:
+                    tokens.extend((parser['phoenix'].get('github_tokens') or '').split(','))
+            except Exception as e:
+                print(f"⚠️  Error loading GitHub tokens from config: {str(e)}")
+                
+        self.github_tokens = []
+        for token in tokens:
+            token = (token or '').strip()
+            if token and token != 'your_github_token_here' and token not in self.github_tokens:
+                self.github_tokens.append(token)
+                
+        if self.github_tokens and not self.github_token:
+            self.github_token = self.github_tokens[0]
+        if len(self.github_tokens) > 1:
+            print(f"🔗 Spreading GitHub API requests across {len(self.github_tokens)} tokens")
+            
+        self.rate_limiter = GitHubRateLimitScheduler(self.github_tokens, max_wait=self.max_rate_limit_wait)
+        
+    def set_max_rate_limit_wait(self, seconds: float):
+        """Set the longest wait for a GitHub rate limit reset before a request gives up"""
+        self.max_rate_limit_wait = max(0.0, seconds)
+        self.rate_limiter.max_wait = self.max_rate_limit_wait
+        
     def load_tag_config(self):
         """Load additional tag configuration from config file"""
         if not os.path.exists(self.phoenix_config_file):
@@ -236,6 +407,8 @@ import_type = new
 # For public repositories: token is optional, fallback handles API failures automatically
 # For private repositories: valid token is required
 github_token = your_github_token_here
+# Optional extra tokens (comma-separated); GitHub API requests are spread across all of them
+# github_tokens = token_two,token_three
 
 # Additional tags for findings and assets (comma-separated)
 # These tags will be added to vulnerability findings
@@ -281,36 +454,16 @@ additional_asset_tags = npm-project,dependency-scan
                 # Default to a generic pattern - user can override
                 return f"https://github.com/unknown-org/{repo_name}"
                 
-        # Pattern 2: Look for .git directory
-        current_path = path.parent
-        while current_path != current_path.parent:  # Stop at root
-            git_dir = current_path / '.git'
-            if git_dir.exists():
-                # Try to read origin URL from git config
-                try:
-                    result = subprocess.run(
-                        ['git', 'remote', 'get-url', 'origin'],
-                        cwd=current_path,
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    if result.returncode == 0:
-                        origin_url = result.stdout.strip()
-                        # Convert SSH to HTTPS if needed
-                        if origin_url.startswith('git@github.com:'):
-                            origin_url = origin_url.replace('git@github.com:', 'https://github.com/')
-                            if origin_url.endswith('.git'):
-                                origin_url = origin_url[:-4]
-                        return origin_url
-                except Exception:
-                    pass
-                    
-                # Fallback: use directory name
-                repo_name = current_path.name
-                return f"https://github.com/unknown-org/{repo_name}"
+        # Pattern 2: Look for .git directory (root and origin lookups are cached per repository)
+        repo_root = find_git_root(str(path.parent))
+        if repo_root:
+            origin_url = read_origin_url(repo_root)
+            if origin_url:
+                return normalize_remote_url(origin_url)
                 
-            current_path = current_path.parent
+            # Fallback: use directory name
+            repo_name = os.path.basename(repo_root)
+            return f"https://github.com/unknown-org/{repo_name}"
             
         # Pattern 3: Extract from path structure
         path_parts = path.parts
@@ -553,7 +706,7 @@ additional_asset_tags = npm-project,dependency-scan
         url = f"{self.phoenix_config['api_base_url']}/v1/auth/access_token"
         
         try:
-            response = requests.get(
+            response = self.http_session.get(
                 url, 
                 auth=HTTPBasicAuth(
                     self.phoenix_config['client_id'], 
@@ -609,7 +762,7 @@ additional_asset_tags = npm-project,dependency-scan
         
         try:
             print(f"🚀 Importing {len(self.phoenix_assets)} assets to Phoenix...")
-            response = requests.post(
+            response = self.http_session.post(
                 url,
                 headers=headers,
                 json=import_payload,
@@ -736,6 +889,7 @@ additional_asset_tags = npm-project,dependency-scan
             except Exception as e:
                 print(f"   ❌ Failed to delete {repo_name}: {str(e)}")
                 
+        clear_git_caches()
         print(f"🗑️  Cleanup complete!")
 
     def load_compromise_data(self):
@@ -763,6 +917,30 @@ additional_asset_tags = npm-project,dependency-scan
             print(f"❌ Error loading compromise data: {str(e)}")
             self._load_default_data()
             
+        self._build_compromise_index()
+        
+    def _build_compromise_index(self):
+        """Compile the compromise data into one name -> matcher table for check_package_compromise
+        
+        Each entry holds the normalized compromised versions as a frozenset, an all-versions
+        flag and the precomputed hit/miss results, so a lookup is a single hash probe.
+        Potentially compromised names map to a matcher without versions.
+        """
+        index = {}
+        for package_name in self.potentially_compromised:
+            index[package_name] = (None, False, None, None)
+        # Packages with specific versions take precedence, as in the original lookup order
+        for package_name, pkg_data in self.compromised_packages.items():
+            compromised_versions = pkg_data.get('compromised_versions', [])
+            index[package_name] = (
+                frozenset(self.normalize_version(v) for v in compromised_versions),
+                'all' in compromised_versions,
+                (True, 'CRITICAL', compromised_versions),
+                # Package is in our list but version is different - safe version (severity 1)
+                (False, 'CLEAN', compromised_versions)
+            )
+        self._compromise_index = index
+            
     def _load_default_data(self):
         """Load default compromise data if config file is not available"""
         self.compromised_packages = {
@@ -803,8 +981,30 @@ additional_asset_tags = npm-project,dependency-scan
             'file': file_path,
             'details': details or {}
         }
+        self._register_finding(finding)
+        
+    def _finding_key(self, package_name: str, version: str, file_path: str, dep_type: str) -> tuple:
+        """Build the registry key used for duplicate-finding suppression"""
+        return (package_name, version, file_path, dep_type)
+        
+    def _register_finding(self, finding: Dict):
+        """Append a finding and index it for constant-time dedup and repo lookups"""
+        details = finding.get('details', {})
+        key = self._finding_key(details.get('package'), details.get('version'),
+                                finding.get('file'), details.get('dependency_type'))
+        self._finding_keys.add(key)
+        if finding.get('file') not in self._file_repo_urls:
+            self._file_repo_urls[finding.get('file')] = finding.get('repo_url')
         self.findings.append(finding)
         
+    def has_finding(self, package_name: str, version: str, file_path: str, dep_type: str) -> bool:
+        """Check whether a finding for this package/version/file/dependency type was already recorded"""
+        return self._finding_key(package_name, version, file_path, dep_type) in self._finding_keys
+        
+    def get_finding_repo_url(self, file_path: str) -> Optional[str]:
+        """Repository URL of the first finding recorded for a file, if any"""
+        return self._file_repo_urls.get(file_path)
+        
     def enable_full_tree_analysis(self, enable: bool = True):
         """Enable or disable full dependency tree analysis"""
         self.full_tree_analysis = enable
@@ -861,6 +1061,242 @@ additional_asset_tags = npm-project,dependency-scan
         if enable:
             print(f"📦 Import all libraries enabled: Clean libraries will get CVSS 1.0 findings")
             
+    def enable_sparse_clone(self, enable: bool = True):
+        """Enable or disable shallow, blobless, sparse clones that only check out package manifests"""
+        self.sparse_clone = enable
+        if enable:
+            print(f"🪶 Sparse clone enabled: only HEAD and {', '.join(self.SPARSE_CHECKOUT_PATTERNS)} are fetched")
+            
+    def enable_graphql_inventory(self, enable: bool = True):
+        """List --pull-all repositories with batched GraphQL queries (default branch, archived/fork flags, tree OID)"""
+        self.graphql_inventory = enable
+        if enable:
+            print(f"🧭 GraphQL repository inventory enabled: unchanged repositories are skipped with --incremental")
+            
+    def enable_skip_archived(self, enable: bool = True):
+        """Leave archived repositories out of --pull-all"""
+        self.skip_archived = enable
+        
+    def enable_incremental(self, state_db: str = None):
+        """Enable incremental scanning: unchanged package files replay cached results from a SQLite state store"""
+        state_db = state_db or os.path.join('result', 'scan_state.db')
+        
+        # Anything that changes the produced findings invalidates the stored state
+        if os.path.exists(self.config_file):
+            database_source = self.config_file
+        else:
+            database_source = json.dumps(self.compromised_packages, sort_keys=True).encode('utf-8')
+        fingerprint = compute_fingerprint(database_source, {
+            'full_tree_analysis': self.full_tree_analysis,
+            'import_all_libraries': self.import_all_libraries,
+            'additional_vuln_tags': self.additional_vuln_tags,
+            'additional_asset_tags': self.additional_asset_tags
+        })
+        
+        self.scan_state = ScanStateStore(state_db, fingerprint)
+        print(f"♻️  Incremental scan enabled: state stored in {state_db}")
+        if self.scan_state.invalidated:
+            print(f"♻️  Compromised package data or scan options changed - cached results discarded")
+            
+    def enable_blob_cache(self, cache_dir: str = None, max_mb: int = 512):
+        """Enable the on-disk content-addressed cache of downloaded NPM files (keyed by git blob SHA)"""
+        cache_dir = cache_dir or os.path.join('result', 'blob_cache')
+        self.blob_cache = BlobCache(cache_dir, max_mb * 1024 * 1024)
+        print(f"🗄️  Blob cache enabled: {cache_dir} (max {max_mb} MB)")
+        
+    def enable_http_cache(self, db_path: str = None):
+        """Enable conditional GitHub requests (If-None-Match / If-Modified-Since) backed by a persistent validator cache
+        
+        Response bodies go to the blob cache when --blob-cache is enabled (raw file downloads are then stored
+        once), else to a size-bounded store next to the database.
+        """
+        db_path = db_path or os.path.join('result', 'http_cache.db')
+        self.http_cache = ConditionalRequestCache(db_path, blob_cache=self.blob_cache,
+                                                  account_resolver=self._github_account_id)
+        print(f"🗄️  HTTP cache enabled: {db_path} (unchanged GitHub responses revalidated with ETags)")
+        
+    def _github_account_id(self, authorization: str) -> Optional[str]:
+        """Numeric id of the GitHub account behind an Authorization header, so token rotation keeps the HTTP cache warm"""
+        response = self.http_session.get('https://api.github.com/user', headers={'Authorization': authorization}, timeout=30)
+        token = authorization.split(' ', 1)[-1]
+        self.rate_limiter.update(token, 'core', response)
+        if response.status_code != 200:
+            # e.g., GitHub App installation tokens have no user; their hash identifies them instead
+            return None
+        account_id = response.json().get('id')
+        return str(account_id) if account_id is not None else None
+        
+
+    def _github_get(self, url: str, headers: Dict = None, params: Dict = None, timeout: int = 30) -> requests.Response:
+        """GET a GitHub API or raw content URL through the rate limit scheduler (and HTTP cache when enabled)"""
+        return self._github_request('GET', url, headers=headers, params=params, timeout=timeout)
+        
+    def _github_request(self, method: str, url: str, headers: Dict = None, params: Dict = None,
+                        json_body: Dict = None, timeout: int = 30, max_attempts: int = 3) -> requests.Response:
+        """Send a GitHub request through the rate limit scheduler
+        
+        Authenticated API requests are sent with whichever configured token has budget left. Rate limit
+        rejections (403/429) wait for the reset or Retry-After and are retried. When the wait would exceed
+        --max-rate-limit-wait the request is given up on: the last response is returned, or a 429 built
+        locally if nothing was sent yet. GETs are revalidated against the HTTP cache when it is enabled.
+        """
+        resource = github_resource_for_url(url)
+        headers = dict(headers or {})
+        authenticated = 'Authorization' in headers
+        response = None
+        
+        for attempt in range(max_attempts):
+            if self.request_bucket:
+                # Every HTTP request counts against --rate-limit, retries included
+                self.request_bucket.acquire()
+            token = None
+            if resource:
+                try:
+                    token = self.rate_limiter.acquire(resource, authenticated)
+                except RateLimitWaitExceeded as e:
+                    print(f"⚠️  GitHub rate limit reset is more than {self.max_rate_limit_wait:g}s away, giving up on {url}")
+                    return response if response is not None else self._rate_limit_exceeded_response(url, e.wait)
+                if token:
+                    headers['Authorization'] = f'token {token}'
+                    
+            if method == 'GET':
+                response = conditional_get(self.http_session, self.http_cache, url, params=params, headers=headers, timeout=timeout)
+            else:
+                response = self.http_session.request(method, url, params=params, headers=headers, json=json_body, timeout=timeout)
+            
+            if resource:
+                self.rate_limiter.update(token, resource, response)
+            if not self.rate_limiter.is_rate_limited(response) or attempt == max_attempts - 1:
+                return response
+                
+            delay = self.rate_limiter.retry_delay(token, resource, response, attempt)
+            if delay is None:
+                print(f"⚠️  GitHub rate limit reset is more than {self.max_rate_limit_wait:g}s away, giving up on {url}")
+                return response
+            if delay > 0:
+                print(f"⏳ GitHub rate limit reached, waiting {delay:.1f}s before retrying...")
+                self.rate_limiter.note_wait(delay)
+                time.sleep(delay)
+                
+        return response
+        
+    @staticmethod
+    def _rate_limit_exceeded_response(url: str, wait: float) -> requests.Response:
+        """429 standing in for a request that was not sent because its rate limit slot is too far away"""
+        response = requests.Response()
+        response.status_code = 429
+        response.reason = 'Too Many Requests'
+        response.url = url
+        response.headers['Retry-After'] = str(int(wait) + 1)
+        response._content = b'{"message": "API rate limit exceeded (not sent: reset is beyond --max-rate-limit-wait)"}'
+        return response
+        
+    def print_cache_stats(self):
+        """Print blob, parse and HTTP cache effectiveness"""
+        if self.blob_cache:
+            print(f"🗄️  Blob cache: {self.blob_cache.hits} hit(s), {self.blob_cache.misses} download(s), "
+                  f"{self.blob_cache.evictions} eviction(s)")
+        if self.parse_cache.hits:
+            print(f"🗄️  Parse cache: {self.parse_cache.hits} identical file(s) reused without re-parsing")
+        if self.http_cache:
+            print(f"🗄️  HTTP cache: {self.http_cache.revalidated} response(s) unchanged (304, not counted against "
+                  f"the rate limit), {self.http_cache.stored} response(s) stored")
+            self.http_cache.close()
+            self.http_cache = None
+        if self.debug_mode:
+            for name, stats in version_cache_stats().items():
+                print(f"🐛 Debug: {name} cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+                      f"{stats['size']}/{stats['maxsize']} entries")
+            
+    def close_scan_state(self):
+        """Flush and close the incremental scan state store"""
+        if self.scan_state:
+            print(f"♻️  Incremental scan: {self.scan_state.hits} unchanged file(s) replayed, "
+                  f"{self.scan_state.misses} file(s) scanned")
+            self.scan_state.close()
+            self.scan_state = None
+            
+    def enable_async_light_scan(self, enable: bool = True, max_concurrency: int = None, rate_limit: float = None):
+        """Enable the asyncio light-scan engine (concurrent discovery and downloads, scanned from memory)"""
+        self.async_light_scan = enable
+        if max_concurrency:
+            self.max_concurrency = max(1, max_concurrency)
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+        if enable:
+            limit = f"{self.rate_limit:g} req/s" if self.rate_limit > 0 else "unlimited"
+            print(f"⚡ Async light scan enabled: {self.max_concurrency} concurrent requests, rate limit {limit}")
+            
+    def set_discovery_mode(self, mode: str):
+        """Choose how light scan finds NPM files: one git trees request ('trees') or code search ('search')"""
+        self.discovery_mode = mode
+        if mode == 'search':
+            print(f"🔎 Light-scan discovery: GitHub code search")
+            
+    def set_workers(self, workers: int):
+        """Set how many repositories are fetched concurrently while earlier ones are scanned"""
+        self.workers = max(1, int(workers or 1))
+        if self.workers > 1:
+            print(f"⚡ Parallel repository pipeline enabled: {self.workers} fetch workers")
+            
+    def set_lockfile_workers(self, workers: int):
+        """Set how many processes parse local lockfiles in large batches (1 parses them in this process)"""
+        self.lockfile_workers = max(1, int(workers or 1))
+        
+    def start_lockfile_parsing(self, package_files: Iterable[Union[str, Path]]):
+        """Parse the local lockfiles among package_files ahead in worker processes
+        
+        Only used when together they are at least LOCKFILE_POOL_MIN_BYTES. Each worker gets the
+        compromise index names once through the pool initializer and sends back only the
+        (package_name, version, path) entries (yarn.lock: versions) of monitored packages;
+        findings are still created in this process when process_package_file reaches the file.
+        """
+        if self.lockfile_workers <= 1:
+            return
+        lockfiles = [str(package_file) for package_file in package_files
+                     if str(package_file).endswith(('package-lock.json', 'yarn.lock'))]
+        total_bytes = 0
+        for file_path in lockfiles:
+            try:
+                total_bytes += os.path.getsize(file_path)
+            except OSError:
+                pass
+        if not lockfiles or total_bytes < self.LOCKFILE_POOL_MIN_BYTES:
+            return
+            
+        try:
+            if self._lockfile_executor is None:
+                self._lockfile_executor = ProcessPoolExecutor(
+                    max_workers=self.lockfile_workers, initializer=_init_lockfile_worker,
+                    initargs=(frozenset(self._compromise_index),)
+                )
+                print(f"🧵 Lockfile parsing: {self.lockfile_workers} worker processes")
+            for file_path in lockfiles:
+                self._lockfile_parses[file_path] = self._lockfile_executor.submit(_parse_lockfile_in_worker, file_path)
+        except (OSError, ValueError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"⚠️  Lockfile worker processes unavailable ({str(e)}), parsing in this process")
+            self.close_lockfile_workers()
+            
+    def _take_lockfile_parse(self, file_path: str):
+        """Return (and forget) the worker parse of a lockfile, or None to parse it in this process"""
+        future = self._lockfile_parses.pop(file_path, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            print(f"⚠️  Lockfile worker process failed ({str(e)}), parsing {file_path} in this process")
+            return None
+            
+    def close_lockfile_workers(self):
+        """Stop the lockfile worker processes and drop parses that were never used"""
+        for future in self._lockfile_parses.values():
+            future.cancel()
+        self._lockfile_parses.clear()
+        if self._lockfile_executor is not None:
+            self._lockfile_executor.shutdown(wait=True)
+            self._lockfile_executor = None
+            
     def set_additional_tags(self, vuln_tags: List[str] = None, asset_tags: List[str] = None):
         """Set additional tags for vulnerabilities and assets"""
         if vuln_tags:
@@ -876,32 +1312,10 @@ additional_asset_tags = npm-project,dependency-scan
             # Convert to absolute path
             abs_path = os.path.abspath(file_path)
             
-            # Look for .git directory in the path hierarchy
-            current_path = abs_path
-            while current_path and current_path != '/':
-                git_dir = os.path.join(current_path, '.git')
-                if os.path.exists(git_dir):
-                    # Try to get remote URL from git config
-                    try:
-                        result = subprocess.run(
-                            ['git', 'remote', 'get-url', 'origin'],
-                            cwd=current_path,
-                            capture_output=True,
-                            text=True,
-                            timeout=10
-                        )
-                        if result.returncode == 0:
-                            remote_url = result.stdout.strip()
-                            # Convert SSH to HTTPS format
-                            if remote_url.startswith('git@github.com:'):
-                                remote_url = remote_url.replace('git@github.com:', 'https://github.com/')
-                                if remote_url.endswith('.git'):
-                                    remote_url = remote_url[:-4]
-                            return remote_url
-                    except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-                        pass
-                    break
-                current_path = os.path.dirname(current_path)
+            # Look for .git directory in the path hierarchy and read origin from its config
+            remote_url = resolve_origin_url(abs_path)
+            if remote_url:
+                return remote_url
             
             # Fallback: try to infer from path patterns
             if '/GitHub/' in abs_path or '/github/' in abs_path:
@@ -930,46 +1344,139 @@ additional_asset_tags = npm-project,dependency-scan
         """Normalize version string by removing prefixes like ^, ~, >=, etc."""
         if not version:
             return ""
-        # Remove common npm version prefixes
-        cleaned = re.sub(r'^[^\d]*', '', str(version))
-        # Handle version ranges like "1.0.0 - 2.0.0"
-        if ' - ' in cleaned:
-            cleaned = cleaned.split(' - ')[0]
-        # Handle || operators
-        if ' || ' in cleaned:
-            cleaned = cleaned.split(' || ')[0]
-        return cleaned.strip()
+        # Memoized: the same few thousand specifiers repeat across every manifest
+        return strip_version_prefix(str(version))
         
     def check_package_compromise(self, package_name: str, version: str) -> Tuple[bool, str, List[str]]:
         """
         Check if a package version is compromised
         Returns: (is_compromised, severity, compromised_versions_list)
         """
-        normalized_version = self.normalize_version(version)
-        
-        # Check exact compromised packages with versions
-        if package_name in self.compromised_packages:
-            pkg_data = self.compromised_packages[package_name]
-            compromised_versions = pkg_data.get('compromised_versions', [])
+        matcher = self._compromise_index.get(package_name)
+        if matcher is None:
+            return False, '', []
             
-            # Check if all versions are compromised
-            if 'all' in compromised_versions:
-                return True, 'CRITICAL', compromised_versions
+        versions, all_versions, hit, miss = matcher
+        # Potentially compromised packages (no specific version)
+        if versions is None:
+            return True, 'HIGH', []
+        if all_versions or self.normalize_version(version) in versions:
+            return hit
+        return miss
+        
+    def check_packages_batch(self, packages: Iterable[Tuple]) -> List[Tuple[Tuple, Tuple[bool, str, List[str]]]]:
+        """
+        Check many packages at once, e.g. every entry of a lockfile
+        Takes tuples starting with (package_name, version); extra elements (such as the
+        lockfile path) are passed through. Names outside the compromise database are
+        dropped with one hash probe each.
+        Returns: [(entry, (is_compromised, severity, compromised_versions_list)), ...]
+        """
+        index = self._compromise_index
+        check = self.check_package_compromise
+        return [(entry, check(entry[0], entry[1])) for entry in packages if entry[0] in index]
+
+    def process_package_file(self, file_path: str, repo_url: str = None, original_repo_path: str = None,
+                             content: Union[str, bytes, Dict, None] = None, blob_sha: str = None) -> Dict:
+        """Process a single package file and create Phoenix asset with findings
+        
+        When content is given (text, raw bytes or an already parsed JSON object, e.g. a
+        light scan download), it is scanned from memory and file_path only names the
+        file; nothing is read from disk. blob_sha (git trees discovery) is recorded in
+        the incremental state so later runs can skip downloading the unchanged blob.
+        """
+        if not self.scan_state:
+            return self._scan_package_file(file_path, repo_url, original_repo_path, content)
             
-            if normalized_version in compromised_versions:
-                return True, 'CRITICAL', compromised_versions
-            else:
-                # Package is in our list but version is different - safe version (severity 1)
-                return False, 'CLEAN', compromised_versions
+        # Incremental mode: replay cached results when the file content is unchanged
+        if not repo_url:
+            repo_url = self.get_repo_url_from_path(file_path)
+        if original_repo_path:
+            asset_file_path = original_repo_path
+        elif content is None:
+            # Only a file on disk lives in a checkout; light-scan paths are URLs
+            asset_file_path = self._state_asset_path(file_path, repo_url)
+        else:
+            asset_file_path = file_path
+        repo_key = repo_url or 'unknown'
+        
+        content_hash = self._content_hash(content) if content is not None else hash_file(file_path)
+        if content_hash:
+            delta = self.scan_state.get_file(repo_key, asset_file_path, content_hash)
+            if delta is not None:
+                pending = self._lockfile_parses.pop(file_path, None)
+                if pending is not None:
+                    pending.cancel()
+                return self._replay_file_delta(delta, file_path, repo_url)
                 
-        # Check potentially compromised packages (no specific version)
-        if package_name in self.potentially_compromised:
-            return True, 'HIGH', []
+        marks = {
+            'findings': len(self.findings),
+            'all_scanned_libraries': len(self.all_scanned_libraries),
+            'clean_libraries': len(self.clean_libraries),
+            'compromised_libraries': len(self.compromised_libraries)
+        }
+        stats_before = dict(self.dependency_stats)
+        
+        asset = self._scan_package_file(file_path, repo_url, original_repo_path, content)
+        
+        if content_hash:
+            delta = {name: getattr(self, name)[start:] for name, start in marks.items()}
+            delta['dependency_stats'] = {
+                key: value - stats_before.get(key, 0)
+                for key, value in self.dependency_stats.items()
+                if value != stats_before.get(key, 0)
+            }
+            delta['file_path'] = file_path
+            delta['asset'] = asset
+            self.scan_state.put_file(repo_key, asset_file_path, content_hash, delta, blob_sha)
             
-        return False, '', []
-
-    def process_package_file(self, file_path: str, repo_url: str = None, original_repo_path: str = None) -> Dict:
-        """Process a single package file and create Phoenix asset with findings"""
+        return asset
+        
+    def _state_asset_path(self, file_path: str, repo_url: str = None) -> str:
+        """Incremental state key of a local package file
+        
+        Inside a checkout of a known repository this is the path relative to the checkout, as for
+        light scans, so clones into dated github-pull folders or /tmp keep matching earlier runs.
+        Anything else is keyed by its own path.
+        """
+        abs_path = os.path.abspath(file_path)
+        repo_root = find_git_root(abs_path) if repo_url else None
+        if not repo_root:
+            return file_path
+        return Path(os.path.relpath(abs_path, repo_root)).as_posix()
+            
+    def _replay_file_delta(self, delta: Dict, file_path: str, repo_url: str) -> Dict:
+        """Re-apply the stored results of an unchanged package file"""
+        self.scanned_files.append(file_path)
+        print(f"📦 Processing: {file_path}")
+        if repo_url:
+            print(f"🔗 Repository: {repo_url}")
+        print(f"♻️  Unchanged since last scan - replaying cached results")
+        
+        # Local paths of downloaded files differ between runs (temp directories)
+        previous_path = delta.get('file_path')
+        
+        def relocate(entry: Dict) -> Dict:
+            if previous_path and entry.get('file') == previous_path:
+                entry['file'] = file_path
+            return entry
+            
+        for finding in delta.get('findings', []):
+            self._register_finding(relocate(finding))
+        self.all_scanned_libraries.extend(relocate(lib) for lib in delta.get('all_scanned_libraries', []))
+        for lib in delta.get('clean_libraries', []):
+            relocate(lib)
+            self.clean_libraries.append(lib)
+            self._clean_libraries_by_file.setdefault(file_path, []).append(lib)
+        self.compromised_libraries.extend(relocate(lib) for lib in delta.get('compromised_libraries', []))
+        for key, value in delta.get('dependency_stats', {}).items():
+            self.dependency_stats[key] = self.dependency_stats.get(key, 0) + value
+            
+        return delta.get('asset')
+        
+    def _scan_package_file(self, file_path: str, repo_url: str = None, original_repo_path: str = None,
+                           content: Union[str, bytes, Dict, None] = None) -> Dict:
+        """Scan a package file and build its Phoenix asset (uncached path of process_package_file)"""
         # Track this file as scanned
         self.scanned_files.append(file_path)
         
@@ -987,9 +1494,12 @@ additional_asset_tags = npm-project,dependency-scan
         
         # Scan the file for compromised packages
         if file_path.endswith('package.json'):
-            findings = self.scan_package_json(file_path)
+            if content is not None:
+                findings = self.scan_package_json(file_path, content, repo_url)
+            else:
+                findings = self.scan_package_json(file_path)
         elif file_path.endswith('package-lock.json') or file_path.endswith('yarn.lock'):
-            findings = self.scan_lock_file(file_path)
+            findings = self.scan_lock_file(file_path, content)
         else:
             findings = []
             
@@ -1032,15 +1542,7 @@ additional_asset_tags = npm-project,dependency-scan
                 finding_id = f"{package_name}@{version}:{asset_file_path}:{dep_type}"
                 
                 # Check if we already have this finding
-                existing_finding = any(
-                    f.get('details', {}).get('package') == package_name and
-                    f.get('details', {}).get('version') == version and
-                    f.get('file') == asset_file_path and
-                    f.get('details', {}).get('dependency_type') == dep_type
-                    for f in self.findings
-                )
-                
-                if not existing_finding:
+                if not self.has_finding(package_name, version, asset_file_path, dep_type):
                     report_finding = {
                         'severity': severity or 'INFO',
                         'message': f"Safe version detected: {package_name}@{version}" if is_safe else f"Compromised package detected: {package_name}@{version}",
@@ -1054,12 +1556,12 @@ additional_asset_tags = npm-project,dependency-scan
                             'compromised_versions': compromised_versions
                         }
                     }
-                    self.findings.append(report_finding)
+                    self._register_finding(report_finding)
                     
         # Create findings for ALL clean libraries if --import-all is enabled
         # This ensures every library gets a Phoenix finding, even if it's clean
         if self.import_all_libraries:
-            for lib in self.clean_libraries:
+            for lib in self._clean_libraries_by_file.get(file_path, []):
                 if lib.get('file') == file_path:  # Only process libraries from this specific file
                     phoenix_finding = self.create_phoenix_finding(
                         lib['name'], lib['clean_version'], 'CLEAN', 
@@ -1081,7 +1583,7 @@ additional_asset_tags = npm-project,dependency-scan
                             'compromised_versions': []
                         }
                     }
-                    self.findings.append(report_finding)
+                    self._register_finding(report_finding)
             
         # Add installed software information
         # TODO - Review this. installedSoftware is for OS packages and apps
@@ -1112,13 +1614,51 @@ additional_asset_tags = npm-project,dependency-scan
         except Exception as e:
             print(f"⚠️  Could not extract installed software from {file_path}: {str(e)}")
 
-    def scan_package_json(self, file_path: str) -> List[Dict]:
-        """Scan package.json for compromised packages"""
+    def _load_json_content(self, file_path: str, content: Union[str, bytes, Dict, None] = None) -> Any:
+        """Parse JSON from in-memory content (text, raw bytes or an already parsed object), else from disk
+        
+        Parse results are cached by the git blob SHA of the content, so identical
+        manifests (vendored copies, forks) are parsed once per run. Lockfiles do not
+        go through here: only their compact scan results are cached.
+        """
+        if isinstance(content, (dict, list)):
+            return content
+        data = self._read_content_bytes(file_path, content)
+        
+        key = ('json', git_blob_sha(data))
+        parsed = self.parse_cache.get(key)
+        if parsed is None:
+            parsed = json.loads(data)
+            self.parse_cache.put(key, parsed)
+        return parsed
+        
+    def _read_content_bytes(self, file_path: str, content: Union[str, bytes, None]) -> bytes:
+        """Raw bytes of in-memory content, or of the file on disk"""
+        if content is None:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        if isinstance(content, str):
+            return content.encode('utf-8')
+        return content
+        
+    def _content_hash(self, content: Union[str, bytes, Dict]) -> str:
+        """Content hash of in-memory package file content for the incremental state store"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        elif not isinstance(content, bytes):
+            content = json.dumps(content, sort_keys=True).encode('utf-8')
+        return hash_bytes(content)
+            
+    def scan_package_json(self, file_path: str, content: Union[str, bytes, Dict, None] = None, repo_url: str = None) -> List[Dict]:
+        """Scan package.json for compromised packages (from disk, or from content already in memory)"""
         findings = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                package_data = json.load(f)
+            package_data = self._load_json_content(file_path, content)
+                
+            # Resolve the repository once per manifest rather than once per dependency
+            if not repo_url:
+                repo_url = self.get_repo_url_from_path(file_path)
                 
             # Check direct dependencies
             for dep_type in ['dependencies', 'devDependencies', 'peerDependencies', 'optionalDependencies']:
@@ -1134,7 +1674,7 @@ additional_asset_tags = npm-project,dependency-scan
                             'type': dep_type,
                             'file': file_path,
                             'status': 'clean',  # Default to clean, will be updated if compromised
-                            'repo_url': self.get_repo_url_from_path(file_path) if hasattr(self, 'get_repo_url_from_path') else 'unknown'
+                            'repo_url': repo_url
                         }
                         self.all_scanned_libraries.append(library_info)
                         
@@ -1158,7 +1698,9 @@ additional_asset_tags = npm-project,dependency-scan
                             })
                         else:
                             # This is a clean library
-                            self.clean_libraries.append(library_info.copy())
+                            clean_library = library_info.copy()
+                            self.clean_libraries.append(clean_library)
+                            self._clean_libraries_by_file.setdefault(file_path, []).append(clean_library)
                             
                         # Log finding (for compromised packages only)
                         if is_compromised and severity == 'CRITICAL':
@@ -1193,125 +1735,175 @@ additional_asset_tags = npm-project,dependency-scan
             
         return findings
         
-    def scan_lock_file(self, file_path: str) -> List[Dict]:
+    def scan_lock_file(self, file_path: str, content: Union[str, bytes, Dict, None] = None) -> List[Dict]:
         """Scan package-lock.json or yarn.lock for compromised packages"""
         findings = []
         
         try:
             if file_path.endswith('package-lock.json'):
-                findings.extend(self._scan_package_lock(file_path))
+                findings.extend(self._scan_package_lock(file_path, content))
             elif file_path.endswith('yarn.lock'):
-                findings.extend(self._scan_yarn_lock(file_path))
+                findings.extend(self._scan_yarn_lock(file_path, content))
                 
         except Exception as e:
             self.log_finding('ERROR', f'Failed to scan lock file {file_path}: {str(e)}', file_path)
             
         return findings
         
-    def _scan_package_lock(self, file_path: str) -> List[Dict]:
-        """Scan package-lock.json specifically"""
-        findings = []
+    def _iter_lock_packages(self, file_path: str, content: Union[str, bytes, Dict, None]):
+        """Yield (path, version) for the "packages" map of a package-lock.json
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lock_data = json.load(f)
+        Lockfiles above LOCKFILE_STREAM_THRESHOLD are streamed entry by entry instead of
+        being loaded whole, keeping memory bounded for huge workspaces.
+        """
+        if isinstance(content, (str, bytes)):
+            size = len(content)
+        elif content is None:
+            size = os.path.getsize(file_path)
+        else:
+            size = 0
+            
+        if size > LOCKFILE_STREAM_THRESHOLD:
+            print(f"🌊 Streaming large lockfile ({size / (1024 * 1024):.0f} MB): {file_path}")
+            if content is None:
+                source = file_path
+            elif isinstance(content, bytes):
+                source = io.TextIOWrapper(io.BytesIO(content), encoding='utf-8')
+            else:
+                source = io.StringIO(content)
+            for package_path, _, version in iter_package_lock_entries(source, 'packages'):
+                yield package_path, version if version is not None else ''
+            return
             
-        # Check packages in lockfile v2/v3 format
+        lock_data = content if isinstance(content, dict) else json.loads(self._read_content_bytes(file_path, content))
         if 'packages' in lock_data:
             for package_path, package_info in lock_data['packages'].items():
-                if package_path.startswith('node_modules/'):
-                    # Handle scoped packages correctly
-                    path_parts = package_path.replace('node_modules/', '').split('/')
-                    if path_parts[0].startswith('@'):
-                        package_name = '/'.join(path_parts[:2])  # @scope/name
-                    else:
-                        package_name = path_parts[0]
-                        
-                    version = package_info.get('version', '')
-                    
-                    if version:
-                        # Check if package is compromised
-                        is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
-                        
-                        if is_compromised or (package_name in self.compromised_packages):
-                            findings.append({
-                                'package': package_name,
-                                'version': version,
-                                'file': file_path,
-                                'path': package_path,
-                                'severity': severity,
-                                'compromised_versions': compromised_versions
-                            })
-                            
-                            # Log finding
-                            if severity == 'CRITICAL':
-                                self.log_finding(
-                                    'CRITICAL',
-                                    f'Compromised package in lock file: {package_name}@{version}',
-                                    file_path,
-                                    {
-                                        'package': package_name, 
-                                        'version': version, 
-                                        'path': package_path,
-                                        'compromised_versions': compromised_versions
-                                    }
-                                )
-                                self.dependency_stats['compromised_packages_found'] += 1
-                            elif severity == 'INFO':
-                                self.log_finding(
-                                    'INFO',
-                                    f'Safe version in lock file: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
-                                    file_path,
-                                    {
-                                        'package': package_name,
-                                        'safe_version': version,
-                                        'compromised_versions': compromised_versions,
-                                        'path': package_path
-                                    }
-                                )
-                                self.dependency_stats['safe_packages_found'] += 1
-                                
+                yield package_path, package_info.get('version', '')
+                
+    def _iter_lock_dependencies(self, file_path: str, content: Union[str, bytes, Dict, None]):
+        """Yield (package_name, version, path) for every installed package of a package-lock.json that has a version"""
+        return _lock_dependency_entries(self._iter_lock_packages(file_path, content))
+        
+    def _monitored_lock_entries(self, file_path: str, content: Union[str, bytes, Dict, None]):
+        """(package_name, version, path) of the installed packages of a package-lock.json that are in the database
+        
+        Identical lockfiles are parsed once per run: the parse cache keeps this compact
+        list, never the parsed lockfile itself. Lockfiles above LOCKFILE_STREAM_THRESHOLD
+        and already parsed content are not cached.
+        """
+        index = self._compromise_index
+        if isinstance(content, (str, bytes)):
+            size = len(content)
+        elif content is None:
+            size = os.path.getsize(file_path)
+        else:
+            size = None
+        if size is None or size > LOCKFILE_STREAM_THRESHOLD:
+            return (entry for entry in self._iter_lock_dependencies(file_path, content) if entry[0] in index)
+            
+        data = self._read_content_bytes(file_path, content)
+        key = ('package-lock', git_blob_sha(data))
+        entries = self.parse_cache.get(key)
+        if entries is None:
+            entries = [entry for entry in self._iter_lock_dependencies(file_path, data) if entry[0] in index]
+            self.parse_cache.put(key, entries)
+        return entries
+            
+    def _scan_package_lock(self, file_path: str, content: Union[str, bytes, Dict, None] = None) -> List[Dict]:
+        """Scan package-lock.json specifically"""
+        findings = []
+        
+        # Check packages in lockfile v2/v3 format; only names in the database come back
+        lock_entries = self._take_lockfile_parse(file_path) if content is None else None
+        if lock_entries is None:
+            lock_entries = self._monitored_lock_entries(file_path, content)
+        for (package_name, version, package_path), (_, severity, compromised_versions) in self.check_packages_batch(lock_entries):
+            findings.append({
+                'package': package_name,
+                'version': version,
+                'file': file_path,
+                'path': package_path,
+                'severity': severity,
+                'compromised_versions': compromised_versions
+            })
+            
+            # Log finding
+            if severity == 'CRITICAL':
+                self.log_finding(
+                    'CRITICAL',
+                    f'Compromised package in lock file: {package_name}@{version}',
+                    file_path,
+                    {
+                        'package': package_name, 
+                        'version': version, 
+                        'path': package_path,
+                        'compromised_versions': compromised_versions
+                    }
+                )
+                self.dependency_stats['compromised_packages_found'] += 1
+            elif severity == 'INFO':
+                self.log_finding(
+                    'INFO',
+                    f'Safe version in lock file: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
+                    file_path,
+                    {
+                        'package': package_name,
+                        'safe_version': version,
+                        'compromised_versions': compromised_versions,
+                        'path': package_path
+                    }
+                )
+                self.dependency_stats['safe_packages_found'] += 1
+                
         return findings
 
-    def _scan_yarn_lock(self, file_path: str) -> List[Dict]:
+    def _scan_yarn_lock(self, file_path: str, content: Union[str, bytes, Dict, None] = None) -> List[Dict]:
         """Scan yarn.lock file"""
         findings = []
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Parse yarn.lock format for our compromised packages
-        all_packages = {**self.compromised_packages}
-        for pkg_name in self.potentially_compromised:
-            all_packages[pkg_name] = {"compromised_versions": [], "safe_version": "unknown"}
-            
-        for package_name, pkg_data in all_packages.items():
-            compromised_versions = pkg_data.get('compromised_versions', [])
-            
-            # Look for package entries in yarn.lock
-            escaped_name = re.escape(package_name)
-            
-            if compromised_versions:
-                # Check for specific compromised versions
-                for comp_version in compromised_versions:
-                    pattern = rf'^{escaped_name}@.*?:\s*\n(?:\s+.*\n)*?\s+version\s+"?{re.escape(comp_version)}"?'
-                    matches = re.findall(pattern, content, re.MULTILINE)
+        # Index the lockfile once (name -> every resolved version), then probe the compromise data
+        if content is None:
+            content = self._take_lockfile_parse(file_path)
+        if isinstance(content, dict):
+            # Already indexed: {package_name: [resolved_version, ...]}
+            yarn_index = content
+        else:
+            # Identical yarn.lock files are indexed once per run; only names in the database are kept
+            data = self._read_content_bytes(file_path, content)
+            key = ('yarn', git_blob_sha(data))
+            yarn_index = self.parse_cache.get(key)
+            if yarn_index is None:
+                yarn_index = {
+                    name: versions
+                    for name, versions in parse_yarn_lock_lines(data.decode('utf-8', errors='ignore').splitlines()).items()
+                    if name in self._compromise_index
+                }
+                self.parse_cache.put(key, yarn_index)
+        
+        for package_name, versions in yarn_index.items():
+            if package_name in self.potentially_compromised or package_name not in self.compromised_packages:
+                continue
+                
+            compromised_versions = self.compromised_packages[package_name].get('compromised_versions', [])
+            compromised_set = self._compromise_index[package_name][0]
+            
+            for version in versions:
+                if version in compromised_set:
+                    findings.append({
+                        'package': package_name,
+                        'version': version,
+                        'file': file_path,
+                        'severity': 'CRITICAL',
+                        'compromised_versions': compromised_versions
+                    })
                     
-                    if matches:
-                        findings.append({
-                            'package': package_name,
-                            'version': comp_version,
-                            'file': file_path,
-                            'severity': 'CRITICAL',
-                            'compromised_versions': compromised_versions
-                        })
-                        
-                        self.log_finding(
-                            'CRITICAL',
-                            f'Compromised package in yarn.lock: {package_name}@{comp_version}',
-                            file_path,
-                            {'package': package_name, 'version': comp_version}
-                        )
-                        self.dependency_stats['compromised_packages_found'] += 1
+                    self.log_finding(
+                        'CRITICAL',
+                        f'Compromised package in yarn.lock: {package_name}@{version}',
+                        file_path,
+                        {'package': package_name, 'version': version}
+                    )
+                    self.dependency_stats['compromised_packages_found'] += 1
                         
         return findings
 
@@ -1331,7 +1923,8 @@ additional_asset_tags = npm-project,dependency-scan
                 
             parts = path.split('/')
             if len(parts) >= 2:
-                return parts[0], parts[1]
+                repo = parts[1][:-4] if parts[1].endswith('.git') else parts[1]
+                return parts[0], repo
                 
         except Exception as e:
             print(f"⚠️  Error parsing GitHub URL {repo_url}: {str(e)}")
@@ -1380,7 +1973,7 @@ additional_asset_tags = npm-project,dependency-scan
                 # Fetch user's repositories (owned)
                 url = f"https://api.github.com/user/repos?page={page}&per_page={per_page}&affiliation=owner,collaborator,organization_member"
                 
-                response = requests.get(url, headers=headers, timeout=30)
+                response = self._github_get(url, headers=headers, timeout=30)
                 
                 if response.status_code != 200:
                     print(f"⚠️  GitHub API error: {response.status_code}")
@@ -1397,6 +1990,10 @@ additional_asset_tags = npm-project,dependency-scan
                     repo_name = repo.get('full_name')
                     repo_private = repo.get('private', False)
                     
+                    if self.skip_archived and repo.get('archived'):
+                        print(f"  ⏭️  Skipping archived: {repo_name}")
+                        continue
+                        
                     if repo_url:
                         repositories.append(repo_url)
                         print(f"  ✓ Found: {repo_name} {'🔒 (private)' if repo_private else '🌐 (public)'}")
@@ -1416,12 +2013,135 @@ additional_asset_tags = npm-project,dependency-scan
         
         return repositories
         
-    def find_npm_files_in_repo(self, owner: str, repo: str) -> List[Dict]:
+    def fetch_repository_inventory(self) -> List[str]:
+        """Fetch all repositories the authenticated user has access to with batched GraphQL queries
+        
+        Each query returns 100 repositories with their default branch, archived/fork flags,
+        last push and the commit and root tree OID of the default branch. The metadata is kept
+        in repository_inventory, so light scans list the exact commit and incremental runs can
+        skip repositories whose tree is unchanged before any clone or download.
+        
+        Returns:
+            List of repository URLs (HTTPS clone format, as returned by fetch_all_user_repositories)
+        """
+        repositories = []
+        
+        if not self.github_token or self.github_token == 'your_github_token_here':
+            print("❌ GitHub token required for --pull-all feature")
+            print("💡 Set GITHUB_TOKEN environment variable or configure in .config file")
+            return repositories
+            
+        print("🔍 Fetching repository inventory from GitHub (GraphQL)...")
+        
+        headers = self.get_github_api_headers(use_auth=True)
+        cursor = None
+        archived = 0
+        queries = 0
+        
+        try:
+            while True:
+                response = self._github_request('POST', 'https://api.github.com/graphql', headers=headers,
+                                                json_body={'query': self.GRAPHQL_INVENTORY_QUERY,
+                                                           'variables': {'cursor': cursor}},
+                                                timeout=60)
+                queries += 1
+                
+                if response.status_code != 200:
+                    print(f"⚠️  GitHub GraphQL API error: {response.status_code}")
+                    break
+                    
+                data = response.json()
+                if data.get('errors'):
+                    print(f"⚠️  GitHub GraphQL API error: {data['errors'][0].get('message', 'Unknown error')}")
+                    if not data.get('data'):
+                        break
+                        
+                connection = ((data.get('data') or {}).get('viewer') or {}).get('repositories') or {}
+                for node in connection.get('nodes') or []:
+                    if not node:
+                        continue
+                    repo_url = f"{node['url']}.git"  # same form as the REST clone_url
+                    branch = node.get('defaultBranchRef') or {}
+                    target = branch.get('target') or {}
+                    
+                    if node.get('isArchived'):
+                        archived += 1
+                        if self.skip_archived:
+                            print(f"  ⏭️  Skipping archived: {node['nameWithOwner']}")
+                            continue
+                            
+                    self.repository_inventory[repo_url] = {
+                        'name': node['nameWithOwner'],
+                        'default_branch': branch.get('name'),
+                        'commit_oid': target.get('oid'),
+                        'tree_oid': (target.get('tree') or {}).get('oid'),
+                        'archived': node.get('isArchived', False),
+                        'fork': node.get('isFork', False),
+                        'pushed_at': node.get('pushedAt')
+                    }
+                    repositories.append(repo_url)
+                    
+                page_info = connection.get('pageInfo') or {}
+                if not page_info.get('hasNextPage'):
+                    break
+                cursor = page_info.get('endCursor')
+                
+            forks = sum(1 for info in self.repository_inventory.values() if info['fork'])
+            print(f"\n✅ Found {len(repositories)} repositories in {queries} GraphQL quer{'y' if queries == 1 else 'ies'} "
+                  f"({forks} fork(s), {archived} archived{' skipped' if self.skip_archived else ''})")
+            
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching repository inventory from GitHub: {str(e)}")
+        except Exception as e:
+            print(f"❌ Unexpected error: {str(e)}")
+            
+        return repositories
+        
+    def _inventory_ref(self, repo_url: str) -> str:
+        """Git ref to list for a repository: the inventoried default branch commit, else HEAD"""
+        info = self.repository_inventory.get(repo_url) or {}
+        return info.get('commit_oid') or info.get('default_branch') or 'HEAD'
+        
+    def _repository_unchanged(self, repo_url: str) -> bool:
+        """Whether an incremental run already scanned the inventoried root tree of a repository"""
+        info = self.repository_inventory.get(repo_url)
+        if not self.scan_state or not info or not info.get('tree_oid'):
+            return False
+        previous = self.scan_state.get_repo(repo_url)
+        return bool(previous and previous.get('tree_oid') == info['tree_oid'])
+        
+    def _replay_repository(self, repo_url: str) -> List[Dict]:
+        """Replay the stored results of every package file of an unchanged repository"""
+        deltas = self.scan_state.get_repo_files(repo_url)
+        tree_oid = self.repository_inventory[repo_url]['tree_oid']
+        print(f"♻️  {repo_url} unchanged since last scan (tree {tree_oid[:12]}) - replaying {len(deltas)} file(s)")
+        
+        assets = []
+        for asset_path, delta in deltas.items():
+            asset = self._replay_file_delta(delta, delta.get('file_path') or asset_path, repo_url)
+            if asset:
+                assets.append(asset)
+        return assets
+        
+    def _record_repository_tree(self, repo_url: str, asset_paths: List[str]):
+        """After a complete scan, store the inventoried tree of a repository and drop files no longer in it"""
+        info = self.repository_inventory.get(repo_url)
+        if not self.scan_state or not info or not info.get('tree_oid'):
+            return
+        self.scan_state.retain_repo_files(repo_url, asset_paths)
+        self.scan_state.set_repo(repo_url, commit_sha=info.get('commit_oid'), tree_oid=info['tree_oid'])
+        
+    def find_npm_files_in_repo(self, owner: str, repo: str, ref: str = 'HEAD') -> List[Dict]:
         """Find NPM package files in a GitHub repository using API"""
         npm_files = []
         
         try:
-            # Try GitHub API search first
+            # One recursive tree listing of the default branch finds every manifest and lockfile
+            tree_files = self._list_repository_tree(owner, repo, ref) if self.discovery_mode == 'trees' else None
+            if tree_files is not None:
+                return tree_files
+                
+            # Try GitHub API search
             npm_files = self._search_github_api(owner, repo)
             
             # If API search failed, try GitHub API fallback method for public repos
@@ -1461,6 +2181,64 @@ additional_asset_tags = npm-project,dependency-scan
             
         return npm_files
         
+    def _list_repository_tree(self, owner: str, repo: str, ref: str = 'HEAD') -> Optional[List[Dict]]:
+        """Discover NPM files with a single recursive git trees request
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit to list; HEAD resolves to the default branch
+            
+        Returns:
+            NPM files found (possibly empty), or None if the listing failed or was
+            truncated and code search should be used instead
+        """
+        use_auth = self.github_token and self.github_token != 'your_github_token_here'
+        url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{quote(ref, safe='')}"
+        
+        try:
+            response = self._github_get(url, headers=self.get_github_api_headers(use_auth=use_auth),
+                                             params={'recursive': '1'}, timeout=30)
+            if response.status_code == 401 and use_auth:
+                print(f"⚠️  GitHub API authentication failed, listing tree without authentication...")
+                response = self._github_get(url, headers=self.get_github_api_headers(use_auth=False),
+                                                 params={'recursive': '1'}, timeout=30)
+                
+            if response.status_code != 200:
+                print(f"⚠️  GitHub tree listing failed for {owner}/{repo}: {response.status_code}, falling back to code search")
+                return None
+                
+            data = response.json()
+            if data.get('truncated'):
+                print(f"⚠️  GitHub tree listing truncated for {owner}/{repo}, falling back to code search")
+                return None
+                
+        except Exception as e:
+            print(f"⚠️  Error listing tree for {owner}/{repo}: {str(e)}, falling back to code search")
+            return None
+            
+        npm_files = []
+        for entry in data.get('tree', []):
+            if entry.get('type') != 'blob':
+                continue
+            path = entry['path']
+            name = path.rsplit('/', 1)[-1]
+            if name not in self.NPM_DISCOVERY_FILES:
+                continue
+            # No download_url: files are fetched through the authenticated git blobs API (`url`),
+            # since raw.githubusercontent.com is requested without a token and 404s on private repos
+            npm_files.append({
+                'name': name,
+                'path': path,
+                'sha': entry.get('sha'),
+                'size': entry.get('size'),
+                'url': entry.get('url'),
+                'type': self._get_file_type(name)
+            })
+            
+        print(f"🌳 Tree listing found {len(npm_files)} NPM file(s) in {owner}/{repo}")
+        return npm_files
+        
     def _search_github_api(self, owner: str, repo: str) -> List[Dict]:
         """Search for NPM files using GitHub API with authentication fallback"""
         npm_files = []
@@ -1485,7 +2263,7 @@ additional_asset_tags = npm-project,dependency-scan
                 'per_page': 100
             }
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self._github_get(url, headers=headers, params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -1495,6 +2273,7 @@ additional_asset_tags = npm-project,dependency-scan
                         'path': item['path'],
                         'download_url': item.get('download_url'),
                         'url': item['url'],
+                        'sha': item.get('sha'),
                         'type': self._get_file_type(item['name'])
                     })
             elif response.status_code == 401 and use_auth:
@@ -1528,7 +2307,7 @@ additional_asset_tags = npm-project,dependency-scan
                     'per_page': 100
                 }
                 
-                response = requests.get(url, headers=headers_no_auth, params=params, timeout=30)
+                response = self._github_get(url, headers=headers_no_auth, params=params, timeout=30)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -1538,6 +2317,7 @@ additional_asset_tags = npm-project,dependency-scan
                             'path': item['path'],
                             'download_url': item.get('download_url'),
                             'url': item['url'],
+                            'sha': item.get('sha'),
                             'type': self._get_file_type(item['name'])
                         })
                 elif response.status_code == 403:
@@ -1574,7 +2354,7 @@ additional_asset_tags = npm-project,dependency-scan
         for path in common_paths:
             try:
                 url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-                response = requests.get(url, headers=headers, timeout=10)
+                response = self._github_get(url, headers=headers, timeout=10)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -1583,6 +2363,7 @@ additional_asset_tags = npm-project,dependency-scan
                         'path': data['path'],
                         'download_url': data.get('download_url'),
                         'url': data['url'],
+                        'sha': data.get('sha'),
                         'type': self._get_file_type(data['name'])
                     })
                     print(f"✅ Found {path}")
@@ -1601,14 +2382,15 @@ additional_asset_tags = npm-project,dependency-scan
             'yarn.lock'
         ]
         
-        base_url = f"https://raw.githubusercontent.com/{owner}/{repo}/master"
+        # HEAD resolves to the default branch (main, master, ...)
+        base_url = f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD"
         
         print(f"🔄 Fallback: Trying direct raw GitHub access for {owner}/{repo}")
         
         for filename in common_files:
             try:
                 file_url = f"{base_url}/{filename}"
-                response = requests.get(file_url, timeout=10)
+                response = self._github_get(file_url, timeout=10)
                 
                 if response.status_code == 200:
                     # Verify it's actually JSON/text content (not HTML error page)
@@ -1655,72 +2437,95 @@ additional_asset_tags = npm-project,dependency-scan
             
     def download_npm_file(self, file_info: Dict, repo_url: str, temp_dir: str) -> Optional[str]:
         """Download a single NPM file from GitHub"""
+        content = self.fetch_npm_file_content(file_info)
+        if content is None:
+            return None
+        return self._write_npm_file(file_info, content, temp_dir)
+        
+    def _write_npm_file(self, file_info: Dict, content: bytes, target_dir: str) -> Optional[str]:
+        """Write downloaded NPM file content below target_dir, keeping its repository path"""
+        try:
+            file_path = os.path.join(target_dir, file_info['path'])
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            
+            with open(file_path, 'wb') as f:
+                f.write(content)
+                
+            return file_path
+            
+        except Exception as e:
+            print(f"❌ Error saving content for {file_info['path']}: {str(e)}")
+            return None
+            
+    def fetch_npm_file_content(self, file_info: Dict) -> Optional[bytes]:
+        """Fetch the raw bytes of a single NPM file from GitHub without touching the filesystem"""
         
         # If we have direct content (from raw GitHub access), use it directly
         if 'content' in file_info:
-            try:
-                # Create file path
-                file_path = os.path.join(temp_dir, file_info['path'])
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                
-                # Write content to file
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(file_info['content'])
-                    
-                print(f"✅ Direct content saved: {file_info['path']}")
-                return file_path
+            return file_info['content'].encode('utf-8')
+            
+        # Content-addressed: a blob already downloaded (any repo, any run) is served from disk
+        if self.blob_cache and file_info.get('sha'):
+            cached = self.blob_cache.get(file_info['sha'])
+            if cached is not None:
+                return cached
                 
-            except Exception as e:
-                print(f"❌ Error saving direct content for {file_info['path']}: {str(e)}")
-                return None
-        
+        content = self._download_npm_file_content(file_info)
+        if content is not None and self.blob_cache:
+            # Key by the SHA of what was actually received (the branch may have moved since discovery)
+            self.blob_cache.put(git_blob_sha(content), content)
+        return content
+        
+    def _download_npm_file_content(self, file_info: Dict) -> Optional[bytes]:
+        """Download the raw bytes of a single NPM file from GitHub, with retries"""
         # Original download logic for API-based files
         max_retries = 3
         timeout = 15  # Reduced timeout
         
         for attempt in range(max_retries):
+            response = None
             try:
                 if file_info.get('download_url'):
                     # Use direct download URL if available
-                    response = requests.get(file_info['download_url'], timeout=timeout)
+                    response = self._github_get(file_info['download_url'], timeout=timeout)
                 else:
                     # Use GitHub API to get file content
                     headers = self.get_github_api_headers()
-                    response = requests.get(file_info['url'], headers=headers, timeout=timeout)
+                    response = self._github_get(file_info['url'], headers=headers, timeout=timeout)
                 
                 if response.status_code == 200:
-                    # Check if response is JSON (API response) or direct text
-                    try:
-                        content_data = response.json()
-                        if content_data.get('encoding') == 'base64':
-                            content = base64.b64decode(content_data['content']).decode('utf-8')
-                        else:
-                            content = content_data.get('content', '')
-                    except:
-                        # Direct text response
-                        content = response.text
+                    if file_info.get('download_url'):
+                        # Raw download: the body is the file itself (a package.json is JSON too,
+                        # so it must not be mistaken for a contents API envelope)
+                        content = response.content
+                    else:
+                        # Contents API response: base64-encoded file in a JSON envelope
+                        try:
+                            content_data = response.json()
+                            if content_data.get('encoding') == 'base64':
+                                content = base64.b64decode(content_data['content'])
+                            else:
+                                content = content_data.get('content', '').encode('utf-8')
+                        except (ValueError, AttributeError):
+                            content = response.content
                         
                     # Validate content is not empty
-                    if not content or content.strip() == '':
+                    if not content or not content.strip():
                         if attempt < max_retries - 1:
                             print(f"⚠️  Empty content on attempt {attempt + 1} for {file_info['path']}, retrying...")
+                            self._retry_backoff(file_info, response, attempt)
                             continue
                         else:
                             print(f"❌ Empty content for {file_info['path']} after {max_retries} attempts")
                             return None
                         
-                    # Create file path
-                    file_path = os.path.join(temp_dir, file_info['path'])
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    
-                    # Write content to file
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                        
-                    return file_path
+                    return content
                 else:
                     if attempt < max_retries - 1:
                         print(f"⚠️  Download attempt {attempt + 1} failed for {file_info['path']}: {response.status_code}, retrying...")
+                        if not self._retry_backoff(file_info, response, attempt):
+                            print(f"❌ Failed to download {file_info['path']}: {response.status_code}")
+                            return None
                         continue
                     else:
                         print(f"❌ Failed to download {file_info['path']}: {response.status_code}")
@@ -1728,6 +2533,7 @@ additional_asset_tags = npm-project,dependency-scan
             except requests.exceptions.Timeout:
                 if attempt < max_retries - 1:
                     print(f"⚠️  Timeout on attempt {attempt + 1} for {file_info['path']}, retrying...")
+                    self._retry_backoff(file_info, None, attempt)
                     continue
                 else:
                     print(f"❌ Download timeout for {file_info['path']} after {max_retries} attempts")
@@ -1735,69 +2541,116 @@ additional_asset_tags = npm-project,dependency-scan
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"⚠️  Error on attempt {attempt + 1} for {file_info['path']}: {str(e)}, retrying...")
+                    self._retry_backoff(file_info, None, attempt)
                     continue
                 else:
                     print(f"❌ Error downloading {file_info['path']}: {str(e)}")
                     
         return None
         
+    def _retry_backoff(self, file_info: Dict, response: Optional[requests.Response], attempt: int) -> bool:
+        """Wait before retrying a file download (rate limit reset or exponential backoff); False if not worth retrying"""
+        if response is not None and response.status_code == 404:
+            # Missing files do not appear by waiting
+            return False
+        url = file_info.get('download_url') or file_info.get('url') or ''
+        delay = self.rate_limiter.retry_delay(None, github_resource_for_url(url), response, attempt)
+        if delay is None:
+            return False
+        self.rate_limiter.note_wait(delay)
+        time.sleep(delay)
+        return True
+        
     def light_scan_repository(self, repo_url: str) -> List[Dict]:
         """Perform light scan of repository (NPM files only)"""
-        assets = []
+        fetched = self._fetch_light_scan_files(repo_url)
+        if not fetched:
+            return []
+        return self._process_light_scan_files(fetched)
         
+    def _fetch_light_scan_files(self, repo_url: str) -> Optional[Dict]:
+        """Find and download the NPM files of a repository into memory (I/O only, no scanning)"""
         print(f"🔍 Light scanning repository: {repo_url}")
         
         # Parse GitHub URL
         owner, repo = self.parse_github_url(repo_url)
         if not owner or not repo:
             print(f"❌ Could not parse GitHub URL: {repo_url}")
-            return assets
+            return None
             
         # Find NPM files in repository
-        npm_files = self.find_npm_files_in_repo(owner, repo)
+        npm_files = self.find_npm_files_in_repo(owner, repo, self._inventory_ref(repo_url))
         if not npm_files:
             print(f"📦 No NPM files found in {owner}/{repo}")
-            return assets
+            return None
             
         print(f"📁 Found {len(npm_files)} NPM file(s) in {owner}/{repo}")
         
-        # Create directory for downloaded files
-        if self.organize_folders:
-            # Use organized folder structure
-            repo_dir = os.path.join(self.github_pull_dir, repo)
-            os.makedirs(repo_dir, exist_ok=True)
-            temp_dir = repo_dir
-            cleanup_temp = False  # Don't cleanup organized folders
-        else:
-            # Use temporary directory (original behavior)
-            temp_dir = tempfile.mkdtemp(prefix=f"light_scan_{repo}_")
-            cleanup_temp = True
+        downloaded = []
+        for file_info in npm_files:
+            if self._blob_already_scanned(repo_url, file_info):
+                # Unchanged blob: results are replayed from the scan state, no download needed
+                downloaded.append((file_info, None))
+                continue
+                
+            print(f"📥 Downloading {file_info['path']}")
+            
+            content = self.fetch_npm_file_content(file_info)
+            if content is not None:
+                downloaded.append((file_info, content))
+                
+        return {
+            'repo_url': repo_url,
+            'files': downloaded,
+            'complete': len(downloaded) == len(npm_files)
+        }
         
-        try:
-            # Download and process each NPM file
-            for file_info in npm_files:
-                print(f"📥 Downloading {file_info['path']}")
-                
-                file_path = self.download_npm_file(file_info, repo_url, temp_dir)
-                if file_path:
-                    # Process the file - pass original repository path for Phoenix asset
-                    original_repo_path = file_info['path']  # This is the path within the repository
-                    asset = self.process_package_file(file_path, repo_url, original_repo_path)
+    def _process_light_scan_files(self, fetched: Dict) -> List[Dict]:
+        """Scan the files downloaded by _fetch_light_scan_files"""
+        assets = self.process_downloaded_files(fetched['repo_url'], fetched['files'])
+        if fetched.get('complete'):
+            self._record_repository_tree(fetched['repo_url'], [file_info['path'] for file_info, _ in fetched['files']])
+        return assets
+        
+    def process_downloaded_files(self, repo_url: str, downloaded: List[Tuple[Dict, bytes]]) -> List[Dict]:
+        """Scan NPM files whose content was downloaded into memory (no temp files)"""
+        assets = []
+        
+        # Keeping a copy on disk is opt-in (--organize-folders); scanning never needs it
+        if self.save_light_scan_files and downloaded:
+            _, repo = self.parse_github_url(repo_url)
+            repo_dir = os.path.join(self.github_pull_dir, repo or 'unknown')
+            for file_info, content in downloaded:
+                self._write_npm_file(file_info, content, repo_dir)
+            print(f"📁 Repository files saved to: {repo_dir}")
+            
+        for file_info, content in downloaded:
+            # Name the file by its GitHub location; the scan reads only the in-memory content
+            source_path = f"{repo_url.rstrip('/')}/blob/HEAD/{file_info['path']}"
+            blob_sha = file_info.get('sha')
+            
+            if content is None:
+                # Skipped at fetch time because this blob was scanned on a previous run
+                delta = self.scan_state.get_file_by_blob(repo_url, file_info['path'], blob_sha) if self.scan_state else None
+                if delta is not None:
+                    asset = self._replay_file_delta(delta, source_path, repo_url)
                     if asset:
                         assets.append(asset)
-                        
-        finally:
-            # Clean up temporary directory only if not using organized folders
-            if cleanup_temp:
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"⚠️  Could not clean up temp directory {temp_dir}: {str(e)}")
-            else:
-                print(f"📁 Repository files saved to: {temp_dir}")
-                
+                    continue
+                content = self.fetch_npm_file_content(file_info)
+                if content is None:
+                    continue
+                    
+            asset = self.process_package_file(source_path, repo_url, file_info['path'], content=content, blob_sha=blob_sha)
+            if asset:
+                assets.append(asset)
         return assets
         
+    def _blob_already_scanned(self, repo_url: str, file_info: Dict) -> bool:
+        """Whether an incremental run already holds results for this file's git blob"""
+        return bool(self.scan_state and file_info.get('sha') and
+                    self.scan_state.has_blob(repo_url, file_info['path'], file_info['sha']))
+        
     def process_folder_list(self, folder_list_file: str) -> List[Dict]:
         """Process multiple local folders from a list file"""
         assets = []
@@ -1832,6 +2685,7 @@ additional_asset_tags = npm-project,dependency-scan
                     print(f"📦 No NPM files found in {folder_path}")
                     continue
                     
+                self.start_lockfile_parsing(package_files)
                 for package_file in package_files:
                     # Get repository URL for this local folder
                     repo_url = self.get_repo_url_from_path(str(package_file.parent))
@@ -1870,6 +2724,7 @@ additional_asset_tags = npm-project,dependency-scan
                 print(f"📦 No NPM files found in {folder_path}")
                 continue
                 
+            self.start_lockfile_parsing(package_files)
             for package_file in package_files:
                 # Get repository URL for this local folder
                 repo_url = self.get_repo_url_from_path(str(package_file.parent))
@@ -1893,32 +2748,145 @@ additional_asset_tags = npm-project,dependency-scan
                 
             print(f"📋 Processing {len(repos)} repositories from {repo_list_file}")
             
-            for repo_url in repos:
-                print(f"\n🔄 Processing repository: {repo_url}")
-                
-                if self.light_scan_mode:
-                    # Light scan mode - download only NPM files
-                    repo_assets = self.light_scan_repository(repo_url)
-                    assets.extend(repo_assets)
-                else:
-                    # Full scan mode - clone or find the repository
-                    repo_path = self._get_or_clone_repository(repo_url)
-                    
-                    if repo_path:
-                        # Find package files in the repository
-                        package_files = []
-                        for pattern in ['package.json', 'package-lock.json']:
-                            package_files.extend(Path(repo_path).rglob(pattern))
-                            
-                        for package_file in package_files:
-                            asset = self.process_package_file(str(package_file), repo_url)
-                            assets.append(asset)
+            assets = self.process_repositories(repos)
                         
         except Exception as e:
             print(f"❌ Error processing repository list: {str(e)}")
             
         return assets
         
+    def process_repositories(self, repo_urls: List[str], show_banner: bool = False) -> List[Dict]:
+        """Fetch and scan repositories, overlapping fetches with scanning when workers > 1
+        
+        Fetching (clone, API discovery, downloads) runs on a bounded thread pool while
+        the main thread scans already-fetched repositories. Scanning and the merge of
+        tracking data happen in input order, so assets and reports are deterministic.
+        """
+        assets = []
+        total = len(repo_urls)
+        
+        def announce(index: int, repo_url: str):
+            if show_banner:
+                print(f"\n{'='*80}")
+                print(f"🔄 Repository {index}/{total}: {repo_url}")
+                print(f"{'='*80}\n")
+            else:
+                print(f"\n🔄 Processing repository: {repo_url}")
+        
+        if self.light_scan_mode and self.async_light_scan:
+            engine = AsyncLightScanEngine(self, self.max_concurrency, self.rate_limit)
+            return engine.scan(repo_urls, announce)
+            
+        if self.workers <= 1:
+            for i, repo_url in enumerate(repo_urls, 1):
+                announce(i, repo_url)
+                fetched = self._fetch_repository(repo_url)
+                assets.extend(self._process_fetched_repository(fetched))
+            return assets
+            
+        print(f"⚡ Fetching up to {self.workers} repositories in parallel")
+        
+        # Keep at most 2x workers fetched-but-unscanned repositories in flight
+        max_pending = self.workers * 2
+        pending = deque()
+        repo_iter = iter(enumerate(repo_urls, 1))
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            def submit_next() -> bool:
+                try:
+                    i, repo_url = next(repo_iter)
+                except StopIteration:
+                    return False
+                worker = self._fetch_worker()
+                pending.append((i, repo_url, worker, executor.submit(worker._fetch_repository, repo_url)))
+                return True
+                
+            while len(pending) < max_pending and submit_next():
+                pass
+                
+            while pending:
+                i, repo_url, worker, future = pending.popleft()
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    print(f"❌ Error fetching repository {repo_url}: {str(e)}")
+                    fetched = None
+                submit_next()
+                
+                announce(i, repo_url)
+                self._merge_fetch_tracking(worker)
+                if fetched:
+                    assets.extend(self._process_fetched_repository(fetched))
+                    
+        return assets
+        
+    def _fetch_worker(self) -> 'EnhancedNPMCompromiseDetectorPhoenix':
+        """Shallow copy of the detector with private fetch-tracking lists for a pool thread"""
+        worker = copy.copy(self)
+        for attr in self.FETCH_TRACKING_ATTRS:
+            setattr(worker, attr, [])
+        return worker
+        
+    def _merge_fetch_tracking(self, worker: 'EnhancedNPMCompromiseDetectorPhoenix'):
+        """Append the tracking data gathered by a fetch worker"""
+        for attr in self.FETCH_TRACKING_ATTRS:
+            getattr(self, attr).extend(getattr(worker, attr))
+            
+    def _fetch_repository(self, repo_url: str) -> Optional[Dict]:
+        """Fetch stage: clone/locate or download a repository and discover its package files"""
+        if self._repository_unchanged(repo_url):
+            # Inventoried tree already scanned: nothing to clone or download
+            return {'mode': 'unchanged', 'repo_url': repo_url}
+            
+        if self.light_scan_mode:
+            # Light scan mode - download only NPM files
+            fetched = self._fetch_light_scan_files(repo_url)
+            if fetched:
+                fetched['mode'] = 'light'
+            return fetched
+            
+        # Full scan mode - clone or find the repository
+        repo_path = self._get_or_clone_repository(repo_url)
+        if not repo_path:
+            print(f"⚠️  Failed to clone repository: {repo_url}")
+            return None
+            
+        # Find package files in the repository
+        package_files = []
+        for pattern in ['package.json', 'package-lock.json']:
+            package_files.extend(Path(repo_path).rglob(pattern))
+            
+        return {
+            'mode': 'full',
+            'repo_url': repo_url,
+            'repo_path': repo_path,
+            'package_files': package_files
+        }
+        
+    def _process_fetched_repository(self, fetched: Optional[Dict]) -> List[Dict]:
+        """Scan stage: process the package files of a fetched repository"""
+        if not fetched:
+            return []
+            
+        if fetched['mode'] == 'unchanged':
+            return self._replay_repository(fetched['repo_url'])
+            
+        if fetched['mode'] == 'light':
+            return self._process_light_scan_files(fetched)
+            
+        assets = []
+        self.start_lockfile_parsing(fetched['package_files'])
+        for package_file in fetched['package_files']:
+            asset = self.process_package_file(str(package_file), fetched['repo_url'])
+            assets.append(asset)
+            
+        # A reused local checkout may be behind the inventoried commit
+        info = self.repository_inventory.get(fetched['repo_url'])
+        if info and read_head_commit(fetched['repo_path']) == info.get('commit_oid'):
+            self._record_repository_tree(fetched['repo_url'], [self._state_asset_path(str(package_file), fetched['repo_url'])
+                                                               for package_file in fetched['package_files']])
+        return assets
+        
     def _get_or_clone_repository(self, repo_url: str) -> Optional[str]:
         """Get local path for repository, clone if necessary"""
         # Extract repository name from URL
@@ -1971,6 +2939,31 @@ additional_asset_tags = npm-project,dependency-scan
             clone_path = os.path.join(self.github_pull_dir, repo_name)
             os.makedirs(os.path.dirname(clone_path), exist_ok=True)
             
+        cloned = False
+        if self.sparse_clone:
+            cloned = self._sparse_clone_repository(repo_url, clone_path)
+            if not cloned:
+                print(f"🔄 Sparse clone failed, falling back to full clone")
+                
+        if not cloned:
+            cloned = self._full_clone_repository(repo_url, clone_path)
+            
+        if cloned:
+            # Lookups made before the clone existed may have cached "no checkout here"
+            clear_git_caches()
+            # Track cloned repository
+            self.cloned_repositories.append({
+                'url': repo_url,
+                'name': repo_name,
+                'local_path': clone_path,
+                'source': 'organized_folder' if self.organize_folders else 'tmp_folder'
+            })
+            return clone_path
+            
+        return None
+        
+    def _full_clone_repository(self, repo_url: str, clone_path: str) -> bool:
+        """Clone the complete repository"""
         try:
             print(f"📥 Cloning repository to {clone_path}")
             result = subprocess.run(
@@ -1982,21 +2975,50 @@ additional_asset_tags = npm-project,dependency-scan
             
             if result.returncode == 0:
                 print(f"✅ Successfully cloned repository")
-                # Track cloned repository
-                self.cloned_repositories.append({
-                    'url': repo_url,
-                    'name': repo_name,
-                    'local_path': clone_path,
-                    'source': 'organized_folder' if self.organize_folders else 'tmp_folder'
-                })
-                return clone_path
+                return True
             else:
                 print(f"❌ Failed to clone repository: {result.stderr}")
                 
         except Exception as e:
             print(f"❌ Error cloning repository: {str(e)}")
             
-        return None
+        return False
+        
+    def _sparse_clone_repository(self, repo_url: str, clone_path: str) -> bool:
+        """Clone only HEAD (depth 1, no blobs up front) and check out package manifests and lockfiles"""
+        def run_git(*git_args) -> bool:
+            result = subprocess.run(
+                ['git', *git_args],
+                capture_output=True,
+                text=True,
+                timeout=300
+            )
+            if result.returncode != 0:
+                print(f"⚠️  git {git_args[0] if git_args[0] != '-C' else git_args[2]} failed: {result.stderr.strip()}")
+                return False
+            return True
+            
+        try:
+            print(f"📥 Sparse cloning repository to {clone_path}")
+            if run_git('clone', '--depth', '1', '--filter=blob:none', '--no-checkout', repo_url, clone_path) and \
+                    run_git('-C', clone_path, 'config', 'core.sparseCheckout', 'true'):
+                info_dir = os.path.join(clone_path, '.git', 'info')
+                os.makedirs(info_dir, exist_ok=True)
+                with open(os.path.join(info_dir, 'sparse-checkout'), 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(self.SPARSE_CHECKOUT_PATTERNS) + '\n')
+                    
+                # Blobs for the matching paths are fetched on demand by the checkout
+                if run_git('-C', clone_path, 'checkout'):
+                    print(f"✅ Successfully sparse cloned repository")
+                    return True
+                    
+        except Exception as e:
+            print(f"⚠️  Error during sparse clone: {str(e)}")
+            
+        # Remove the partial clone so the full clone starts from an empty directory
+        if os.path.exists(clone_path):
+            shutil.rmtree(clone_path, ignore_errors=True)
+        return False
 
     def generate_report(self, output_file: str = None) -> str:
         """Generate a comprehensive security report"""
@@ -2039,6 +3061,18 @@ additional_asset_tags = npm-project,dependency-scan
             if self.completely_failed_repositories:
                 report_lines.append(f"Complete failures: {len(self.completely_failed_repositories)} repositories")
             
+        # GitHub rate limit scheduling statistics
+        rate_stats = self.rate_limiter.summary()
+        if rate_stats['requests']:
+            report_lines.append("")
+            report_lines.append("GITHUB RATE LIMIT SUMMARY:")
+            report_lines.append("-" * 26)
+            report_lines.append(f"API requests: {rate_stats['requests']} (tokens: {max(1, rate_stats['tokens'])})")
+            if rate_stats['not_modified']:
+                report_lines.append(f"Not modified (304, not charged): {rate_stats['not_modified']}")
+            report_lines.append(f"Rate limit rejections: {rate_stats['rate_limited']}")
+            report_lines.append(f"Queue wait: {rate_stats['wait_seconds']:.1f}s total, {rate_stats['max_wait_seconds']:.1f}s longest")
+            
         # Detailed scan information
         if self.scanned_files:
             report_lines.append("")
@@ -2140,11 +3174,7 @@ additional_asset_tags = npm-project,dependency-scan
                     file_path = lib.get('file', 'unknown')
                     
                     # Extract repository URL from findings or try to determine from file path
-                    repo_url = None
-                    for finding in self.findings:
-                        if finding.get('file') == file_path:
-                            repo_url = finding.get('repo_url')
-                            break
+                    repo_url = self.get_finding_repo_url(file_path)
                     
                     if not repo_url:
                         repo_url = self.get_repo_url_from_path(file_path)
@@ -2181,11 +3211,7 @@ additional_asset_tags = npm-project,dependency-scan
                     file_path = lib.get('file', 'unknown')
                     
                     # Extract repository URL from findings or try to determine from file path
-                    repo_url = None
-                    for finding in self.findings:
-                        if finding.get('file') == file_path:
-                            repo_url = finding.get('repo_url')
-                            break
+                    repo_url = self.get_finding_repo_url(file_path)
                     
                     if not repo_url:
                         repo_url = self.get_repo_url_from_path(file_path)
@@ -2339,6 +3365,110 @@ additional_asset_tags = npm-project,dependency-scan
         return report_content
 
 
+class AsyncLightScanEngine:
+    """Light scan many repositories concurrently with asyncio
+    
+    File discovery and downloads for all repositories run in threads under a global
+    concurrency cap; every GitHub request they send is paced by a shared token bucket. Downloaded content is scanned from
+    memory, one repository at a time in input order, so results stay deterministic.
+    """
+    
+    def __init__(self, detector: EnhancedNPMCompromiseDetectorPhoenix, max_concurrency: int = 16,
+                 rate_limit: float = 10.0):
+        """Initialize the engine for a configured detector"""
+        self.detector = detector
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit = rate_limit
+        self._semaphore = None
+        
+    def scan(self, repo_urls: List[str], announce=None) -> List[Dict]:
+        """Fetch and scan all repositories, returning their Phoenix assets in input order"""
+        return asyncio.run(self._scan_all(repo_urls, announce))
+        
+    async def _run_io(self, func, *args):
+        """Run one blocking network operation in a thread, within the concurrency cap"""
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
+            
+    async def _fetch_repository(self, repo_url: str):
+        """Discover and download a repository's NPM files using a private detector copy"""
+        worker = self.detector._fetch_worker()
+        if worker._repository_unchanged(repo_url):
+            return worker, None, False  # replayed from the scan state by _scan_all
+            
+        try:
+            owner, repo = worker.parse_github_url(repo_url)
+            if not owner or not repo:
+                print(f"❌ Could not parse GitHub URL: {repo_url}")
+                return worker, [], False
+                
+            npm_files = await self._run_io(worker.find_npm_files_in_repo, owner, repo, worker._inventory_ref(repo_url))
+            if not npm_files:
+                print(f"📦 No NPM files found in {owner}/{repo}")
+                return worker, [], False
+                
+            print(f"📁 Found {len(npm_files)} NPM file(s) in {owner}/{repo}")
+            
+            async def fetch(file_info: Dict):
+                if worker._blob_already_scanned(repo_url, file_info):
+                    return file_info, None  # replayed from the scan state
+                return file_info, await self._run_io(worker.fetch_npm_file_content, file_info) or False
+                
+            results = await asyncio.gather(*(fetch(file_info) for file_info in npm_files))
+            # None marks a cached blob; False a failed download, which is dropped
+            downloaded = [(file_info, content) for file_info, content in results if content is not False]
+            return worker, downloaded, len(downloaded) == len(npm_files)
+            
+        except Exception as e:
+            print(f"❌ Error light scanning {repo_url}: {str(e)}")
+            return worker, [], False
+            
+    async def _scan_all(self, repo_urls: List[str], announce=None) -> List[Dict]:
+        """Keep a window of repositories fetching while earlier ones are scanned in order"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Fetch workers are shallow copies of the detector, so they share the bucket
+        self.detector.request_bucket = TokenBucket(self.rate_limit)
+        try:
+            return await self._scan_windowed(repo_urls, announce)
+        finally:
+            self.detector.request_bucket = None
+            
+    async def _scan_windowed(self, repo_urls: List[str], announce=None) -> List[Dict]:
+        """Scan loop of _scan_all"""
+        assets = []
+        window = self.max_concurrency * 2
+        pending = deque()
+        repo_iter = iter(enumerate(repo_urls, 1))
+        
+        def schedule_next() -> bool:
+            try:
+                i, repo_url = next(repo_iter)
+            except StopIteration:
+                return False
+            pending.append((i, repo_url, asyncio.create_task(self._fetch_repository(repo_url))))
+            return True
+            
+        while len(pending) < window and schedule_next():
+            pass
+            
+        while pending:
+            i, repo_url, task = pending.popleft()
+            worker, downloaded, complete = await task
+            schedule_next()
+            
+            if announce:
+                announce(i, repo_url)
+            self.detector._merge_fetch_tracking(worker)
+            if downloaded is None:
+                assets.extend(self.detector._replay_repository(repo_url))
+                continue
+            assets.extend(self.detector.process_downloaded_files(repo_url, downloaded))
+            if complete:
+                self.detector._record_repository_tree(repo_url, [file_info['path'] for file_info, _ in downloaded])
+            
+        return assets
+
+
 def main():
     parser = argparse.ArgumentParser(description='Enhanced NPM Package Compromise Detection Tool with Phoenix API Integration')
     
@@ -2351,6 +3481,11 @@ def main():
                        help='Specify repository URL for the target (overrides auto-detection)')
     parser.add_argument('--pull-all', action='store_true',
                        help='Fetch all repositories the user has access to from GitHub, clone them, and scan recursively')
+    parser.add_argument('--graphql-inventory', action='store_true',
+                       help='With --pull-all: list repositories with batched GraphQL queries; with --incremental, repositories '
+                            'whose default branch tree is unchanged are replayed without cloning or downloading')
+    parser.add_argument('--skip-archived', action='store_true',
+                       help='With --pull-all: skip archived repositories')
     
     # Local folder processing options (NEW)
     parser.add_argument('--folder-list', action='store_true',
@@ -2385,6 +3520,17 @@ def main():
                        help='Enable full dependency tree analysis (slower but comprehensive)')
     parser.add_argument('--light-scan', action='store_true',
                        help='Light scan mode: download only NPM files from repositories (faster, GitHub only)')
+    parser.add_argument('--discovery', choices=['trees', 'search'], default='trees',
+                       help='Light-scan file discovery: one recursive git trees request per repository (default) or GitHub code search')
+    parser.add_argument('--async-light-scan', action='store_true',
+                       help='With --light-scan: discover and download files for many repositories concurrently (asyncio), scanning from memory')
+    parser.add_argument('--max-concurrency', type=int, default=16,
+                       help='Maximum concurrent GitHub requests for --async-light-scan (default: 16)')
+    parser.add_argument('--rate-limit', type=float, default=10.0,
+                       help='GitHub HTTP requests per second for --async-light-scan, counting fallbacks and retries; '
+                            '0 for unlimited (default: 10)')
+    parser.add_argument('--max-rate-limit-wait', type=float, default=900.0,
+                       help='Longest wait in seconds for a GitHub rate limit reset before a request gives up and falls back (default: 900)')
     parser.add_argument('--organize-folders', action='store_true',
                        help='Organize GitHub pulls in github-pull/YYYYMMDD and results in result/YYYYMMDD')
     parser.add_argument('--debug', action='store_true',
@@ -2395,6 +3541,23 @@ def main():
                        help='Show all libraries in the report without truncation (detailed logging)')
     parser.add_argument('--use-tmp', action='store_true',
                        help='Use /tmp for repository cloning (legacy mode, not recommended)')
+    parser.add_argument('--sparse-clone', action='store_true',
+                       help='Clone only HEAD with a blob filter and sparse checkout of package.json/lockfiles (falls back to a full clone)')
+    parser.add_argument('--blob-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Cache downloaded NPM files on disk by git blob SHA (default dir: result/blob_cache)')
+    parser.add_argument('--blob-cache-size', type=int, default=512,
+                       help='Size limit of the blob cache in MB; least recently used files are evicted (default: 512)')
+    parser.add_argument('--http-cache', nargs='?', const='', default=None, metavar='PATH',
+                       help='Send conditional GitHub requests with stored ETags/Last-Modified; 304s reuse the cached body '
+                            'and do not count against the rate limit (default: result/http_cache.db)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Skip package files unchanged since the previous run and replay their cached findings')
+    parser.add_argument('--state-db', type=str,
+                       help='SQLite scan state file for --incremental (default: result/scan_state.db)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Fetch (clone/download) up to N repositories in parallel with scanning for --repo-list and --pull-all (default: 1)')
+    parser.add_argument('--lockfile-workers', type=int, default=None,
+                       help='Processes parsing local lockfiles when a scan has at least 8 MB of them (default: CPU count, 1 disables)')
     
     # Import all libraries option
     parser.add_argument('--import-all', action='store_true',
@@ -2444,6 +3607,8 @@ def main():
         
     if args.organize_folders:
         detector.enable_folder_organization(True)
+        # Light scans only keep downloaded files when folder organization is asked for explicitly
+        detector.save_light_scan_files = True
         
     if args.debug:
         detector.enable_debug_mode(True)
@@ -2463,6 +3628,36 @@ def main():
     if args.import_all:
         detector.enable_import_all(True)
         
+    if args.discovery != 'trees':
+        detector.set_discovery_mode(args.discovery)
+        
+    if args.blob_cache is not None:
+        detector.enable_blob_cache(args.blob_cache or None, args.blob_cache_size)
+        
+    if args.max_rate_limit_wait != 900.0:
+        detector.set_max_rate_limit_wait(args.max_rate_limit_wait)
+        
+    if args.http_cache is not None:
+        detector.enable_http_cache(args.http_cache or None)
+        
+    if args.async_light_scan:
+        detector.enable_async_light_scan(True, args.max_concurrency, args.rate_limit)
+        
+    if args.sparse_clone:
+        detector.enable_sparse_clone(True)
+        
+    if args.graphql_inventory:
+        detector.enable_graphql_inventory(True)
+        
+    if args.skip_archived:
+        detector.enable_skip_archived(True)
+        
+    if args.workers and args.workers > 1:
+        detector.set_workers(args.workers)
+        
+    if args.lockfile_workers:
+        detector.set_lockfile_workers(args.lockfile_workers)
+        
     # Handle additional tags
     vuln_tags = []
     asset_tags = []
@@ -2475,6 +3670,10 @@ def main():
         
     if vuln_tags or asset_tags:
         detector.set_additional_tags(vuln_tags, asset_tags)
+        
+    # Enabled last: the state fingerprint covers the options configured above
+    if args.incremental:
+        detector.enable_incremental(args.state_db)
     
     if not args.pull_all:
         print(f"📁 Target: {os.path.abspath(args.target)}")
@@ -2487,7 +3686,10 @@ def main():
         print()
         
         # Fetch all repositories
-        repo_urls = detector.fetch_all_user_repositories()
+        if detector.graphql_inventory:
+            repo_urls = detector.fetch_repository_inventory()
+        else:
+            repo_urls = detector.fetch_all_user_repositories()
         
         if not repo_urls:
             print("❌ No repositories found or unable to fetch from GitHub")
@@ -2498,31 +3700,7 @@ def main():
         print()
         
         # Process all repositories (this will clone and scan recursively)
-        assets = []
-        for i, repo_url in enumerate(repo_urls, 1):
-            print(f"\n{'='*80}")
-            print(f"🔄 Repository {i}/{len(repo_urls)}: {repo_url}")
-            print(f"{'='*80}\n")
-            
-            if detector.light_scan_mode:
-                # Light scan mode
-                repo_assets = detector.light_scan_repository(repo_url)
-                assets.extend(repo_assets)
-            else:
-                # Full scan mode - clone and scan recursively
-                repo_path = detector._get_or_clone_repository(repo_url)
-                
-                if repo_path:
-                    # Find all package files recursively
-                    package_files = []
-                    for pattern in ['package.json', 'package-lock.json']:
-                        package_files.extend(Path(repo_path).rglob(pattern))
-                        
-                    for package_file in package_files:
-                        asset = detector.process_package_file(str(package_file), repo_url)
-                        assets.append(asset)
-                else:
-                    print(f"⚠️  Failed to clone repository: {repo_url}")
+        assets = detector.process_repositories(repo_urls, show_banner=True)
         
         detector.phoenix_assets = assets
         
@@ -2553,10 +3731,15 @@ def main():
             for pattern in ['package.json', 'package-lock.json', 'yarn.lock']:
                 package_files.extend(directory_path.rglob(pattern))
             
+            detector.start_lockfile_parsing(package_files)
             for package_file in package_files:
                 asset = detector.process_package_file(str(package_file), args.repo_url)
                 detector.phoenix_assets.append(asset)
     
+    detector.close_lockfile_workers()
+    detector.print_cache_stats()
+    detector.close_scan_state()
+    
     # Import to Phoenix if enabled
     if detector.enable_phoenix_import:
         success = detector.import_to_phoenix()
@@ -10,18 +10,524 @@ Updated: Extended package list for 2025 compromise detection
 """
 
 import json
+import mmap
 import os
 import re
 import sys
+from functools import lru_cache
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional, Any
+from typing import Dict, List, Set, Tuple, Optional, Any, Iterable
 import argparse
 from datetime import datetime
 import tempfile
 import shutil
 
+# Streaming package-lock.json reader. This script is distributed standalone (curl | python),
+# so it carries its own copy of universal_vulnerability_scanner.core.lockfile_parser's reader.
+_JSON_WHITESPACE = ' \t\r\n'
+_JSON_STRUCTURE_RE = re.compile(r'["{}\[\]]')
+_JSON_STRING_TAIL_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+class _LockfileJSONStream:
+    """Pull reader over a JSON text stream that keeps only a window of the input in memory"""
+    
+    def __init__(self, f, chunk_size: int = 1024 * 1024):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        
+    def _more(self) -> bool:
+        """Append the next chunk to the window, dropping what was consumed"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+        
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ''
+                
+    def expect(self, char: str):
+        """Consume one structural character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in package-lock.json, found {found or 'end of file'!r}")
+        self.pos += 1
+        
+    def next_member(self, first: bool) -> bool:
+        """Advance to the next object member; False once the closing brace is consumed"""
+        if self.peek() == '}':
+            self.pos += 1
+            return False
+        if not first:
+            self.expect(',')
+        return True
+        
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number (or literal) touching the end of the window may continue in the next chunk
+            if end >= len(self.buf) and not self.eof and self._more():
+                continue
+            self.pos = end
+            return value
+            
+    def read_key(self) -> str:
+        """Read an object member name and its colon"""
+        key = self.read_value()
+        if not isinstance(key, str):
+            raise ValueError('Expected an object key in package-lock.json')
+        self.expect(':')
+        return key
+        
+    def skip_value(self):
+        """Skip the next value without building it"""
+        if self.peek() not in '{[':
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            m = _JSON_STRUCTURE_RE.search(self.buf, self.pos)
+            if not m:
+                self.pos = len(self.buf)
+                if not self._more():
+                    raise ValueError('Unexpected end of package-lock.json')
+                continue
+            if m.group() == '"':
+                tail = _JSON_STRING_TAIL_RE.match(self.buf, m.end())
+                if not tail:
+                    # String continues in the next chunk: resume from its opening quote
+                    self.pos = m.start()
+                    if not self._more():
+                        raise ValueError('Unterminated string in package-lock.json')
+                    continue
+                self.pos = tail.end()
+                continue
+            self.pos = m.end()
+            depth += 1 if m.group() in '{[' else -1
+            if depth == 0:
+                return
+
+
+def _stream_lock_dependencies(stream: _LockfileJSONStream, prefix: str):
+    """Yield (path, name, version) for a streamed lockfile v1 "dependencies" tree"""
+    stream.expect('{')
+    first = True
+    while stream.next_member(first):
+        first = False
+        name = stream.read_key()
+        if stream.peek() != '{':
+            stream.skip_value()
+            continue
+            
+        path = f"{prefix}{name}"
+        version = None
+        seen_version = False
+        emitted = False
+        stream.expect('{')
+        first_field = True
+        while stream.next_member(first_field):
+            first_field = False
+            field = stream.read_key()
+            if field == 'version':
+                version = stream.read_value()
+                seen_version = True
+            elif field == 'dependencies' and stream.peek() == '{':
+                # npm writes "version" first, so the parent precedes its nested dependencies
+                if seen_version and not emitted:
+                    yield path, name, version
+                    emitted = True
+                yield from _stream_lock_dependencies(stream, f"{path}/node_modules/")
+            else:
+                stream.skip_value()
+        if not emitted:
+            yield path, name, version
+
+
+def iter_package_lock_stream(file_path: str, section: str = 'packages'):
+    """
+    Stream one section of a package-lock.json with bounded memory.
+    Yields (path, name, version); v1 nested dependencies get node_modules/a/node_modules/b paths.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stream = _LockfileJSONStream(f)
+        stream.expect('{')
+        first = True
+        while stream.next_member(first):
+            first = False
+            key = stream.read_key()
+            if key != section or stream.peek() != '{':
+                stream.skip_value()
+                continue
+                
+            if section == 'dependencies':
+                yield from _stream_lock_dependencies(stream, 'node_modules/')
+                return
+                
+            stream.expect('{')
+            first_entry = True
+            while stream.next_member(first_entry):
+                first_entry = False
+                path = stream.read_key()
+                entry = stream.read_value()
+                if isinstance(entry, dict):
+                    name = entry.get('name') or (path.rsplit('node_modules/', 1)[-1] if 'node_modules/' in path else None)
+                    yield path, name, entry.get('version')
+            return
+
+
+def _walk_lock_dependency_records(deps: Dict, prefix: str = ''):
+    """Yield ('dependency', name, version, prefix) for an in-memory lockfile v1 "dependencies" tree"""
+    for package_name, package_info in deps.items():
+        yield 'dependency', package_name, package_info.get('version', ''), prefix
+        if 'dependencies' in package_info:
+            yield from _walk_lock_dependency_records(package_info['dependencies'], f"{prefix}{package_name}/")
+
+
+def iter_package_lock_records(file_path: str, stream_threshold: int):
+    """
+    Parse a package-lock.json into compact records, in scan order:
+    ('package', path, version) for the node_modules entries of the v2/v3 "packages" map,
+    then ('dependency', name, version, prefix) for the v1 "dependencies" tree.
+    Files larger than stream_threshold are streamed instead of loaded whole.
+    """
+    if os.path.getsize(file_path) > stream_threshold:
+        for package_path, _, version in iter_package_lock_stream(file_path, 'packages'):
+            if package_path.startswith('node_modules/'):
+                yield 'package', package_path, version if version is not None else ''
+        for package_path, package_name, version in iter_package_lock_stream(file_path, 'dependencies'):
+            # node_modules/a/node_modules/b -> "a/", the prefix of the in-memory walk
+            prefix = ''.join(package_path.split('node_modules/')[1:-1])
+            yield 'dependency', package_name, version if version is not None else '', prefix
+        return
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lock_data = json.load(f)
+
+    # Check packages in lockfile v2/v3 format
+    if 'packages' in lock_data:
+        for package_path, package_info in lock_data['packages'].items():
+            if package_path.startswith('node_modules/'):
+                yield 'package', package_path, package_info.get('version', '')
+
+    # Check dependencies in lockfile v1 format
+    if 'dependencies' in lock_data:
+        yield from _walk_lock_dependency_records(lock_data['dependencies'])
+
+
+# Memoized version cleaning (inline copy of universal_vulnerability_scanner.core.version_parser's
+# strip_version_prefix): the same few thousand specifiers repeat across every manifest
+_VERSION_PREFIX_RE = re.compile(r'^[^\d]*')
+
+
+@lru_cache(maxsize=32768)
+def _strip_version_prefix(version: str) -> str:
+    """Drop leading operators and keep the first alternative of a range"""
+    cleaned = _VERSION_PREFIX_RE.sub('', version)
+    # Handle version ranges like "1.0.0 - 2.0.0"
+    if ' - ' in cleaned:
+        cleaned = cleaned.split(' - ')[0]
+    # Handle || operators
+    if ' || ' in cleaned:
+        cleaned = cleaned.split(' || ')[0]
+    return cleaned.strip()
+
+
+def _extract_line_context(content: str, search_term: str, context_lines: int = 2, offset: int = None) -> str:
+    """Lines around the first occurrence of a term (found at offset, when known)"""
+    if offset is not None and offset >= 0 and '\n' not in search_term:
+        # Walk to the surrounding line breaks instead of splitting the whole file
+        start = content.rfind('\n', 0, offset) + 1
+        for _ in range(context_lines):
+            if start == 0:
+                break
+            start = content.rfind('\n', 0, start - 1) + 1
+        end = content.find('\n', offset)
+        for _ in range(context_lines):
+            if end == -1:
+                break
+            end = content.find('\n', end + 1)
+        return content[start:end] if end != -1 else content[start:]
+        
+    lines = content.split('\n')
+    for i, line in enumerate(lines):
+        if search_term in line:
+            start = max(0, i - context_lines)
+            end = min(len(lines), i + context_lines + 1)
+            return '\n'.join(lines[start:end])
+    return ''
+
+
+class _SourceIndicatorScanner:
+    """
+    Matches source files against the malicious URLs, crypto keywords and suspicious patterns.
+    Kept apart from the detector (and picklable) so source files can be scanned in worker
+    processes; scan() returns what to log instead of logging it.
+    Files from MMAP_THRESHOLD up (typically minified bundles) are searched as bytes through
+    a memory map, without decoding the file or splitting it into lines.
+    """
+    
+    # Files at least this large are scanned memory-mapped at the bytes level
+    MMAP_THRESHOLD = 1024 * 1024
+    # Bytes lowercased at a time when looking for crypto keywords in a mapped file
+    CHUNK_SIZE = 4 * 1024 * 1024
+    # Most bytes of context kept on each side of a hit in a mapped file (lines can be megabytes long)
+    CONTEXT_WINDOW = 2048
+    
+    def __init__(self, malicious_urls: List[str], crypto_indicators: List[str],
+                 suspicious_patterns: List[str], max_file_size: int):
+        self.malicious_urls = list(malicious_urls)
+        # Lowercased once here so each file is lowercased a single time
+        self.crypto_needles = [(indicator, indicator.lower()) for indicator in crypto_indicators]
+        # Compiled once; an invalid pattern is kept as text so scanning reports it as before
+        self.suspicious_regexes = []
+        for pattern in suspicious_patterns:
+            try:
+                self.suspicious_regexes.append((pattern, re.compile(pattern)))
+            except re.error:
+                self.suspicious_regexes.append((pattern, pattern))
+        self.max_file_size = max_file_size
+        self.bytes_indicators = self._compile_bytes_indicators()
+        
+    def _compile_bytes_indicators(self):
+        """
+        Bytes forms of the indicators for mapped scanning, or None when an indicator is not
+        ASCII (bytes lowercasing and regex classes would not match the text semantics) or a
+        pattern is invalid; such databases scan every file as text.
+        """
+        texts = self.malicious_urls + [needle for _, needle in self.crypto_needles] + \
+            [pattern for pattern, _ in self.suspicious_regexes]
+        if not all(text.isascii() for text in texts):
+            return None
+        try:
+            return {
+                'urls': [(url, url.encode('ascii')) for url in self.malicious_urls],
+                'crypto': [(indicator, needle.encode('ascii')) for indicator, needle in self.crypto_needles],
+                'patterns': [(pattern, re.compile(pattern.encode('ascii'))) for pattern, _ in self.suspicious_regexes]
+            }
+        except re.error:
+            return None
+            
+    def scan(self, file_path: str) -> Tuple[List[Tuple[str, str, Dict]], List[Dict], int]:
+        """
+        Scan one source file.
+        Returns: ([(severity, message, details), ...] to log, findings, bytes scanned)
+        """
+        logged = []
+        findings = []
+        size = 0
+        
+        try:
+            size = os.path.getsize(file_path)
+            if self.max_file_size and size > self.max_file_size:
+                logged.append((
+                    'WARNING',
+                    f'Source file not scanned: {size / (1024 * 1024):.1f} MB exceeds the '
+                    f'{self.max_file_size / (1024 * 1024):.3g} MB limit (see --max-source-file-size)',
+                    {'size': size}
+                ))
+                return logged, findings, 0
+                
+            if size >= self.MMAP_THRESHOLD and self.bytes_indicators is not None:
+                url_contexts, crypto_matches, suspicious_matches = self._match_mapped(file_path)
+            else:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+                url_contexts, crypto_matches, suspicious_matches = self._match_text(content)
+                
+            # Check for malicious URLs
+            for url, context in url_contexts:
+                logged.append((
+                    'HIGH',
+                    f'Malicious URL detected: {url}',
+                    {'url': url, 'context': context}
+                ))
+                findings.append({
+                    'type': 'malicious_url',
+                    'url': url,
+                    'file': file_path
+                })
+                
+            # Check for crypto-related indicators
+            if crypto_matches:
+                logged.append((
+                    'MEDIUM',
+                    f'Crypto-related keywords detected: {", ".join(crypto_matches)}',
+                    {'keywords': crypto_matches}
+                ))
+                findings.append({
+                    'type': 'crypto_indicators',
+                    'keywords': crypto_matches,
+                    'file': file_path
+                })
+                
+            # Check for suspicious patterns
+            if suspicious_matches:
+                logged.append((
+                    'MEDIUM',
+                    f'Suspicious code patterns detected: {len(suspicious_matches)} patterns',
+                    {'patterns': suspicious_matches}
+                ))
+                findings.append({
+                    'type': 'suspicious_patterns',
+                    'patterns': suspicious_matches,
+                    'file': file_path
+                })
+                
+        except Exception as e:
+            logged.append(('ERROR', f'Failed to scan source file {file_path}: {str(e)}', None))
+            
+        return logged, findings, size
+        
+    def _match_text(self, content: str) -> Tuple[List[Tuple[str, str]], List[str], List[str]]:
+        """Find the indicators in decoded text: ([(url, context)], crypto keywords, suspicious patterns)"""
+        url_contexts = []
+        for url in self.malicious_urls:
+            offset = content.find(url)
+            if offset != -1:
+                url_contexts.append((url, _extract_line_context(content, url, offset=offset)))
+                
+        crypto_matches = []
+        if self.crypto_needles:
+            lowered = content.lower()
+            crypto_matches = [indicator for indicator, needle in self.crypto_needles if needle in lowered]
+            
+        suspicious_matches = [pattern for pattern, regex in self.suspicious_regexes if re.search(regex, content)]
+        return url_contexts, crypto_matches, suspicious_matches
+        
+    def _match_mapped(self, file_path: str) -> Tuple[List[Tuple[str, str]], List[str], List[str]]:
+        """Find the indicators in a memory-mapped file without decoding it (same result shape as _match_text)"""
+        indicators = self.bytes_indicators
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            url_contexts = []
+            for url, needle in indicators['urls']:
+                offset = mapped.find(needle)
+                if offset != -1:
+                    url_contexts.append((url, self._mapped_context(mapped, offset, len(needle))))
+                    
+            # Lowercase a chunk at a time; chunks overlap so a keyword spanning a boundary is seen
+            missing = list(indicators['crypto'])
+            overlap = max([len(needle) for _, needle in missing] + [1]) - 1
+            found = set()
+            position = 0
+            while missing and position < len(mapped):
+                chunk = mapped[position:position + self.CHUNK_SIZE + overlap].lower()
+                for indicator, needle in missing:
+                    if needle in chunk:
+                        found.add(indicator)
+                missing = [(indicator, needle) for indicator, needle in missing if indicator not in found]
+                position += self.CHUNK_SIZE
+            crypto_matches = [indicator for indicator, _ in indicators['crypto'] if indicator in found]
+            
+            suspicious_matches = [pattern for pattern, regex in indicators['patterns'] if regex.search(mapped)]
+        return url_contexts, crypto_matches, suspicious_matches
+        
+    def _mapped_context(self, mapped: mmap.mmap, offset: int, length: int, context_lines: int = 2) -> str:
+        """Lines around a hit in a mapped file, cut to CONTEXT_WINDOW bytes on each side"""
+        low = max(0, offset - self.CONTEXT_WINDOW)
+        high = min(len(mapped), offset + length + self.CONTEXT_WINDOW)
+        
+        start = mapped.rfind(b'\n', low, offset) + 1 or low
+        for _ in range(context_lines):
+            if start <= low:
+                break
+            start = mapped.rfind(b'\n', low, start - 1) + 1 or low
+            
+        end = mapped.find(b'\n', offset + length, high)
+        for _ in range(context_lines):
+            if end == -1:
+                break
+            end = mapped.find(b'\n', end + 1, high)
+        return mapped[start:end if end != -1 else high].decode('utf-8', errors='ignore')
+
+
+# Source scanner of a worker process, installed by the pool initializer
+_worker_source_scanner = None
+
+
+def _init_source_worker(scanner: _SourceIndicatorScanner):
+    """Process pool initializer: keep the scanner for every file the worker handles"""
+    global _worker_source_scanner
+    _worker_source_scanner = scanner
+
+
+def _scan_sources_in_worker(file_paths: List[str]):
+    """Scan a chunk of source files in a worker process"""
+    return [_worker_source_scanner.scan(file_path) for file_path in file_paths]
+
+
+# Compromise index names and stream threshold of a lockfile worker process, installed by the pool initializer
+_worker_lockfile_config = None
+
+
+def _init_lockfile_worker(monitored_names: frozenset, stream_threshold: int):
+    """Process pool initializer: keep the compiled index names for every lock file the worker parses"""
+    global _worker_lockfile_config
+    _worker_lockfile_config = (monitored_names, stream_threshold)
+
+
+def _parse_lockfile_in_worker(file_path: str):
+    """
+    Parse one lock file in a worker process.
+    package-lock.json gives every record of iter_package_lock_records (all of them are tracked);
+    yarn.lock gives {name: versions} for the monitored names only.
+    """
+    monitored_names, stream_threshold = _worker_lockfile_config
+    if file_path.endswith('yarn.lock'):
+        yarn_index = NPMCompromiseDetector2025._parse_yarn_lock_index(file_path)
+        return {name: versions for name, versions in yarn_index.items() if name in monitored_names}
+    return list(iter_package_lock_records(file_path, stream_threshold))
+
+
 class NPMCompromiseDetector2025:
+    # File names and extensions picked up while walking a scan target
+    MANIFEST_FILES = {'package.json'}
+    LOCK_FILES = {'package-lock.json', 'yarn.lock'}
+    SOURCE_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx', '.mjs', '.cjs')
+    SCAN_CATEGORY_ORDER = {'manifest': 0, 'lockfile': 1, 'source': 2}
+    # Directories never descended into (node_modules is optional, see --skip-node-modules)
+    DEFAULT_PRUNE_DIRS = {'.git'}
+    # Resolved version line of a yarn.lock entry: `  version "1.2.3"` (v1) or `  version: 1.2.3` (berry)
+    YARN_VERSION_RE = re.compile(r'^  version:?\s+"?(?P<ver>[^"\s]+)"?\s*$')
+    # package-lock.json files above this size are streamed instead of loaded with json.load
+    LOCKFILE_STREAM_THRESHOLD = 16 * 1024 * 1024
+    # Source files above this size are reported and skipped (see --max-source-file-size)
+    MAX_SOURCE_FILE_SIZE = 32 * 1024 * 1024
+    # Trees with at least this many source files are scanned by a process pool, with progress output
+    SOURCE_POOL_MIN_FILES = 200
+    # Seconds between source scanning progress lines
+    SOURCE_PROGRESS_INTERVAL = 5.0
+    # Lock files of a tree are parsed by a process pool once together they are at least this large
+    LOCKFILE_POOL_MIN_BYTES = 8 * 1024 * 1024
+    
     def __init__(self, config_file: str = None):
         """Initialize the detector with compromised package data"""
         self.config_file = config_file or "compromised_packages_2025.json"
@@ -32,6 +538,10 @@ class NPMCompromiseDetector2025:
         self.scanned_packages = []
         self.package_sources = {}
         self.safe_packages = []
+        # Hash indexes over the ordered lists above so tracking stays O(1) per package
+        self._scanned_package_index = {}
+        self._package_source_keys = set()
+        self._safe_package_keys = set()
         self.dependency_stats = {
             'direct_dependencies': 0,
             'transitive_dependencies': 0,
@@ -42,6 +552,10 @@ class NPMCompromiseDetector2025:
             'potentially_compromised_found': 0
         }
         self.full_tree_analysis = False
+        self.source_workers = os.cpu_count() or 1
+        self.lockfile_workers = os.cpu_count() or 1
+        # Pending worker parses of lock files, by path (see _start_lockfile_parsing)
+        self._lockfile_parses = {}
         
     def load_compromise_data(self):
         """Load compromised package data from JSON configuration"""
@@ -68,6 +582,37 @@ class NPMCompromiseDetector2025:
             print(f"❌ Error loading compromise data: {str(e)}")
             self._load_default_data()
             
+        self._build_compromise_index()
+        self._build_source_matchers()
+        
+    def _build_source_matchers(self):
+        """Prepare the source-file indicators once (see _SourceIndicatorScanner)"""
+        self._source_scanner = _SourceIndicatorScanner(
+            self.malicious_urls, self.crypto_indicators, self.suspicious_patterns, self.MAX_SOURCE_FILE_SIZE
+        )
+        
+    def _build_compromise_index(self):
+        """Compile the compromise data into one name -> matcher table for check_package_compromise
+        
+        Each entry holds the normalized compromised versions as a frozenset and the
+        precomputed hit/miss results, so a lookup is a single hash probe. Potentially
+        compromised names map to a matcher without versions. Entries that normalize to
+        nothing (e.g. 'all') are left out so they never match a missing or tag version.
+        """
+        index = {}
+        for package_name in self.potentially_compromised:
+            index[package_name] = (None, None, None)
+        # Packages with specific versions take precedence, as in the original lookup order
+        for package_name, pkg_data in self.compromised_packages.items():
+            compromised_versions = pkg_data.get('compromised_versions', [])
+            index[package_name] = (
+                frozenset(filter(None, (self.normalize_version(v) for v in compromised_versions))),
+                (True, 'CRITICAL', compromised_versions),
+                # Package is in our list but version is different - could be safe
+                (False, 'INFO', compromised_versions)
+            )
+        self._compromise_index = index
+            
     def _load_default_data(self):
         """Load default compromise data if config file is not available"""
         self.compromised_packages = {
@@ -114,11 +659,23 @@ class NPMCompromiseDetector2025:
         """Enable or disable full dependency tree analysis"""
         self.full_tree_analysis = enable
         
+    def set_source_workers(self, workers: int):
+        """Set how many processes scan source files (1 scans them in this process)"""
+        self.source_workers = max(1, int(workers or 1))
+        
+    def set_lockfile_workers(self, workers: int):
+        """Set how many processes parse lock files in large trees (1 parses them in this process)"""
+        self.lockfile_workers = max(1, int(workers or 1))
+        
+    def set_max_source_file_size(self, size_mb: float):
+        """Set the size above which source files are reported and skipped (0 disables the limit)"""
+        self._source_scanner.max_file_size = int(size_mb * 1024 * 1024)
+        
     def track_package(self, package_name: str, version: str, source: str, file_path: str = None, depth: int = 0):
         """Track a scanned package for reporting purposes"""
         package_key = f"{package_name}@{version}"
         
-        if package_key not in [p['key'] for p in self.scanned_packages]:
+        if package_key not in self._scanned_package_index:
             package_info = {
                 'key': package_key,
                 'name': package_name,
@@ -128,23 +685,26 @@ class NPMCompromiseDetector2025:
                 'depth': depth,
                 'first_seen': datetime.now().isoformat()
             }
+            self._scanned_package_index[package_key] = package_info
             self.scanned_packages.append(package_info)
-            
-        if package_key not in self.package_sources:
-            self.package_sources[package_key] = []
-        
-        source_info = {
-            'source': source,
-            'file_path': file_path,
-            'depth': depth
-        }
         
-        if source_info not in self.package_sources[package_key]:
-            self.package_sources[package_key].append(source_info)
+        source_key = (package_key, source, file_path, depth)
+        if source_key not in self._package_source_keys:
+            self._package_source_keys.add(source_key)
+            self.package_sources.setdefault(package_key, []).append({
+                'source': source,
+                'file_path': file_path,
+                'depth': depth
+            })
             
     def track_safe_package(self, package_name: str, version: str, compromised_versions: List[str], source: str, file_path: str = None, depth: int = 0):
         """Track a package that is a safe version of a potentially compromised package"""
-        safe_package_info = {
+        safe_key = (package_name, version, file_path, source)
+        if safe_key in self._safe_package_keys:
+            return
+        
+        self._safe_package_keys.add(safe_key)
+        self.safe_packages.append({
             'name': package_name,
             'version': version,
             'compromised_versions': compromised_versions,
@@ -152,57 +712,43 @@ class NPMCompromiseDetector2025:
             'file_path': file_path,
             'depth': depth,
             'found_at': datetime.now().isoformat()
-        }
-        
-        existing = any(
-            p['name'] == package_name and 
-            p['version'] == version and 
-            p['file_path'] == file_path and
-            p['source'] == source
-            for p in self.safe_packages
-        )
-        
-        if not existing:
-            self.safe_packages.append(safe_package_info)
-            self.dependency_stats['safe_packages_found'] += 1
+        })
+        self.dependency_stats['safe_packages_found'] += 1
             
     def normalize_version(self, version: str) -> str:
         """Normalize version string by removing prefixes like ^, ~, >=, etc."""
         if not version:
             return ""
-        # Remove common npm version prefixes
-        cleaned = re.sub(r'^[^\d]*', '', str(version))
-        # Handle version ranges like "1.0.0 - 2.0.0"
-        if ' - ' in cleaned:
-            cleaned = cleaned.split(' - ')[0]
-        # Handle || operators
-        if ' || ' in cleaned:
-            cleaned = cleaned.split(' || ')[0]
-        return cleaned.strip()
+        return _strip_version_prefix(str(version))
         
     def check_package_compromise(self, package_name: str, version: str) -> Tuple[bool, str, List[str]]:
         """
         Check if a package version is compromised
         Returns: (is_compromised, severity, compromised_versions_list)
         """
-        normalized_version = self.normalize_version(version)
-        
-        # Check exact compromised packages with versions
-        if package_name in self.compromised_packages:
-            pkg_data = self.compromised_packages[package_name]
-            compromised_versions = pkg_data.get('compromised_versions', [])
+        matcher = self._compromise_index.get(package_name)
+        if matcher is None:
+            return False, '', []
             
-            if normalized_version in compromised_versions:
-                return True, 'CRITICAL', compromised_versions
-            else:
-                # Package is in our list but version is different - could be safe
-                return False, 'INFO', compromised_versions
-                
-        # Check potentially compromised packages (no specific version)
-        if package_name in self.potentially_compromised:
+        versions, hit, miss = matcher
+        # Potentially compromised packages (no specific version)
+        if versions is None:
             return True, 'HIGH', []
-            
-        return False, '', []
+        if self.normalize_version(version) in versions:
+            return hit
+        return miss
+        
+    def check_packages_batch(self, packages: Iterable[Tuple]) -> List[Tuple[Tuple, Tuple[bool, str, List[str]]]]:
+        """
+        Check many packages at once, e.g. every entry of a lockfile
+        Takes tuples starting with (package_name, version); extra elements (such as the
+        file location) are passed through. Names outside the compromise database are
+        dropped with one hash probe each.
+        Returns: [(entry, (is_compromised, severity, compromised_versions_list)), ...]
+        """
+        index = self._compromise_index
+        check = self.check_package_compromise
+        return [(entry, check(entry[0], entry[1])) for entry in packages if entry[0] in index]
         
     def get_npm_dependency_tree(self, package_json_dir: str) -> Dict:
         """Get full dependency tree using npm list"""
@@ -471,285 +1017,419 @@ class NPMCompromiseDetector2025:
         """Scan package-lock.json specifically"""
         findings = []
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lock_data = json.load(f)
+        if os.path.getsize(file_path) > self.LOCKFILE_STREAM_THRESHOLD:
+            size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            print(f"🌊 Streaming large lockfile ({size_mb:.0f} MB): {file_path}")
             
-        # Check packages in lockfile v2/v3 format
-        if 'packages' in lock_data:
-            for package_path, package_info in lock_data['packages'].items():
-                if package_path.startswith('node_modules/'):
-                    # Handle scoped packages correctly
-                    path_parts = package_path.replace('node_modules/', '').split('/')
-                    if path_parts[0].startswith('@'):
-                        package_name = '/'.join(path_parts[:2])  # @scope/name
-                    else:
-                        package_name = path_parts[0]
-                        
-                    version = package_info.get('version', '')
-                    
-                    if version:
-                        depth = package_path.count('/') - 1
-                        self.track_package(package_name, version, 'lock_file_v2_v3', file_path, depth)
-                        self.dependency_stats['lock_file_packages'] += 1
-                    
-                    # Check if package is compromised
-                    is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
-                    
-                    if is_compromised and severity == 'CRITICAL':
-                        self.log_finding(
-                            'CRITICAL',
-                            f'Compromised package in lock file: {package_name}@{version}',
-                            file_path,
-                            {
-                                'package': package_name, 
-                                'version': version, 
-                                'path': package_path,
-                                'compromised_versions': compromised_versions
-                            }
-                        )
-                        findings.append({
-                            'package': package_name,
-                            'version': version,
-                            'file': file_path
-                        })
-                        self.dependency_stats['compromised_packages_found'] += 1
-                        
-                    elif is_compromised and severity == 'HIGH':
-                        self.log_finding(
-                            'HIGH',
-                            f'Potentially compromised package in lock file: {package_name}@{version}',
-                            file_path,
-                            {
-                                'package': package_name,
-                                'version': version,
-                                'path': package_path,
-                                'reason': 'Package name in potentially compromised list'
-                            }
-                        )
-                        findings.append({
-                            'package': package_name,
-                            'version': version,
-                            'file': file_path,
-                            'type': 'potentially_compromised'
-                        })
-                        self.dependency_stats['potentially_compromised_found'] += 1
-                        
-                    elif package_name in self.compromised_packages and not is_compromised:
-                        # Package is in our compromised list but using a safe version
-                        depth = package_path.count('/') - 1
-                        self.track_safe_package(
-                            package_name, version, compromised_versions,
-                            'safe_lock_file_v2_v3', file_path, depth
-                        )
-                        self.log_finding(
-                            'INFO',
-                            f'Safe version in lock file: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
-                            file_path,
-                            {
-                                'package': package_name,
-                                'safe_version': version,
-                                'compromised_versions': compromised_versions,
-                                'path': package_path
-                            }
-                        )
-                            
-        # Check dependencies in lockfile v1 format
-        if 'dependencies' in lock_data:
-            findings.extend(self._scan_dependencies_recursive(lock_data['dependencies'], file_path))
+        records = self._take_lockfile_parse(file_path)
+        if records is None:
+            records = iter_package_lock_records(file_path, self.LOCKFILE_STREAM_THRESHOLD)
             
+        for record in records:
+            if record[0] == 'package':
+                findings.extend(self._scan_lock_package(record[1], record[2], file_path))
+            else:
+                findings.extend(self._scan_lock_dependency(record[1], record[2], file_path, record[3]))
+                
         return findings
         
-    def _scan_dependencies_recursive(self, deps: Dict, file_path: str, prefix: str = '') -> List[Dict]:
-        """Recursively scan dependencies in package-lock.json"""
+    def _scan_lock_package(self, package_path: str, version: str, file_path: str) -> List[Dict]:
+        """Check one node_modules entry of a lockfile v2/v3 "packages" map"""
         findings = []
         
-        for package_name, package_info in deps.items():
-            version = package_info.get('version', '')
+        # Handle scoped packages correctly
+        path_parts = package_path.replace('node_modules/', '').split('/')
+        if path_parts[0].startswith('@'):
+            package_name = '/'.join(path_parts[:2])  # @scope/name
+        else:
+            package_name = path_parts[0]
             
-            if version:
-                depth = len(prefix.split('/')) - 1 if prefix else 0
-                self.track_package(package_name, version, 'lock_file_dependency', file_path, depth)
-                self.dependency_stats['lock_file_packages'] += 1
+        if version:
+            depth = package_path.count('/') - 1
+            self.track_package(package_name, version, 'lock_file_v2_v3', file_path, depth)
+            self.dependency_stats['lock_file_packages'] += 1
+        
+        # Check if package is compromised
+        is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
+        
+        if is_compromised and severity == 'CRITICAL':
+            self.log_finding(
+                'CRITICAL',
+                f'Compromised package in lock file: {package_name}@{version}',
+                file_path,
+                {
+                    'package': package_name, 
+                    'version': version, 
+                    'path': package_path,
+                    'compromised_versions': compromised_versions
+                }
+            )
+            findings.append({
+                'package': package_name,
+                'version': version,
+                'file': file_path
+            })
+            self.dependency_stats['compromised_packages_found'] += 1
             
-            # Check if package is compromised
-            is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
+        elif is_compromised and severity == 'HIGH':
+            self.log_finding(
+                'HIGH',
+                f'Potentially compromised package in lock file: {package_name}@{version}',
+                file_path,
+                {
+                    'package': package_name,
+                    'version': version,
+                    'path': package_path,
+                    'reason': 'Package name in potentially compromised list'
+                }
+            )
+            findings.append({
+                'package': package_name,
+                'version': version,
+                'file': file_path,
+                'type': 'potentially_compromised'
+            })
+            self.dependency_stats['potentially_compromised_found'] += 1
             
-            if is_compromised and severity in ['CRITICAL', 'HIGH']:
-                self.log_finding(
-                    severity,
-                    f'{"Compromised" if severity == "CRITICAL" else "Potentially compromised"} package in dependencies: {package_name}@{version}',
-                    file_path,
-                    {
-                        'package': package_name, 
-                        'version': version,
-                        'compromised_versions': compromised_versions if severity == 'CRITICAL' else []
-                    }
-                )
-                findings.append({
+        elif package_name in self.compromised_packages and not is_compromised:
+            # Package is in our compromised list but using a safe version
+            depth = package_path.count('/') - 1
+            self.track_safe_package(
+                package_name, version, compromised_versions,
+                'safe_lock_file_v2_v3', file_path, depth
+            )
+            self.log_finding(
+                'INFO',
+                f'Safe version in lock file: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
+                file_path,
+                {
                     'package': package_name,
+                    'safe_version': version,
+                    'compromised_versions': compromised_versions,
+                    'path': package_path
+                }
+            )
+            
+        return findings
+        
+    def _scan_lock_dependency(self, package_name: str, version: str, file_path: str, prefix: str) -> List[Dict]:
+        """Check one entry of a lockfile v1 "dependencies" tree"""
+        findings = []
+        
+        if version:
+            depth = len(prefix.split('/')) - 1 if prefix else 0
+            self.track_package(package_name, version, 'lock_file_dependency', file_path, depth)
+            self.dependency_stats['lock_file_packages'] += 1
+        
+        # Check if package is compromised
+        is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
+        
+        if is_compromised and severity in ['CRITICAL', 'HIGH']:
+            self.log_finding(
+                severity,
+                f'{"Compromised" if severity == "CRITICAL" else "Potentially compromised"} package in dependencies: {package_name}@{version}',
+                file_path,
+                {
+                    'package': package_name, 
                     'version': version,
-                    'file': file_path,
-                    'type': 'potentially_compromised' if severity == 'HIGH' else 'compromised'
-                })
+                    'compromised_versions': compromised_versions if severity == 'CRITICAL' else []
+                }
+            )
+            findings.append({
+                'package': package_name,
+                'version': version,
+                'file': file_path,
+                'type': 'potentially_compromised' if severity == 'HIGH' else 'compromised'
+            })
+            
+            if severity == 'CRITICAL':
+                self.dependency_stats['compromised_packages_found'] += 1
+            else:
+                self.dependency_stats['potentially_compromised_found'] += 1
                 
-                if severity == 'CRITICAL':
-                    self.dependency_stats['compromised_packages_found'] += 1
-                else:
-                    self.dependency_stats['potentially_compromised_found'] += 1
-                    
-            elif package_name in self.compromised_packages and not is_compromised:
-                # Safe version
-                depth = len(prefix.split('/')) - 1 if prefix else 0
-                self.track_safe_package(
-                    package_name, version, compromised_versions,
-                    'safe_lock_file_dependency', file_path, depth
-                )
-                    
-            # Recursively check nested dependencies
-            if 'dependencies' in package_info:
-                findings.extend(self._scan_dependencies_recursive(
-                    package_info['dependencies'], file_path, f"{prefix}{package_name}/"
-                ))
+        elif package_name in self.compromised_packages and not is_compromised:
+            # Safe version
+            depth = len(prefix.split('/')) - 1 if prefix else 0
+            self.track_safe_package(
+                package_name, version, compromised_versions,
+                'safe_lock_file_dependency', file_path, depth
+            )
                 
         return findings
         
+    @classmethod
+    def _parse_yarn_lock_index(cls, file_path: str) -> Dict[str, List[str]]:
+        """
+        Parse yarn.lock (v1 classic or v2+ berry) in a single streaming pass.
+        Returns {package_name: [resolved_version, ...]} keeping every resolved version.
+        """
+        index = {}
+        current_names = []
+        
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if not line or line[0] == '#':
+                    continue
+                    
+                # Entry header: unindented, ends with ':' and lists one or more descriptors
+                # e.g. `"@scope/pkg@^1.0.0", "@scope/pkg@^1.1.0":` or `"lodash@npm:^4.17.21":`
+                if line[0] not in ' \t':
+                    current_names = []
+                    if line.endswith(':'):
+                        for descriptor in line[:-1].split(','):
+                            descriptor = descriptor.strip().strip('"')
+                            at = descriptor.find('@', 1)  # skip the scope '@'
+                            if at > 0 and descriptor[:at] not in current_names:
+                                current_names.append(descriptor[:at])
+                    continue
+                    
+                if not current_names:
+                    continue
+                    
+                match = cls.YARN_VERSION_RE.match(line)
+                if match:
+                    version = match.group('ver')
+                    for name in current_names:
+                        versions = index.setdefault(name, [])
+                        if version not in versions:
+                            versions.append(version)
+                    current_names = []
+                    
+        return index
+        
     def _scan_yarn_lock(self, file_path: str) -> List[Dict]:
         """Scan yarn.lock file"""
         findings = []
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Parse yarn.lock format for our compromised packages
-        all_packages = {**self.compromised_packages}
-        for pkg_name in self.potentially_compromised:
-            all_packages[pkg_name] = {"compromised_versions": [], "safe_version": "unknown"}
-            
-        for package_name, pkg_data in all_packages.items():
-            compromised_versions = pkg_data.get('compromised_versions', [])
-            
-            # Look for package entries in yarn.lock
-            escaped_name = re.escape(package_name)
-            
+        # Index the lockfile once, then probe the compromise data per package
+        yarn_index = self._take_lockfile_parse(file_path)
+        if yarn_index is None:
+            yarn_index = self._parse_yarn_lock_index(file_path)
+        
+        for package_name, versions in yarn_index.items():
+            if package_name in self.potentially_compromised:
+                compromised_versions = []
+            elif package_name in self.compromised_packages:
+                compromised_versions = self.compromised_packages[package_name].get('compromised_versions', [])
+            else:
+                continue
+                
             if compromised_versions:
                 # Check for specific compromised versions
-                for comp_version in compromised_versions:
-                    pattern = rf'^{escaped_name}@.*?:\s*\n(?:\s+.*\n)*?\s+version\s+"?{re.escape(comp_version)}"?'
-                    matches = re.findall(pattern, content, re.MULTILINE)
-                    
-                    if matches:
+                compromised_set = self._compromise_index[package_name][0]
+                for version in versions:
+                    if version in compromised_set:
                         self.log_finding(
                             'CRITICAL',
-                            f'Compromised package in yarn.lock: {package_name}@{comp_version}',
+                            f'Compromised package in yarn.lock: {package_name}@{version}',
                             file_path,
-                            {'package': package_name, 'version': comp_version}
+                            {'package': package_name, 'version': version}
                         )
                         findings.append({
                             'package': package_name,
-                            'version': comp_version,
+                            'version': version,
                             'file': file_path
                         })
                         self.dependency_stats['compromised_packages_found'] += 1
             else:
-                # Check for potentially compromised packages (any version)
-                pattern = rf'^{escaped_name}@.*?:\s*\n(?:\s+.*\n)*?\s+version\s+"?([^"]+)"?'
-                matches = re.findall(pattern, content, re.MULTILINE)
-                
-                if matches:
-                    for version in matches:
-                        self.log_finding(
-                            'HIGH',
-                            f'Potentially compromised package in yarn.lock: {package_name}@{version}',
-                            file_path,
-                            {'package': package_name, 'version': version}
-                        )
-                        findings.append({
-                            'package': package_name,
-                            'version': version,
-                            'file': file_path,
-                            'type': 'potentially_compromised'
-                        })
-                        self.dependency_stats['potentially_compromised_found'] += 1
+                # Potentially compromised packages (any version)
+                for version in versions:
+                    self.log_finding(
+                        'HIGH',
+                        f'Potentially compromised package in yarn.lock: {package_name}@{version}',
+                        file_path,
+                        {'package': package_name, 'version': version}
+                    )
+                    findings.append({
+                        'package': package_name,
+                        'version': version,
+                        'file': file_path,
+                        'type': 'potentially_compromised'
+                    })
+                    self.dependency_stats['potentially_compromised_found'] += 1
                 
         return findings
         
     def scan_source_files(self, file_path: str) -> List[Dict]:
         """Scan source files for malicious URLs and crypto-related indicators"""
-        findings = []
+        logged, findings, _ = self._source_scanner.scan(file_path)
+        self._log_source_result(file_path, logged)
+        return findings
         
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+    def _log_source_result(self, file_path: str, logged: List[Tuple[str, str, Dict]]):
+        """Record the findings returned by _SourceIndicatorScanner.scan"""
+        for severity, message, details in logged:
+            self.log_finding(severity, message, file_path, details)
+            
+    def _extract_context(self, content: str, search_term: str, context_lines: int = 2, offset: int = None) -> str:
+        """Extract context around a found term (around its first occurrence at offset, when known)"""
+        return _extract_line_context(content, search_term, context_lines, offset)
+        
+    def _iter_source_scans(self, file_paths: List[str]):
+        """
+        Scan source files, yielding _SourceIndicatorScanner.scan results in the order given.
+        Large trees are spread over a process pool (falling back to this process if the pool
+        cannot run) and report progress and throughput.
+        """
+        total = len(file_paths)
+        if total < self.SOURCE_POOL_MIN_FILES:
+            for file_path in file_paths:
+                yield self._source_scanner.scan(file_path)
+            return
+            
+        workers = min(self.source_workers, total)
+        started = last_report = time.time()
+        done = 0
+        scanned_bytes = 0
+        print(f"🔎 Scanning {total} source files with {workers} worker(s)")
+        
+        results = None
+        executor = None
+        futures = []
+        if workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_source_worker,
+                                               initargs=(self._source_scanner,))
+                # Chunks keep inter-process overhead low while spreading the work evenly
+                chunksize = max(1, min(64, total // (workers * 8)))
+                futures = [executor.submit(_scan_sources_in_worker, file_paths[start:start + chunksize])
+                           for start in range(0, total, chunksize)]
+                results = (result for future in futures for result in future.result())
+            except (OSError, ValueError, NotImplementedError) as e:
+                print(f"⚠️  Source worker processes unavailable ({str(e)}), scanning in this process")
+                results = None
                 
-            # Check for malicious URLs
-            for url in self.malicious_urls:
-                if url in content:
-                    self.log_finding(
-                        'HIGH',
-                        f'Malicious URL detected: {url}',
-                        file_path,
-                        {'url': url, 'context': self._extract_context(content, url)}
-                    )
-                    findings.append({
-                        'type': 'malicious_url',
-                        'url': url,
-                        'file': file_path
-                    })
-                    
-            # Check for crypto-related indicators
-            crypto_matches = []
-            for indicator in self.crypto_indicators:
-                if indicator.lower() in content.lower():
-                    crypto_matches.append(indicator)
-                    
-            if crypto_matches:
-                self.log_finding(
-                    'MEDIUM',
-                    f'Crypto-related keywords detected: {", ".join(crypto_matches)}',
-                    file_path,
-                    {'keywords': crypto_matches}
-                )
-                findings.append({
-                    'type': 'crypto_indicators',
-                    'keywords': crypto_matches,
-                    'file': file_path
-                })
+        try:
+            while done < total:
+                if results is not None:
+                    try:
+                        result = next(results)
+                    except BrokenProcessPool as e:
+                        print(f"⚠️  Source worker processes failed ({str(e)}), scanning the rest in this process")
+                        results = None
+                        continue
+                else:
+                    result = self._source_scanner.scan(file_paths[done])
+                done += 1
+                scanned_bytes += result[2]
+                yield result
                 
-            # Check for suspicious patterns
-            suspicious_matches = []
-            for pattern in self.suspicious_patterns:
-                if re.search(pattern, content):
-                    suspicious_matches.append(pattern)
-                    
-            if suspicious_matches:
-                self.log_finding(
-                    'MEDIUM',
-                    f'Suspicious code patterns detected: {len(suspicious_matches)} patterns',
-                    file_path,
-                    {'patterns': suspicious_matches}
-                )
-                findings.append({
-                    'type': 'suspicious_patterns',
-                    'patterns': suspicious_matches,
-                    'file': file_path
-                })
+                now = time.time()
+                if now - last_report >= self.SOURCE_PROGRESS_INTERVAL and done < total:
+                    last_report = now
+                    print(f"🔎 Source files: {done}/{total} scanned ({scanned_bytes / (1024 * 1024):.1f} MB, "
+                          f"{done / (now - started):.0f} files/s)")
+        finally:
+            if executor is not None:
+                # Chunks not started yet are dropped when the scan stops early
+                # (shutdown's cancel_futures needs Python 3.9)
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
                 
-        except Exception as e:
-            self.log_finding('ERROR', f'Failed to scan source file {file_path}: {str(e)}', file_path)
+        elapsed = max(time.time() - started, 1e-6)
+        print(f"✅ Scanned {total} source files ({scanned_bytes / (1024 * 1024):.1f} MB) in {elapsed:.1f}s: "
+              f"{total / elapsed:.0f} files/s, {scanned_bytes / (1024 * 1024) / elapsed:.1f} MB/s")
+        
+    def _start_lockfile_parsing(self, file_paths: List[str]):
+        """
+        Submit the lock files of a tree to a process pool when together they are large enough
+        for parsing to dominate. Workers load the compromise index names once (pool initializer)
+        and send back compact records, which _take_lockfile_parse hands to the scan.
+        Returns the executor, or None when the lock files are parsed in this process.
+        """
+        if self.lockfile_workers <= 1 or not file_paths:
+            return None
+        total_bytes = 0
+        for file_path in file_paths:
+            try:
+                total_bytes += os.path.getsize(file_path)
+            except OSError:
+                pass
+        if total_bytes < self.LOCKFILE_POOL_MIN_BYTES:
+            return None
             
-        return findings
+        workers = min(self.lockfile_workers, len(file_paths))
+        print(f"🧵 Parsing {len(file_paths)} lock files ({total_bytes / (1024 * 1024):.1f} MB) with {workers} worker(s)")
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_lockfile_worker,
+                                           initargs=(frozenset(self._compromise_index), self.LOCKFILE_STREAM_THRESHOLD))
+            for file_path in file_paths:
+                self._lockfile_parses[file_path] = executor.submit(_parse_lockfile_in_worker, file_path)
+        except (OSError, ValueError, NotImplementedError) as e:
+            print(f"⚠️  Lock file worker processes unavailable ({str(e)}), parsing in this process")
+            self._lockfile_parses.clear()
+            return None
+        return executor
+        
+    def _take_lockfile_parse(self, file_path: str):
+        """Return (and forget) the worker parse of a lock file, or None to parse it in this process"""
+        future = self._lockfile_parses.pop(file_path, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            print(f"⚠️  Lock file worker process failed ({str(e)}), parsing {file_path} in this process")
+            return None
         
-    def _extract_context(self, content: str, search_term: str, context_lines: int = 2) -> str:
-        """Extract context around a found term"""
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if search_term in line:
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-                return '\n'.join(lines[start:end])
-        return ''
-        
-    def scan_directory(self, directory: str, recursive: bool = True) -> None:
+    def _classify_scan_file(self, file_name: str) -> Optional[str]:
+        """Return the scan category for a file name: 'manifest', 'lockfile', 'source' or None"""
+        if file_name in self.MANIFEST_FILES:
+            return 'manifest'
+        if file_name in self.LOCK_FILES:
+            return 'lockfile'
+        if file_name.endswith(self.SOURCE_EXTENSIONS):
+            return 'source'
+        return None
+        
+    def walk_scan_targets(self, directory: str, recursive: bool = True, prune_dirs: Set[str] = None):
+        """
+        Walk a directory tree once with os.scandir and yield (category, file_path)
+        for every manifest, lock file and source file found.
+        Directories whose name is in prune_dirs are never descended into.
+        """
+        prune_dirs = self.DEFAULT_PRUNE_DIRS if prune_dirs is None else prune_dirs
+        root = os.path.normpath(directory)
+        pending = ['' if root == '.' else root]
+        
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current or '.') as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                self.log_finding('WARNING', f'Cannot read directory {current or "."}: {str(e)}', current or '.')
+                continue
+                
+            subdirs = []
+            targets = []
+            for entry in entries:
+                entry_path = os.path.join(current, entry.name) if current else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name not in prune_dirs:
+                            subdirs.append(entry_path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                    
+                category = self._classify_scan_file(entry.name)
+                if category:
+                    targets.append((category, entry_path))
+                    
+            # Manifests before lock files before sources, so a package declared in package.json
+            # is attributed to it rather than to the lock file next to it
+            targets.sort(key=lambda target: self.SCAN_CATEGORY_ORDER[target[0]])
+            yield from targets
+            
+            # Depth-first, alphabetical order keeps scan output stable between runs
+            pending.extend(reversed(subdirs))
+            
+    def scan_directory(self, directory: str, recursive: bool = True, skip_node_modules: bool = False) -> None:
         """Scan a directory for compromised packages and malicious content"""
         directory_path = Path(directory)
         
@@ -757,49 +1437,36 @@ class NPMCompromiseDetector2025:
             self.log_finding('ERROR', f'Directory does not exist: {directory}')
             return
             
-        # Find package.json files
-        package_files = []
-        if recursive:
-            package_files = list(directory_path.rglob('package.json'))
-        else:
-            package_files = list(directory_path.glob('package.json'))
-            
-        for package_file in package_files:
-            self.scanned_files.append(str(package_file))
-            self.scan_package_json(str(package_file))
-            
-        # Find lock files
-        lock_files = []
-        if recursive:
-            lock_files.extend(directory_path.rglob('package-lock.json'))
-            lock_files.extend(directory_path.rglob('yarn.lock'))
-        else:
-            lock_files.extend(directory_path.glob('package-lock.json'))
-            lock_files.extend(directory_path.glob('yarn.lock'))
-            
-        for lock_file in lock_files:
-            self.scanned_files.append(str(lock_file))
-            self.scan_lock_file(str(lock_file))
+        prune_dirs = set(self.DEFAULT_PRUNE_DIRS)
+        if skip_node_modules:
+            prune_dirs.add('node_modules')
             
-        # Scan JavaScript/TypeScript files for malicious content
-        source_extensions = ['*.js', '*.ts', '*.jsx', '*.tsx', '*.mjs', '*.cjs']
-        source_files = []
+        targets = list(self.walk_scan_targets(directory, recursive, prune_dirs))
         
-        for ext in source_extensions:
-            if recursive:
-                source_files.extend(directory_path.rglob(ext))
-            else:
-                source_files.extend(directory_path.glob(ext))
-                
-        # Limit source file scanning for performance
-        max_source_files = 200
-        if len(source_files) > max_source_files:
-            print(f"⚠️  Found {len(source_files)} source files, scanning first {max_source_files} for performance")
-            source_files = source_files[:max_source_files]
-                
-        for source_file in source_files:
-            self.scanned_files.append(str(source_file))
-            self.scan_source_files(str(source_file))
+        # Every source file is scanned; in large trees the source scans run in worker processes
+        # while manifests and lock files are scanned here, and results are logged in tree order
+        # Lock files may likewise be parsed ahead by worker processes; findings are still created here
+        lockfile_executor = self._start_lockfile_parsing([file_path for category, file_path in targets if category == 'lockfile'])
+        source_scans = self._iter_source_scans([file_path for category, file_path in targets if category == 'source'])
+        try:
+            for category, file_path in targets:
+                self.scanned_files.append(file_path)
+                if category == 'manifest':
+                    self.scan_package_json(file_path)
+                elif category == 'lockfile':
+                    self.scan_lock_file(file_path)
+                else:
+                    logged, _, _ = next(source_scans)
+                    self._log_source_result(file_path, logged)
+            # Let the source stage finish (pool shutdown, throughput summary)
+            next(source_scans, None)
+        finally:
+            if lockfile_executor is not None:
+                # Parses nobody will take are dropped (shutdown's cancel_futures needs Python 3.9)
+                for future in self._lockfile_parses.values():
+                    future.cancel()
+                self._lockfile_parses.clear()
+                lockfile_executor.shutdown(wait=True)
             
     def generate_report(self, output_file: str = None) -> str:
         """Generate a comprehensive security report"""
@@ -975,8 +1642,16 @@ def main():
                        help='Do not scan subdirectories')
     parser.add_argument('--full-tree', action='store_true',
                        help='Enable full dependency tree analysis (slower but comprehensive)')
+    parser.add_argument('--skip-node-modules', action='store_true',
+                       help='Do not descend into node_modules directories')
     parser.add_argument('--quiet', '-q', action='store_true',
                        help='Only show critical and high severity findings')
+    parser.add_argument('--source-workers', type=int, default=None,
+                       help='Processes scanning source files in large trees (default: CPU count, 1 disables)')
+    parser.add_argument('--lockfile-workers', type=int, default=None,
+                       help='Processes parsing lock files in large trees (default: CPU count, 1 disables)')
+    parser.add_argument('--max-source-file-size', type=float, default=None, metavar='MB',
+                       help='Skip (and report) source files larger than this (default: 32 MB, 0 disables)')
     
     args = parser.parse_args()
     
@@ -988,6 +1663,12 @@ def main():
     if args.full_tree:
         detector.enable_full_tree_analysis(True)
         print("🌳 Full dependency tree analysis enabled")
+    if args.source_workers:
+        detector.set_source_workers(args.source_workers)
+    if args.lockfile_workers:
+        detector.set_lockfile_workers(args.lockfile_workers)
+    if args.max_source_file_size is not None:
+        detector.set_max_source_file_size(args.max_source_file_size)
     
     print(f"📁 Scanning directory: {os.path.abspath(args.directory)}")
     if args.full_tree:
@@ -995,7 +1676,8 @@ def main():
     print()
     
     # Scan directory
-    detector.scan_directory(args.directory, recursive=not args.no_recursive)
+    detector.scan_directory(args.directory, recursive=not args.no_recursive,
+                            skip_node_modules=args.skip_node_modules)
     
     # Generate and display report
     report = detector.generate_report(args.output)
@@ -15,10 +15,13 @@ __author__ = "Security Team"
 
 from .core.version_parser import (
     parse_semver,
+    semver_key,
     semver_lt,
     semver_gte,
     is_in_range,
-    normalize_version
+    normalize_version,
+    strip_version_prefix,
+    version_cache_stats
 )
 
 from .models.finding import Finding, Verdict
@@ -26,10 +29,13 @@ from .models.vulnerability import Vulnerability, VulnerabilityDatabase
 
 __all__ = [
     'parse_semver',
+    'semver_key',
     'semver_lt', 
     'semver_gte',
     'is_in_range',
     'normalize_version',
+    'strip_version_prefix',
+    'version_cache_stats',
     'Finding',
     'Verdict',
     'Vulnerability',
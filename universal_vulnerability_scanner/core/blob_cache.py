@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Blob Cache
+Content-addressed caches keyed by git blob SHA for downloaded manifests and lockfiles
+BlobCache keeps raw file bytes on disk (size-bounded LRU); ParseCache keeps parse results in memory
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Default on-disk budget for cached blobs
+DEFAULT_BLOB_CACHE_BYTES = 512 * 1024 * 1024
+# Default number of parse results kept in memory
+DEFAULT_PARSE_CACHE_ENTRIES = 64
+
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Compute the git blob SHA-1 of file content (what `git hash-object` prints).
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        40-character hex blob SHA, matching the `sha` of GitHub tree and contents entries
+
+    Examples:
+        >>> git_blob_sha(b"")
+        "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+    """
+    digest = hashlib.sha1(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class BlobCache:
+    """
+    On-disk content-addressed store of file blobs.
+
+    Blobs live at <directory>/<sha[:2]>/<sha>. The modification time of a blob is
+    refreshed on every hit, and the least recently used blobs are evicted once the
+    total size exceeds max_bytes. Thread-safe.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_BLOB_CACHE_BYTES):
+        """
+        Open (or create) a blob cache directory.
+
+        Args:
+            directory: Cache directory
+            max_bytes: Size budget; least recently used blobs are evicted beyond it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._iter_blobs())
+
+    def _blob_path(self, sha: str) -> str:
+        """Location of a blob inside the cache"""
+        return os.path.join(self.directory, sha[:2], sha)
+
+    def _iter_blobs(self):
+        """Yield (path, mtime, size) for every cached blob"""
+        for prefix in os.scandir(self.directory):
+            if not prefix.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def get(self, sha: str) -> Optional[bytes]:
+        """
+        Read a cached blob.
+
+        Args:
+            sha: Git blob SHA
+
+        Returns:
+            Blob content, or None if it is not cached
+        """
+        if not sha:
+            return None
+        path = self._blob_path(sha)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path, None)  # mark as recently used
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, sha: str, data: bytes):
+        """
+        Store a blob (no-op if already cached or larger than the whole budget).
+
+        Args:
+            sha: Git blob SHA of data
+            data: Blob content
+        """
+        if not sha or len(data) > self.max_bytes:
+            return
+        path = self._blob_path(sha)
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(prefix='.', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used blobs until the cache is back under 90% of its budget"""
+        target = int(self.max_bytes * 0.9)
+        for path, _, size in sorted(self._iter_blobs(), key=lambda blob: blob[1]):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+
+class ParseCache:
+    """
+    In-memory LRU of parse results keyed by content identity (e.g., ('yarn', blob_sha)).
+
+    Identical manifests and lockfiles across a run are parsed once. Entries are counted,
+    not sized, so callers should cache compact results (e.g., the monitored entries of a
+    lockfile) rather than whole parsed documents. Cached values are shared between
+    callers and must be treated as read-only. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_PARSE_CACHE_ENTRIES):
+        """
+        Create an empty cache.
+
+        Args:
+            max_entries: Number of parse results to keep
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a parse result.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if absent
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a parse result, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Parse result (not copied)
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
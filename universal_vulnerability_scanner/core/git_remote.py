@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Git Remote Resolver
+Resolves the repository root and origin URL of local checkouts without forking git
+Lookups are cached per directory and per repository root with a bounded LRU
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Section header of the origin remote in a git config file: [remote "origin"]
+_ORIGIN_SECTION_RE = re.compile(r'^\[\s*remote\s+"origin"\s*\]$')
+# Any other section header
+_SECTION_RE = re.compile(r'^\[.*\]$')
+# url = <value> inside a section
+_URL_RE = re.compile(r'^url\s*=\s*(?P<url>.*)$', re.IGNORECASE)
+
+# Upper bound for cached directories and repository roots
+GIT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=GIT_CACHE_SIZE)
+def find_git_root(path: str) -> Optional[str]:
+    """
+    Find the closest directory at or above `path` that contains a `.git` entry.
+
+    The filesystem root itself is never treated as a repository root.
+
+    Args:
+        path: Absolute file or directory path
+
+    Returns:
+        Repository root directory, or None if the path is not inside a checkout
+
+    Examples:
+        >>> find_git_root("/home/user/repo/packages/app/package.json")
+        "/home/user/repo"
+    """
+    current = path
+    while current:
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        if os.path.exists(os.path.join(current, '.git')):
+            return current
+        current = parent
+    return None
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    """Read and strip the first line of a small git metadata file"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def _resolve_git_dirs(repo_root: str) -> Optional[Tuple[str, str]]:
+    """
+    Locate the git directory and common directory of a checkout.
+
+    Handles `.git` directories as well as `.git` files (worktrees and submodules)
+    that point elsewhere with `gitdir:`; worktrees keep HEAD in their own git
+    directory and share config and refs through the common directory.
+
+    Args:
+        repo_root: Repository root directory
+
+    Returns:
+        Tuple of (git_dir, common_dir) or None if the `.git` entry is unusable
+    """
+    git_path = os.path.join(repo_root, '.git')
+    if not os.path.isfile(git_path):
+        return git_path, git_path
+
+    first_line = _read_first_line(git_path)
+    if not first_line or not first_line.startswith('gitdir:'):
+        return None
+    git_dir = first_line[len('gitdir:'):].strip()
+    if not os.path.isabs(git_dir):
+        git_dir = os.path.normpath(os.path.join(repo_root, git_dir))
+
+    common_dir = git_dir
+    if os.path.isfile(os.path.join(git_dir, 'commondir')):
+        common = _read_first_line(os.path.join(git_dir, 'commondir'))
+        if common:
+            common_dir = common if os.path.isabs(common) else os.path.normpath(os.path.join(git_dir, common))
+
+    return git_dir, common_dir
+
+
+def _resolve_git_config_path(repo_root: str) -> Optional[str]:
+    """
+    Locate the config file of a checkout.
+
+    Args:
+        repo_root: Repository root directory
+
+    Returns:
+        Path to the git config file or None if it cannot be found
+    """
+    dirs = _resolve_git_dirs(repo_root)
+    if not dirs:
+        return None
+    config_path = os.path.join(dirs[1], 'config')
+    return config_path if os.path.isfile(config_path) else None
+
+
+def read_head_commit(repo_root: str) -> Optional[str]:
+    """
+    Read the commit SHA checked out in a repository without forking git.
+
+    Follows a symbolic HEAD through loose refs and packed-refs. Not cached,
+    since HEAD moves whenever a checkout is pulled or re-cloned.
+
+    Args:
+        repo_root: Repository root directory (as returned by find_git_root)
+
+    Returns:
+        Full commit SHA, or None if HEAD cannot be resolved (e.g., empty repository)
+    """
+    dirs = _resolve_git_dirs(repo_root)
+    if not dirs:
+        return None
+    git_dir, common_dir = dirs
+
+    head = _read_first_line(os.path.join(git_dir, 'HEAD'))
+    if not head:
+        return None
+    if not head.startswith('ref:'):
+        return head or None
+
+    ref = head[len('ref:'):].strip()
+    for base in (git_dir, common_dir):
+        sha = _read_first_line(os.path.join(base, ref))
+        if sha:
+            return sha
+
+    try:
+        with open(os.path.join(common_dir, 'packed-refs'), 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                parts = line.strip().split(' ', 1)
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+
+    return None
+
+
+def normalize_remote_url(url: str) -> str:
+    """
+    Convert a GitHub SSH remote to its HTTPS form.
+
+    Args:
+        url: Remote URL as configured (e.g., "git@github.com:org/repo.git")
+
+    Returns:
+        HTTPS URL for GitHub SSH remotes, otherwise the URL unchanged
+
+    Examples:
+        >>> normalize_remote_url("git@github.com:org/repo.git")
+        "https://github.com/org/repo"
+        >>> normalize_remote_url("https://github.com/org/repo.git")
+        "https://github.com/org/repo.git"
+    """
+    if url.startswith('git@github.com:'):
+        url = url.replace('git@github.com:', 'https://github.com/')
+        if url.endswith('.git'):
+            url = url[:-4]
+    return url
+
+
+@lru_cache(maxsize=GIT_CACHE_SIZE)
+def read_origin_url(repo_root: str) -> Optional[str]:
+    """
+    Read the `origin` remote URL straight from a checkout's git config.
+
+    Args:
+        repo_root: Repository root directory (as returned by find_git_root)
+
+    Returns:
+        Origin URL exactly as configured, or None if there is no origin remote
+    """
+    config_path = _resolve_git_config_path(repo_root)
+    if not config_path:
+        return None
+
+    try:
+        with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
+            in_origin = False
+            for line in f:
+                line = line.strip()
+                if not line or line[0] in '#;':
+                    continue
+                if _SECTION_RE.match(line):
+                    in_origin = bool(_ORIGIN_SECTION_RE.match(line))
+                    continue
+                if in_origin:
+                    m = _URL_RE.match(line)
+                    if m:
+                        return m.group('url').strip().strip('"') or None
+    except OSError:
+        return None
+
+    return None
+
+
+def resolve_origin_url(path: str) -> Optional[str]:
+    """
+    Resolve the normalized origin URL of the checkout containing `path`.
+
+    Args:
+        path: Absolute file or directory path
+
+    Returns:
+        Normalized origin URL, or None if the path is not in a checkout with an origin
+    """
+    repo_root = find_git_root(path)
+    if not repo_root:
+        return None
+    url = read_origin_url(repo_root)
+    return normalize_remote_url(url) if url else None
+
+
+def clear_git_caches():
+    """Forget cached repository roots and origin URLs (e.g., after cloning or deleting checkouts)"""
+    find_git_root.cache_clear()
+    read_origin_url.cache_clear()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Lockfile Parser
+Single-pass lockfile parsers shared by the NPM scanner and the compromise detectors
+Builds a name -> versions index once so lookups against a vulnerability database are O(1)
+Large package-lock.json files are read incrementally instead of being loaded whole
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Resolved version line of a yarn.lock entry (two-space indent, entry level only):
+#   v1 (classic):  `  version "1.2.3"`
+#   v2+ (berry):   `  version: 1.2.3`
+YARN_VERSION_RE = re.compile(r'^  version:?\s+"?(?P<ver>[^"\s]+)"?\s*$')
+
+
+def yarn_descriptor_name(descriptor: str) -> Optional[str]:
+    """
+    Extract the package name from a yarn.lock entry descriptor.
+
+    Args:
+        descriptor: Descriptor from an entry header (e.g., "lodash@^4.17.21")
+
+    Returns:
+        Package name or None if the descriptor has no version part
+
+    Examples:
+        >>> yarn_descriptor_name("lodash@^4.17.21")
+        "lodash"
+        >>> yarn_descriptor_name('"@scope/pkg@npm:^1.0.0"')
+        "@scope/pkg"
+        >>> yarn_descriptor_name("__metadata")
+        None
+    """
+    descriptor = descriptor.strip().strip('"')
+    # Skip the leading "@" of scoped packages when looking for the version separator
+    at = descriptor.find('@', 1)
+    if at <= 0:
+        return None
+    return descriptor[:at]
+
+
+def parse_yarn_lock_lines(lines: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Parse yarn.lock content (v1 classic or v2+ berry) in a single streaming pass.
+
+    Every resolved version of a package is kept, so a lockfile that resolves
+    lodash to both 4.17.20 and 4.17.21 yields {"lodash": ["4.17.20", "4.17.21"]}.
+
+    Args:
+        lines: Iterable of lockfile lines (an open file object works)
+
+    Returns:
+        Dictionary of {package_name: [resolved_version, ...]} in lockfile order
+    """
+    index: Dict[str, List[str]] = {}
+    current_names: List[str] = []
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line or line[0] == '#':
+            continue
+
+        # Entry header: unindented, ends with ':' and lists one or more descriptors
+        if line[0] not in ' \t':
+            if line.endswith(':'):
+                current_names = []
+                for descriptor in line[:-1].split(','):
+                    name = yarn_descriptor_name(descriptor)
+                    if name and name not in current_names:
+                        current_names.append(name)
+            else:
+                current_names = []
+            continue
+
+        if not current_names:
+            continue
+
+        m = YARN_VERSION_RE.match(line)
+        if m:
+            version = m.group('ver')
+            for name in current_names:
+                versions = index.setdefault(name, [])
+                if version not in versions:
+                    versions.append(version)
+            current_names = []
+
+    return index
+
+
+def parse_yarn_lock(source: Union[str, Path]) -> Dict[str, List[str]]:
+    """
+    Parse a yarn.lock file into a name -> versions index.
+
+    The file is streamed line by line, so memory use does not grow with lockfile size.
+
+    Args:
+        source: Path to yarn.lock
+
+    Returns:
+        Dictionary of {package_name: [resolved_version, ...]}
+    """
+    with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+        return parse_yarn_lock_lines(f)
+
+
+# package-lock.json files above this size are streamed instead of loaded with json.load
+LOCKFILE_STREAM_THRESHOLD = 16 * 1024 * 1024
+# Characters read per chunk by the streaming package-lock reader
+LOCKFILE_CHUNK_SIZE = 1024 * 1024
+
+# One package-lock entry: (path, name, version); v1 nested dependencies get npm-style
+# node_modules paths (e.g., "node_modules/a/node_modules/b")
+PackageLockEntry = Tuple[str, Optional[str], Optional[str]]
+
+_JSON_WHITESPACE = ' \t\r\n'
+# Characters that change nesting while skipping a value
+_JSON_STRUCTURE_RE = re.compile(r'["{}\[\]]')
+# Remainder of a string after its opening quote
+_JSON_STRING_TAIL_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+def _package_lock_name(path: str, entry: Dict[str, Any]) -> Optional[str]:
+    """Name of a "packages" entry: its declared name, else the last node_modules segment of its path"""
+    name = entry.get('name')
+    if name:
+        return name
+    if 'node_modules/' not in path:
+        return None
+    return path.rsplit('node_modules/', 1)[-1] or None
+
+
+class _JSONStream:
+    """
+    Minimal pull reader over a JSON text stream.
+
+    Keeps only a window of the input in memory: values are decoded one at a time with
+    json.JSONDecoder.raw_decode, and values nobody asked for are skipped without being built.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = LOCKFILE_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _more(self) -> bool:
+        """Append the next chunk to the window, dropping what was consumed"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)"""
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in _JSON_WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._more():
+                return ''
+
+    def expect(self, char: str):
+        """Consume one structural character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in package-lock.json, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def next_member(self, first: bool) -> bool:
+        """Advance to the next object member; False once the closing brace is consumed"""
+        char = self.peek()
+        if char == '}':
+            self.pos += 1
+            return False
+        if not first:
+            self.expect(',')
+        return True
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number (or literal) touching the end of the window may continue in the next chunk
+            if end >= len(self.buf) and not self.eof and self._more():
+                continue
+            self.pos = end
+            return value
+
+    def read_key(self) -> str:
+        """Read an object member name and its colon"""
+        key = self.read_value()
+        if not isinstance(key, str):
+            raise ValueError('Expected an object key in package-lock.json')
+        self.expect(':')
+        return key
+
+    def skip_value(self):
+        """Skip the next value without building it"""
+        if self.peek() not in '{[':
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            m = _JSON_STRUCTURE_RE.search(self.buf, self.pos)
+            if not m:
+                self.pos = len(self.buf)
+                if not self._more():
+                    raise ValueError('Unexpected end of package-lock.json')
+                continue
+            char = m.group()
+            if char == '"':
+                tail = _JSON_STRING_TAIL_RE.match(self.buf, m.end())
+                if not tail:
+                    # String continues in the next chunk: resume from its opening quote
+                    self.pos = m.start()
+                    if not self._more():
+                        raise ValueError('Unterminated string in package-lock.json')
+                    continue
+                self.pos = tail.end()
+                continue
+            self.pos = m.end()
+            depth += 1 if char in '{[' else -1
+            if depth == 0:
+                return
+
+
+def _stream_packages(stream: _JSONStream) -> Iterator[PackageLockEntry]:
+    """Yield the entries of a streamed "packages" map (lockfile v2/v3)"""
+    stream.expect('{')
+    first = True
+    while stream.next_member(first):
+        first = False
+        path = stream.read_key()
+        entry = stream.read_value()
+        if isinstance(entry, dict):
+            yield path, _package_lock_name(path, entry), entry.get('version')
+
+
+def _stream_dependencies(stream: _JSONStream, prefix: str) -> Iterator[PackageLockEntry]:
+    """Yield the entries of a streamed v1 "dependencies" tree, one entry object at a time"""
+    stream.expect('{')
+    first = True
+    while stream.next_member(first):
+        first = False
+        name = stream.read_key()
+        if stream.peek() != '{':
+            stream.skip_value()
+            continue
+
+        path = f"{prefix}{name}"
+        version = None
+        seen_version = False
+        emitted = False
+        stream.expect('{')
+        first_field = True
+        while stream.next_member(first_field):
+            first_field = False
+            field = stream.read_key()
+            if field == 'version':
+                version = stream.read_value()
+                seen_version = True
+            elif field == 'dependencies' and stream.peek() == '{':
+                # npm writes "version" first, so the parent precedes its nested dependencies
+                if seen_version and not emitted:
+                    yield path, name, version
+                    emitted = True
+                yield from _stream_dependencies(stream, f"{path}/node_modules/")
+            else:
+                stream.skip_value()
+        if not emitted:
+            yield path, name, version
+
+
+def _walk_dependencies(deps: Dict[str, Any], prefix: str) -> Iterator[PackageLockEntry]:
+    """Yield the entries of a loaded v1 "dependencies" tree in the same order as _stream_dependencies"""
+    for name, entry in deps.items():
+        if not isinstance(entry, dict):
+            continue
+        path = f"{prefix}{name}"
+        seen_version = False
+        emitted = False
+        for field, value in entry.items():
+            if field == 'version':
+                seen_version = True
+            elif field == 'dependencies' and isinstance(value, dict):
+                if seen_version and not emitted:
+                    yield path, name, entry['version']
+                    emitted = True
+                yield from _walk_dependencies(value, f"{path}/node_modules/")
+        if not emitted:
+            yield path, name, entry.get('version')
+
+
+def iter_package_lock_data(data: Dict[str, Any], section: str = 'packages') -> Iterator[PackageLockEntry]:
+    """
+    Walk one section of an already loaded package-lock.json.
+
+    Args:
+        data: Parsed lockfile
+        section: "packages" (lockfile v2/v3) or "dependencies" (lockfile v1 tree)
+
+    Returns:
+        Iterator of (path, name, version) tuples, in the order iter_package_lock_entries yields them
+    """
+    entries = data.get(section) if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        return
+    if section == 'packages':
+        for path, entry in entries.items():
+            if isinstance(entry, dict):
+                yield path, _package_lock_name(path, entry), entry.get('version')
+    else:
+        yield from _walk_dependencies(entries, 'node_modules/')
+
+
+def iter_package_lock_entries(source: Union[str, Path, IO[str]], section: str = 'packages',
+                              chunk_size: int = LOCKFILE_CHUNK_SIZE) -> Iterator[PackageLockEntry]:
+    """
+    Stream one section of a package-lock.json with bounded memory.
+
+    Only one package entry is decoded at a time and every other top-level value is
+    skipped without being built, so memory use does not grow with lockfile size.
+    Reading stops as soon as the requested section has been walked.
+
+    Args:
+        source: Path to package-lock.json, or an open text stream
+        section: "packages" (lockfile v2/v3) or "dependencies" (lockfile v1 tree)
+        chunk_size: Characters read per chunk
+
+    Returns:
+        Iterator of (path, name, version) tuples
+
+    Examples:
+        >>> for path, name, version in iter_package_lock_entries("package-lock.json"):
+        ...     print(path, name, version)
+        node_modules/lodash lodash 4.17.21
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_package_lock_entries(f, section, chunk_size)
+        return
+
+    stream = _JSONStream(source, chunk_size)
+    stream.expect('{')
+    first = True
+    while stream.next_member(first):
+        first = False
+        key = stream.read_key()
+        if key != section or stream.peek() != '{':
+            stream.skip_value()
+            continue
+        if section == 'packages':
+            yield from _stream_packages(stream)
+        else:
+            yield from _stream_dependencies(stream, 'node_modules/')
+        return
+
+
+def iter_package_lock(source: Union[str, Path], section: str = 'packages',
+                      stream_threshold: int = LOCKFILE_STREAM_THRESHOLD) -> Iterator[PackageLockEntry]:
+    """
+    Walk one section of a package-lock.json, streaming it when the file is large.
+
+    Args:
+        source: Path to package-lock.json
+        section: "packages" (lockfile v2/v3) or "dependencies" (lockfile v1 tree)
+        stream_threshold: Files larger than this many bytes are streamed
+
+    Returns:
+        Iterator of (path, name, version) tuples
+    """
+    if os.path.getsize(source) > stream_threshold:
+        return iter_package_lock_entries(source, section)
+    with open(source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return iter_package_lock_data(data, section)
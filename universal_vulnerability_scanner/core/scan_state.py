@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Scan State Store
+Persistent SQLite record of previously scanned repositories and package files
+Lets incremental runs skip unchanged manifests/lockfiles and replay their cached results
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+# Bump when the layout of stored deltas changes so old state is discarded
+SCAN_STATE_VERSION = 2
+
+# Pending writes are committed in batches of this size (and on close)
+COMMIT_EVERY = 100
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Compute the content hash used to detect changed package files.
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Union[str, os.PathLike]) -> Optional[str]:
+    """
+    Compute the content hash of a file, streaming it in chunks.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex SHA-256 digest, or None if the file cannot be read
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def compute_fingerprint(database_source: Union[str, bytes], options: Dict[str, Any]) -> str:
+    """
+    Fingerprint the inputs that decide what a scan produces.
+
+    Args:
+        database_source: Path to the compromised package database, or its serialized content
+        options: Scanner options that change findings (e.g., import-all, additional tags)
+
+    Returns:
+        Hex digest combining the database content, the options and SCAN_STATE_VERSION
+    """
+    if isinstance(database_source, bytes):
+        database_hash = hash_bytes(database_source)
+    else:
+        database_hash = hash_file(database_source) or ''
+
+    payload = json.dumps({
+        'version': SCAN_STATE_VERSION,
+        'database': database_hash,
+        'options': options
+    }, sort_keys=True)
+    return hash_bytes(payload.encode('utf-8'))
+
+
+class ScanStateStore:
+    """
+    SQLite-backed cache of per-file scan results.
+
+    Files are keyed by (repo_key, asset_path). A stored entry is only returned when
+    its content hash (or, for files discovered through the GitHub trees API, its git
+    blob SHA) matches, and the whole store is cleared when the fingerprint (database
+    hash + scanner options) differs from the one it was written with.
+
+    Safe to share between the main thread and fetch workers: all access is serialized.
+    """
+
+    def __init__(self, db_path: str, fingerprint: str):
+        """
+        Open (or create) the state database.
+
+        Args:
+            db_path: SQLite file location (e.g., result/scan_state.db)
+            fingerprint: Value from compute_fingerprint for the current run
+        """
+        self.db_path = db_path
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = False
+        self._pending_writes = 0
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS repos (
+                repo_key TEXT PRIMARY KEY,
+                commit_sha TEXT,
+                tree_oid TEXT,
+                scanned_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                repo_key TEXT NOT NULL,
+                asset_path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                blob_sha TEXT,
+                delta TEXT NOT NULL,
+                scanned_at TEXT,
+                PRIMARY KEY (repo_key, asset_path)
+            );
+        """)
+        # State files written before blob SHAs were tracked lack the column
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(files)')}
+        if 'blob_sha' not in columns:
+            self.conn.execute('ALTER TABLE files ADD COLUMN blob_sha TEXT')
+        self._check_fingerprint()
+
+    def _check_fingerprint(self):
+        """Drop all cached state if it was produced with a different database or options"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row and row[0] == self.fingerprint:
+            return
+
+        self.invalidated = row is not None
+        self.conn.execute('DELETE FROM files')
+        self.conn.execute('DELETE FROM repos')
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+            (self.fingerprint,)
+        )
+        self.conn.commit()
+
+    def get_file(self, repo_key: str, asset_path: str, content_hash: str) -> Optional[Dict]:
+        """
+        Look up the cached scan result of an unchanged file.
+
+        Args:
+            repo_key: Repository identifier (URL, or a local marker)
+            asset_path: File path as reported on the Phoenix asset
+            content_hash: Hash of the file's current content
+
+        Returns:
+            Stored delta, or None if the file is new or its content changed
+        """
+        return self._lookup(repo_key, asset_path, 'content_hash', content_hash)
+
+    def get_file_by_blob(self, repo_key: str, asset_path: str, blob_sha: str) -> Optional[Dict]:
+        """
+        Look up the cached scan result of a remote file by its git blob SHA.
+
+        Lets light scans skip downloading files whose blob has not changed.
+
+        Args:
+            repo_key: Repository identifier
+            asset_path: File path within the repository
+            blob_sha: Git blob SHA reported by the trees API
+
+        Returns:
+            Stored delta, or None if the blob was not scanned before
+        """
+        if not blob_sha:
+            return None
+        return self._lookup(repo_key, asset_path, 'blob_sha', blob_sha)
+
+    def has_blob(self, repo_key: str, asset_path: str, blob_sha: str) -> bool:
+        """
+        Check (without counting a hit or miss) whether a blob's results are cached.
+
+        Args:
+            repo_key: Repository identifier
+            asset_path: File path within the repository
+            blob_sha: Git blob SHA
+
+        Returns:
+            True if get_file_by_blob would return a delta
+        """
+        if not blob_sha:
+            return False
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM files WHERE repo_key = ? AND asset_path = ? AND blob_sha = ?',
+                (repo_key, asset_path, blob_sha)
+            ).fetchone()
+        return row is not None
+
+    def _lookup(self, repo_key: str, asset_path: str, column: str, value: str) -> Optional[Dict]:
+        """Fetch a file's delta if the given identity column matches"""
+        with self._lock:
+            row = self.conn.execute(
+                f'SELECT {column}, delta FROM files WHERE repo_key = ? AND asset_path = ?',
+                (repo_key, asset_path)
+            ).fetchone()
+            if not row or row[0] != value:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put_file(self, repo_key: str, asset_path: str, content_hash: str, delta: Dict,
+                 blob_sha: Optional[str] = None):
+        """
+        Store the scan result of a file.
+
+        Args:
+            repo_key: Repository identifier
+            asset_path: File path as reported on the Phoenix asset
+            content_hash: Hash of the scanned content
+            delta: JSON-serializable record of everything the scan produced
+            blob_sha: Git blob SHA of the file, when it came from the trees API
+        """
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO files (repo_key, asset_path, content_hash, blob_sha, delta, scanned_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (repo_key, asset_path, content_hash, blob_sha, json.dumps(delta), datetime.now().isoformat())
+            )
+            self._note_write()
+
+    def get_repo(self, repo_key: str) -> Optional[Dict]:
+        """
+        Look up what was recorded for a repository on the previous run.
+
+        Args:
+            repo_key: Repository identifier
+
+        Returns:
+            Dictionary with commit_sha, tree_oid and scanned_at, or None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT commit_sha, tree_oid, scanned_at FROM repos WHERE repo_key = ?',
+                (repo_key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'commit_sha': row[0], 'tree_oid': row[1], 'scanned_at': row[2]}
+
+    def set_repo(self, repo_key: str, commit_sha: Optional[str] = None, tree_oid: Optional[str] = None):
+        """
+        Record the revision a repository was scanned at.
+
+        Only the columns given are updated, so recording the commit of a local checkout
+        keeps the tree OID stored by an earlier complete scan.
+
+        Args:
+            repo_key: Repository identifier
+            commit_sha: Commit checked out / scanned (None leaves the stored one)
+            tree_oid: Root tree object id of that commit (None leaves the stored one)
+        """
+        columns = {'scanned_at': datetime.now().isoformat()}
+        if commit_sha is not None:
+            columns['commit_sha'] = commit_sha
+        if tree_oid is not None:
+            columns['tree_oid'] = tree_oid
+        assignments = ', '.join(f'{column} = ?' for column in columns)
+        with self._lock:
+            self.conn.execute('INSERT OR IGNORE INTO repos (repo_key) VALUES (?)', (repo_key,))
+            self.conn.execute(
+                f'UPDATE repos SET {assignments} WHERE repo_key = ?',
+                (*columns.values(), repo_key)
+            )
+            self._note_write()
+
+    def get_repo_files(self, repo_key: str) -> Dict[str, Dict]:
+        """
+        Fetch the stored results of every file of a repository.
+
+        Used to replay a repository whose tree is known to be unchanged without
+        listing or downloading any of its files.
+
+        Args:
+            repo_key: Repository identifier
+
+        Returns:
+            Mapping of asset path to stored delta
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT asset_path, delta FROM files WHERE repo_key = ? ORDER BY asset_path',
+                (repo_key,)
+            ).fetchall()
+            self.hits += len(rows)
+        return {asset_path: json.loads(delta) for asset_path, delta in rows}
+
+    def retain_repo_files(self, repo_key: str, asset_paths):
+        """
+        Forget files of a repository that were not part of its latest scan (e.g., deleted manifests).
+
+        Args:
+            repo_key: Repository identifier
+            asset_paths: Asset paths scanned in the latest complete scan of the repository
+        """
+        keep = set(asset_paths)
+        with self._lock:
+            stored = [row[0] for row in self.conn.execute(
+                'SELECT asset_path FROM files WHERE repo_key = ?', (repo_key,)
+            )]
+            for asset_path in stored:
+                if asset_path not in keep:
+                    self.conn.execute(
+                        'DELETE FROM files WHERE repo_key = ? AND asset_path = ?',
+                        (repo_key, asset_path)
+                    )
+                    self._note_write()
+
+    def _note_write(self):
+        """Commit in batches to keep per-file overhead low"""
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_EVERY:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """Commit pending writes and close the database"""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
@@ -6,7 +6,8 @@ Handles NPM version ranges, pre-releases, and build metadata per semver.org spec
 """
 
 import re
-from typing import Optional, Tuple, List
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, List
 
 # Semver regex pattern (from semver.org specification)
 SEMVER_RE = re.compile(
@@ -15,10 +16,18 @@ SEMVER_RE = re.compile(
     r"(?:\+(?P<build>[0-9A-Za-z.-]+))?$"
 )
 
+# Leading non-digit characters of a specifier (^, ~, >=, v, ...)
+VERSION_PREFIX_RE = re.compile(r"^[^\d]*")
 
+# Distinct version strings remembered per memoized function; a fleet scan sees
+# ~20k distinct specifiers, so the caches stay warm without growing unbounded
+VERSION_CACHE_SIZE = 32768
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
 def parse_semver(v: str) -> Optional[Tuple[int, int, int, str]]:
     """
-    Parse semantic version string into components.
+    Parse semantic version string into components (memoized, see version_cache_stats).
     
     Args:
         v: Version string (e.g., "1.2.3", "1.2.3-beta.1", "1.2.3+build123")
@@ -45,6 +54,31 @@ def parse_semver(v: str) -> Optional[Tuple[int, int, int, str]]:
     return (maj, mi, pa, pre)
 
 
+def semver_key(v: str) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Build a comparable key that orders versions exactly like semver_lt.
+    
+    Pre-releases sort below the stable release of the same core version, and
+    pre-release identifiers are not compared with each other (as in semver_lt).
+    
+    Args:
+        v: Version string
+        
+    Returns:
+        Tuple of (major, minor, patch, 0 for pre-release / 1 for stable) or None if invalid
+        
+    Examples:
+        >>> semver_key("1.2.3") < semver_key("1.2.4")
+        True
+        >>> semver_key("2.0.0-rc.1")
+        (2, 0, 0, 0)
+    """
+    parsed = parse_semver(v)
+    if not parsed:
+        return None
+    return (parsed[0], parsed[1], parsed[2], 0 if parsed[3] else 1)
+
+
 def semver_lt(a: str, b: str) -> bool:
     """
     Compare if version a < version b (less than).
@@ -135,9 +169,10 @@ def is_in_range(v: str, lo: str, hi: str) -> bool:
     return semver_gte(v, lo) and semver_lt(v, hi)
 
 
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
 def normalize_version(v: str) -> Optional[str]:
     """
-    Convert NPM-style version specifiers to concrete semver.
+    Convert NPM-style version specifiers to concrete semver (memoized, see version_cache_stats).
     
     Handles:
     - Exact versions: "1.2.3"
@@ -175,6 +210,65 @@ def normalize_version(v: str) -> Optional[str]:
     return v if parse_semver(v) else None
 
 
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def strip_version_prefix(v: str) -> str:
+    """
+    Loosely clean a version specifier for exact-version matching.
+    
+    Unlike normalize_version this never rejects: leading operators are dropped and
+    only the first alternative of a range is kept, as the NPM compromise detectors do.
+    
+    Args:
+        v: Version specifier string
+        
+    Returns:
+        Cleaned version string (may be empty)
+        
+    Examples:
+        >>> strip_version_prefix("^4.17.21")
+        "4.17.21"
+        >>> strip_version_prefix(">=1.0.0 || 2.0.0")
+        "1.0.0"
+    """
+    cleaned = VERSION_PREFIX_RE.sub("", v)
+    # Handle version ranges like "1.0.0 - 2.0.0"
+    if " - " in cleaned:
+        cleaned = cleaned.split(" - ")[0]
+    # Handle || operators
+    if " || " in cleaned:
+        cleaned = cleaned.split(" || ")[0]
+    return cleaned.strip()
+
+
+def version_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Report the effectiveness of the memoized version functions.
+    
+    Returns:
+        Dictionary of {function_name: {hits, misses, size, maxsize}}
+        
+    Examples:
+        >>> version_cache_stats()["normalize_version"]["hits"]
+        0
+    """
+    stats = {}
+    for func in (parse_semver, normalize_version, strip_version_prefix):
+        info = func.cache_info()
+        stats[func.__name__] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize
+        }
+    return stats
+
+
+def clear_version_caches():
+    """Empty the memoized version functions and reset their counters"""
+    for func in (parse_semver, normalize_version, strip_version_prefix):
+        func.cache_clear()
+
+
 def calculate_safe_version(vulnerable_versions: List[str]) -> str:
     """
     Calculate a safe version (one version before the first compromised).
@@ -230,6 +324,7 @@ if __name__ == "__main__":
     assert semver_lt("1.0.0", "1.0.1") == True
     assert semver_lt("2.0.0", "1.9.9") == False
     assert semver_gte("1.0.1", "1.0.0") == True
+    assert semver_key("1.0.0-beta") < semver_key("1.0.0")
     
     # Test range
     assert is_in_range("19.1.0", "19.0.0", "19.1.2") == True
@@ -239,6 +334,14 @@ if __name__ == "__main__":
     assert normalize_version("^1.2.3") == "1.2.3"
     assert normalize_version("~2.0.0") == "2.0.0"
     assert normalize_version(">=1.0.0") is None
+    assert strip_version_prefix("^4.17.21") == "4.17.21"
+    assert strip_version_prefix("1.0.0 - 2.0.0") == "1.0.0"
+    
+    # Test memoization
+    clear_version_caches()
+    normalize_version("^1.2.3")
+    normalize_version("^1.2.3")
+    assert version_cache_stats()["normalize_version"]["hits"] == 1
     
     print("✅ All tests passed!")
 
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+GitHub Rate Limit Scheduler
+Paces GitHub API requests from the X-RateLimit-* and Retry-After response headers
+Tracks the remaining budget per token and per resource (core, search, code_search, graphql)
+and spreads requests across several tokens, sleeping until reset when all are exhausted
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+# Fraction of a token's budget below which requests are spread evenly until the reset
+PACING_RESERVE = 0.2
+# Wait when a secondary rate limit (403/429) arrives without Retry-After or reset headers
+SECONDARY_LIMIT_WAIT = 60.0
+# Exponential backoff base and ceiling for transient (non rate limit) failures
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+# Longest single wait for a rate limit reset before the request is given up on (seconds)
+DEFAULT_MAX_WAIT = 900.0
+
+
+def github_resource_for_url(url: str) -> Optional[str]:
+    """
+    Guess which GitHub rate limit resource a request is charged against.
+
+    Args:
+        url: Request URL
+
+    Returns:
+        Resource name as reported in X-RateLimit-Resource, or None for hosts
+        without header-based limits (e.g., raw.githubusercontent.com)
+
+    Examples:
+        >>> github_resource_for_url("https://api.github.com/search/code")
+        "code_search"
+        >>> github_resource_for_url("https://api.github.com/repos/org/repo/git/trees/HEAD")
+        "core"
+    """
+    parsed = urlparse(url)
+    if parsed.hostname != 'api.github.com':
+        return None
+    if parsed.path.startswith('/search/code'):
+        return 'code_search'
+    if parsed.path.startswith('/search/'):
+        return 'search'
+    if parsed.path.startswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+class RateLimitWaitExceeded(Exception):
+    """Raised by GitHubRateLimitScheduler.acquire when the next request slot is further away than max_wait"""
+
+    def __init__(self, resource: str, wait: float):
+        super().__init__(f"GitHub '{resource}' rate limit frees up in {wait:.0f}s")
+        self.resource = resource
+        self.wait = wait
+
+
+def _header_number(response: requests.Response, name: str) -> Optional[float]:
+    """Read a numeric response header"""
+    value = response.headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class _Budget:
+    """Known rate limit state of one (token, resource) pair"""
+
+    __slots__ = ('limit', 'remaining', 'reset', 'next_slot', 'blocked_until')
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset = 0.0
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+
+
+class GitHubRateLimitScheduler:
+    """
+    Shared scheduler deciding which token a GitHub request uses and when it may be sent.
+
+    Budgets start unknown and are learned from the X-RateLimit-Limit/Remaining/Reset
+    headers of each response. Requests are reserved against the local estimate so
+    concurrent workers do not overspend, are spread evenly once a budget drops below
+    PACING_RESERVE, and wait precisely until the reset when every token is exhausted.
+    Revalidated responses (304) are not charged by GitHub and are not counted here.
+    Thread-safe; waiting happens outside the lock.
+    """
+
+    def __init__(self, tokens: Sequence[Optional[str]] = (), max_wait: float = DEFAULT_MAX_WAIT):
+        """
+        Create a scheduler.
+
+        Args:
+            tokens: GitHub tokens to spread authenticated requests across
+            max_wait: Longest single wait for a reset; beyond it the request is not sent or retried
+        """
+        self.tokens: List[str] = [token for token in dict.fromkeys(tokens) if token]
+        self.max_wait = max_wait
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seen = 0.0
+        self._budgets: Dict[Tuple[Optional[str], str], _Budget] = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, token: Optional[str], resource: str) -> _Budget:
+        """Get (creating) the budget of a token/resource pair; caller holds the lock"""
+        key = (token, resource)
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget()
+        return budget
+
+    @staticmethod
+    def _refresh(budget: _Budget, now: float):
+        """Restore a budget whose reset time has passed; caller holds the lock"""
+        if budget.remaining is not None and budget.reset and now >= budget.reset:
+            budget.remaining = budget.limit
+            budget.reset = 0.0
+
+    def _ready_at(self, budget: _Budget, now: float) -> float:
+        """Earliest time a request may be sent on a budget; caller holds the lock"""
+        self._refresh(budget, now)
+        ready = max(now, budget.next_slot, budget.blocked_until)
+        if budget.remaining is not None and budget.remaining <= 0:
+            ready = max(ready, budget.reset or now)
+        return ready
+
+    def acquire(self, resource: str, authenticated: bool = True) -> Optional[str]:
+        """
+        Wait for a request slot and pick the token to send it with.
+
+        Args:
+            resource: Rate limit resource (see github_resource_for_url)
+            authenticated: False for deliberately unauthenticated requests
+
+        Returns:
+            Token to authenticate with, or None for an unauthenticated request
+
+        Raises:
+            RateLimitWaitExceeded: Every token is blocked for longer than max_wait; nothing is
+                reserved and no time is spent waiting
+        """
+        candidates: List[Optional[str]] = list(self.tokens) if authenticated and self.tokens else [None]
+
+        with self._lock:
+            now = time.time()
+            # Prefer the token that can send soonest, then the one with the most budget left
+            def rank(token):
+                budget = self._budget(token, resource)
+                ready = self._ready_at(budget, now)
+                remaining = budget.remaining if budget.remaining is not None else float('inf')
+                return ready, -remaining
+
+            token = min(candidates, key=rank)
+            budget = self._budget(token, resource)
+            ready = self._ready_at(budget, now)
+            if ready - now > self.max_wait:
+                raise RateLimitWaitExceeded(resource, ready - now)
+
+            # An exhausted budget is not reserved against: the request waits for the
+            # reset and the next response's headers report the fresh budget
+            if budget.remaining is not None and budget.remaining > 0:
+                budget.remaining -= 1
+                # Spread the tail of the budget evenly over the time left until the reset
+                if budget.limit and budget.reset and budget.remaining < budget.limit * PACING_RESERVE:
+                    interval = max(0.0, budget.reset - ready) / max(1, budget.remaining)
+                    budget.next_slot = ready + interval
+
+            wait = ready - now
+            self.requests += 1
+            if wait > 0:
+                self.wait_seconds += wait
+                self.max_wait_seen = max(self.max_wait_seen, wait)
+
+        if wait > 0:
+            time.sleep(wait)
+        return token
+
+    def update(self, token: Optional[str], resource: str, response: requests.Response):
+        """
+        Learn the budget of a token from a response's rate limit headers.
+
+        Args:
+            token: Token the request was sent with
+            resource: Resource the request was acquired for
+            response: Response (or revalidated cached response) received
+        """
+        if getattr(response, 'from_cache', False) or response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+                budget = self._budget(token, resource)
+                # GitHub does not charge a 304; give back the reserved request
+                if budget.remaining is not None and budget.limit is not None:
+                    budget.remaining = min(budget.limit, budget.remaining + 1)
+            return
+
+        remaining = _header_number(response, 'X-RateLimit-Remaining')
+        limit = _header_number(response, 'X-RateLimit-Limit')
+        reset = _header_number(response, 'X-RateLimit-Reset')
+        resource = response.headers.get('X-RateLimit-Resource') or resource
+
+        with self._lock:
+            budget = self._budget(token, resource)
+            if remaining is not None:
+                budget.remaining = int(remaining)
+            if limit is not None:
+                budget.limit = int(limit)
+            if reset is not None:
+                budget.reset = reset
+            if self.is_rate_limited(response):
+                self.rate_limited += 1
+                retry_after = _header_number(response, 'Retry-After')
+                if retry_after is not None:
+                    budget.blocked_until = max(budget.blocked_until, time.time() + retry_after)
+                elif remaining is None or remaining > 0:
+                    # Secondary rate limit without guidance from the server
+                    budget.blocked_until = max(budget.blocked_until, time.time() + SECONDARY_LIMIT_WAIT)
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        """
+        Check whether a response is a primary or secondary rate limit rejection.
+
+        Args:
+            response: Response received
+
+        Returns:
+            True for 429, and for 403 with an exhausted budget, Retry-After or a rate limit message
+        """
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        if response.headers.get('Retry-After') is not None or response.headers.get('X-RateLimit-Remaining') == '0':
+            return True
+        try:
+            return 'rate limit' in response.text.lower()
+        except Exception:
+            return False
+
+    def retry_delay(self, token: Optional[str], resource: Optional[str], response: Optional[requests.Response],
+                    attempt: int) -> Optional[float]:
+        """
+        Decide how long to wait before retrying a failed request.
+
+        Args:
+            token: Token the request was sent with
+            resource: Rate limit resource, or None for hosts without header-based limits
+            response: Failed response, or None after a connection error or timeout
+            attempt: Zero-based number of the attempt that failed
+
+        Returns:
+            Seconds to wait, or None if the wait would exceed max_wait. When other tokens still
+            have budget the wait is 0, since the retry will be sent with one of them.
+        """
+        if response is not None and self.is_rate_limited(response):
+            now = time.time()
+            with self._lock:
+                candidates = list(self.tokens) if token and self.tokens else [token]
+                budgets = [self._budget(candidate, resource or 'core') for candidate in candidates]
+                wait = min(self._ready_at(budget, now) for budget in budgets) - now
+            retry_after = _header_number(response, 'Retry-After')
+            if retry_after is not None and len(candidates) == 1:
+                wait = max(wait, retry_after)
+            wait = max(0.0, wait)
+            return wait if wait <= self.max_wait else None
+
+        # Transient failure: exponential backoff with jitter
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def note_wait(self, seconds: float):
+        """
+        Record time spent waiting outside acquire (e.g., retry backoff).
+
+        Args:
+            seconds: Time waited
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.wait_seconds += seconds
+            self.max_wait_seen = max(self.max_wait_seen, seconds)
+
+    def summary(self) -> Dict:
+        """
+        Summarize scheduling for the run report.
+
+        Returns:
+            Dictionary with request, 304, rate limit and queue wait statistics
+        """
+        with self._lock:
+            return {
+                'tokens': len(self.tokens),
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'rate_limited': self.rate_limited,
+                'wait_seconds': self.wait_seconds,
+                'max_wait_seconds': self.max_wait_seen
+            }
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Session
+Pooled keep-alive requests.Session with retry/backoff for GitHub and Phoenix API calls,
+a token bucket for pacing concurrent requests, and an ETag/Last-Modified revalidation cache
+One session per process so connections (and TLS handshakes) are reused across requests
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+from ..core.blob_cache import BlobCache, git_blob_sha
+
+# Number of per-host connection pools kept alive (api.github.com, raw.githubusercontent.com, Phoenix, ...)
+DEFAULT_POOL_CONNECTIONS = 10
+# Connections kept per host; sized for the parallel repository fetch workers
+DEFAULT_POOL_MAXSIZE = 32
+# Retries for idempotent requests on connection errors and 5xx responses
+DEFAULT_MAX_RETRIES = 3
+# Exponential backoff: 0.5s, 1s, 2s, ... (Retry-After is honored when present)
+DEFAULT_BACKOFF_FACTOR = 0.5
+# 429 is left to the callers: urllib3 would sleep for any Retry-After, however long
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+# POST is deliberately excluded: an import that reached the server must not be sent twice
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+# Default on-disk budget for cached response bodies when no shared BlobCache is given
+DEFAULT_HTTP_CACHE_BYTES = 256 * 1024 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for pacing outgoing requests.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each request
+    takes one. Callers that find the bucket empty wait until their token is due.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Create a bucket.
+
+        Args:
+            rate: Sustained requests per second (<= 0 disables limiting)
+            capacity: Burst size, defaults to one second worth of tokens (at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, going into debt if necessary.
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _build_retry(max_retries: int, backoff_factor: float) -> Retry:
+    """
+    Build the urllib3 retry policy.
+
+    Args:
+        max_retries: Total retries per request
+        backoff_factor: Exponential backoff factor between attempts
+
+    Returns:
+        Configured Retry instance
+    """
+    kwargs = dict(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    try:
+        return Retry(allowed_methods=RETRY_METHODS, **kwargs)
+    except TypeError:
+        # urllib3 < 1.26 names the option method_whitelist
+        return Retry(method_whitelist=RETRY_METHODS, **kwargs)
+
+
+def create_http_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                        max_retries: int = DEFAULT_MAX_RETRIES,
+                        backoff_factor: float = DEFAULT_BACKOFF_FACTOR) -> requests.Session:
+    """
+    Create a new pooled session with retry/backoff.
+
+    Args:
+        pool_connections: Number of per-host pools to keep
+        pool_maxsize: Maximum connections kept alive per host
+        max_retries: Retries for idempotent requests
+        backoff_factor: Exponential backoff factor between retries
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=_build_retry(max_retries, backoff_factor),
+        pool_block=False
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide shared session, creating it on first use.
+
+    Returns:
+        Shared requests.Session (safe to use from the fetch worker threads)
+
+    Examples:
+        >>> session = get_http_session()
+        >>> response = session.get("https://api.github.com/rate_limit", timeout=10)
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_http_session()
+    return _session
+
+
+def close_http_session():
+    """Close the shared session and its pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+class ConditionalRequestCache:
+    """
+    Persistent store of validators (ETag / Last-Modified) of GET responses.
+
+    Used by conditional_get to revalidate instead of re-downloading: a 304 Not Modified
+    answer is turned back into the cached 200 response. GitHub does not count 304s
+    against the rate limit. The SQLite database only holds validators, headers and the
+    git blob SHA of each body; bodies live in a size-bounded BlobCache (shared with the
+    downloaded file cache when one is given, so raw file contents are stored once) and
+    are read only when the server answers 304.
+
+    Entries are keyed by URL, query parameters, Accept header and the GitHub account
+    behind the credentials, so a rotated token keeps revalidating the same entries while
+    different accounts never share private responses. Thread-safe.
+    """
+
+    def __init__(self, db_path: str, blob_cache: Optional[BlobCache] = None,
+                 max_bytes: int = DEFAULT_HTTP_CACHE_BYTES,
+                 account_resolver: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: SQLite file location (e.g., result/http_cache.db)
+            blob_cache: Store for response bodies; defaults to a private BlobCache next to db_path
+            max_bytes: Size budget of the private body store (ignored when blob_cache is given)
+            account_resolver: Maps an Authorization header to a stable account identity
+                (e.g., the GitHub user id); credentials it cannot resolve are keyed by their hash
+        """
+        self.db_path = db_path
+        self.revalidated = 0
+        self.stored = 0
+        self.account_resolver = account_resolver
+        self._accounts: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if blob_cache is None:
+            blob_cache = BlobCache(os.path.splitext(db_path)[0] + '_bodies', max_bytes)
+        self.blob_cache = blob_cache
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # Databases from before bodies moved to the blob store kept them inline
+        self.conn.execute('DROP TABLE IF EXISTS responses')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                cache_key TEXT PRIMARY KEY,
+                url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                body_sha TEXT,
+                stored_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def account_for(self, credentials: str) -> str:
+        """
+        Identify the account behind an Authorization header.
+
+        Args:
+            credentials: Authorization header value
+
+        Returns:
+            Account identity from the resolver (resolved once per run), else a hash of the credentials
+        """
+        if not credentials:
+            return ''
+        with self._lock:
+            account = self._accounts.get(credentials)
+        if account is not None:
+            return account
+
+        account = None
+        if self.account_resolver is not None:
+            try:
+                account = self.account_resolver(credentials)
+            except Exception:
+                account = None
+        if account:
+            account = f'account:{account}'
+        else:
+            account = 'credentials:' + hashlib.sha256(credentials.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._accounts[credentials] = account
+        return account
+
+    def make_key(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> str:
+        """
+        Build the cache key of a GET request.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            headers: Request headers (Accept and the account behind Authorization are part of the key)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        headers = headers or {}
+        identity = {
+            'url': url,
+            'params': sorted((str(k), str(v)) for k, v in (params or {}).items()),
+            'accept': headers.get('Accept', ''),
+            'account': self.account_for(headers.get('Authorization', ''))
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def lookup(self, cache_key: str) -> Optional[Dict]:
+        """
+        Fetch the validators of a cached entry (the body is not read).
+
+        Args:
+            cache_key: Key from make_key
+
+        Returns:
+            Dictionary with etag, last_modified, headers and body_sha, or None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, headers, body_sha FROM validators WHERE cache_key = ?',
+                (cache_key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'headers': json.loads(row[2] or '{}'),
+            'body_sha': row[3]
+        }
+
+    def load_body(self, cache_key: str, entry: Dict) -> Optional[bytes]:
+        """
+        Read the body of a revalidated entry.
+
+        Args:
+            cache_key: Key from make_key
+            entry: Entry from lookup
+
+        Returns:
+            Cached body, or None if it was evicted from the blob store (the entry is dropped)
+        """
+        body = self.blob_cache.get(entry['body_sha'])
+        if body is None:
+            with self._lock:
+                self.conn.execute('DELETE FROM validators WHERE cache_key = ?', (cache_key,))
+                self.conn.commit()
+        return body
+
+    def store(self, cache_key: str, response: requests.Response):
+        """
+        Remember a 200 response that carries a validator.
+
+        Args:
+            cache_key: Key from make_key
+            response: Successful response
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        body = response.content
+        body_sha = git_blob_sha(body)
+        self.blob_cache.put(body_sha, body)
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO validators (cache_key, url, etag, last_modified, headers, body_sha, stored_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (cache_key, response.url, etag, last_modified, json.dumps(dict(response.headers)),
+                 body_sha, time.time())
+            )
+            self.conn.commit()
+            self.stored += 1
+
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+def _rebuild_cached_response(not_modified: requests.Response, entry: Dict, body: bytes) -> requests.Response:
+    """Turn a 304 answer into the cached 200 response, keeping the fresh rate-limit headers"""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.url = not_modified.url
+    response.request = not_modified.request
+    response.elapsed = not_modified.elapsed
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    for name, value in not_modified.headers.items():
+        if name.lower().startswith('x-ratelimit') or name.lower() in ('date', 'etag', 'last-modified'):
+            response.headers[name] = value
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response.from_cache = True
+    return response
+
+
+def conditional_get(session: requests.Session, cache: Optional[ConditionalRequestCache], url: str,
+                    params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                    **kwargs) -> requests.Response:
+    """
+    GET with If-None-Match / If-Modified-Since revalidation against a ConditionalRequestCache.
+
+    Args:
+        session: Session to send the request with
+        cache: Response cache (None sends a plain GET)
+        url: Request URL
+        params: Query parameters
+        headers: Request headers
+        **kwargs: Passed to session.get (e.g., timeout)
+
+    Returns:
+        The live response, or the cached one (status 200, `from_cache=True`) on 304
+
+    Examples:
+        >>> cache = ConditionalRequestCache("result/http_cache.db")
+        >>> response = conditional_get(get_http_session(), cache, "https://api.github.com/user/repos", timeout=30)
+    """
+    if cache is None:
+        return session.get(url, params=params, headers=headers, **kwargs)
+
+    cache_key = cache.make_key(url, params, headers)
+    entry = cache.lookup(cache_key)
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry['etag']:
+            request_headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            request_headers['If-Modified-Since'] = entry['last_modified']
+
+    response = session.get(url, params=params, headers=request_headers, **kwargs)
+
+    if response.status_code == 304 and entry:
+        body = cache.load_body(cache_key, entry)
+        if body is not None:
+            with cache._lock:
+                cache.revalidated += 1
+            return _rebuild_cached_response(response, entry, body)
+        # The body was evicted since it was validated: fetch it again unconditionally
+        response = session.get(url, params=params, headers=headers, **kwargs)
+    if response.status_code == 200:
+        cache.store(cache_key, response)
+    return response
@@ -14,6 +14,7 @@ import requests
 from requests.auth import HTTPBasicAuth
 
 from ..models.finding import Finding
+from .http_session import get_http_session
 
 
 class PhoenixConfig:
@@ -105,6 +106,7 @@ class PhoenixUploader:
         self.config = config
         self.debug_mode = debug_mode
         self.access_token = None
+        self.session = get_http_session()
         
         if debug_mode:
             os.makedirs("debug", exist_ok=True)
@@ -118,7 +120,7 @@ class PhoenixUploader:
         url = f"{self.config.api_base_url}/v1/auth/access_token"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 auth=HTTPBasicAuth(self.config.client_id, self.config.client_secret),
                 timeout=30
@@ -226,7 +228,7 @@ class PhoenixUploader:
         
         try:
             print(f"🚀 Uploading {len(findings)} findings to Phoenix...")
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers=headers,
                 json=payload,
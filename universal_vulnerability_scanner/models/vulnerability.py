@@ -4,11 +4,14 @@ Vulnerability Database Models
 Defines vulnerability data structures and database management
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 import json
 from pathlib import Path
 
+from ..core.version_parser import parse_semver, semver_key
+
 
 @dataclass
 class VulnerableRange:
@@ -21,6 +24,90 @@ class VulnerableRange:
         return f"[{self.min_version}, {self.max_version})"
 
 
+class VersionMatcher:
+    """
+    Pre-parsed form of a vulnerability's exact versions and ranges.
+    
+    Exact versions are keyed by their parsed semver tuple. Ranges are sorted by
+    lower bound with a running maximum of upper bounds, so a lookup is one parse,
+    one dict probe and a binary search over the ranges starting at or below the
+    version. Matches are reported in the original list order, like a linear scan.
+    """
+    
+    __slots__ = ('exact', 'lower_bounds', 'ranges', 'max_upper')
+    
+    def __init__(self, exact_versions: List[str], ranges: List[VulnerableRange]):
+        """
+        Compile exact versions and ranges.
+        
+        Args:
+            exact_versions: Known vulnerable versions
+            ranges: Vulnerable ranges [min_version, max_version)
+        """
+        self.exact: Dict[Tuple[int, int, int, str], str] = {}
+        for vuln_ver in exact_versions:
+            parsed = parse_semver(vuln_ver)
+            if parsed is not None:
+                self.exact.setdefault(parsed, vuln_ver)
+        
+        compiled = []
+        for position, vuln_range in enumerate(ranges):
+            upper = semver_key(vuln_range.max_version)
+            if upper is None:
+                # An unparseable upper bound never matches (see is_in_range)
+                continue
+            # An unparseable lower bound does not limit the range; () sorts below every key
+            lower = semver_key(vuln_range.min_version) or ()
+            compiled.append((lower, position, upper, vuln_range))
+        compiled.sort(key=lambda entry: entry[:2])
+        
+        self.lower_bounds = [entry[0] for entry in compiled]
+        self.ranges = [(position, upper, vuln_range) for _, position, upper, vuln_range in compiled]
+        self.max_upper = []
+        for _, _, upper, _ in compiled:
+            self.max_upper.append(max(upper, self.max_upper[-1]) if self.max_upper else upper)
+    
+    def match_exact(self, version: str) -> Optional[str]:
+        """
+        Find the listed vulnerable version equal to a version.
+        
+        Args:
+            version: Version string to check
+            
+        Returns:
+            The vulnerable version as listed, or None
+        """
+        parsed = parse_semver(version)
+        if parsed is None:
+            return None
+        return self.exact.get(parsed)
+    
+    def match_range(self, version: str) -> Optional[VulnerableRange]:
+        """
+        Find the first listed range containing a version.
+        
+        Args:
+            version: Version string to check
+            
+        Returns:
+            Matching range, or None
+        """
+        key = semver_key(version)
+        if key is None:
+            return None
+        
+        best = None
+        # Walk down from the last range starting at or below the version until no
+        # earlier range can reach past it
+        for index in range(bisect_right(self.lower_bounds, key) - 1, -1, -1):
+            if self.max_upper[index] <= key:
+                break
+            position, upper, vuln_range = self.ranges[index]
+            if key < upper and (best is None or position < best[0]):
+                best = (position, vuln_range)
+        return best[1] if best else None
+
+
 @dataclass
 class Vulnerability:
     """
@@ -43,6 +130,20 @@ class Vulnerability:
     cve_ids: List[str] = field(default_factory=list)
     description: str = ""
     references: List[str] = field(default_factory=list)
+    _matcher: Optional[VersionMatcher] = field(default=None, init=False, repr=False, compare=False)
+    
+    def compile(self) -> VersionMatcher:
+        """
+        Pre-parse exact versions and ranges for fast lookups.
+        
+        Called once when the database is loaded (and lazily otherwise); call it again
+        after modifying exact_vulnerable_versions or vulnerable_ranges.
+        
+        Returns:
+            The compiled VersionMatcher
+        """
+        self._matcher = VersionMatcher(self.exact_vulnerable_versions, self.vulnerable_ranges)
+        return self._matcher
     
     def is_vulnerable(self, version: str) -> Tuple[bool, str]:
         """
@@ -54,18 +155,18 @@ class Vulnerability:
         Returns:
             Tuple of (is_vulnerable: bool, reason: str)
         """
-        from ..core.version_parser import is_in_range, semver_eq
+        matcher = self._matcher or self.compile()
         
         # Check exact matches first
-        for vuln_ver in self.exact_vulnerable_versions:
-            if semver_eq(version, vuln_ver):
-                return True, f"Exact match with known vulnerable version {vuln_ver}"
+        vuln_ver = matcher.match_exact(version)
+        if vuln_ver is not None:
+            return True, f"Exact match with known vulnerable version {vuln_ver}"
         
         # Check ranges
-        for vuln_range in self.vulnerable_ranges:
-            if is_in_range(version, vuln_range.min_version, vuln_range.max_version):
-                reason = f"Version {version} is in vulnerable range {vuln_range}"
-                return True, reason
+        vuln_range = matcher.match_range(version)
+        if vuln_range is not None:
+            reason = f"Version {version} is in vulnerable range {vuln_range}"
+            return True, reason
         
         return False, f"Version {version} not in known vulnerable versions"
     
@@ -135,6 +236,8 @@ class VulnerabilityDatabase:
                     description=vuln_data.get('description', ''),
                     references=vuln_data.get('references', [])
                 )
+                # Parse every version once so lookups do not re-parse them
+                vuln.compile()
                 
                 self.vulnerabilities[ecosystem][pkg_name] = vuln
     
@@ -11,6 +11,7 @@ import re
 from pathlib import Path
 from typing import Dict, List
 from .base_scanner import BaseScanner
+from ..core.lockfile_parser import LOCKFILE_STREAM_THRESHOLD, iter_package_lock_data, iter_package_lock_entries, parse_yarn_lock
 from ..models.finding import Finding
 
 
@@ -86,10 +87,11 @@ class NPMScanner(BaseScanner):
                 yl = dp / "yarn.lock"
                 try:
                     resolved = self._parse_yarn_lock(yl)
-                    for pkg, version in resolved.items():
-                        finding = self.check_vulnerability(pkg, version, str(yl), "yarn.lock")
-                        if finding:
-                            findings.append(finding)
+                    for pkg, versions in resolved.items():
+                        for version in versions:
+                            finding = self.check_vulnerability(pkg, version, str(yl), "yarn.lock")
+                            if finding:
+                                findings.append(finding)
                 except Exception as e:
                     from ..models.finding import Finding, Verdict, Severity
                     findings.append(Finding(
@@ -141,79 +143,33 @@ class NPMScanner(BaseScanner):
         """
         Parse package-lock.json (npm lockfile v1/v2/v3).
         
-        Extracts resolved versions from lockfile.
+        Extracts resolved versions from lockfile. Lockfiles larger than
+        LOCKFILE_STREAM_THRESHOLD are streamed instead of loaded whole.
         """
-        data = json.loads(file_path.read_text(encoding="utf-8"))
         out = {}
         
-        # npm v2/v3: "packages" object
-        pkgs = data.get("packages")
-        if isinstance(pkgs, dict):
-            for p, meta in pkgs.items():
-                if not isinstance(meta, dict):
-                    continue
-                
-                name = meta.get("name")
-                version = meta.get("version")
-                
-                # Handle scoped packages (@scope/name)
-                if not name and p.startswith("node_modules/"):
-                    path_parts = p.replace("node_modules/", "").split("/")
-                    if path_parts[0].startswith("@") and len(path_parts) >= 2:
-                        name = "/".join(path_parts[:2])
-                    elif path_parts:
-                        name = path_parts[0]
-                
+        if file_path.stat().st_size > LOCKFILE_STREAM_THRESHOLD:
+            # npm v2/v3 "packages" object, then the npm v1 "dependencies" tree
+            sections = [iter_package_lock_entries(file_path, section) for section in ("packages", "dependencies")]
+        else:
+            data = json.loads(file_path.read_text(encoding="utf-8"))
+            sections = [iter_package_lock_data(data, section) for section in ("packages", "dependencies")]
+        
+        for entries in sections:
+            for _, name, version in entries:
                 if name and isinstance(version, str):
                     out[name] = version
         
-        # npm v1: "dependencies" tree
-        deps = data.get("dependencies")
-        if isinstance(deps, dict):
-            def walk(d: dict):
-                for name, meta in d.items():
-                    if not isinstance(meta, dict):
-                        continue
-                    version = meta.get("version")
-                    if isinstance(version, str):
-                        out[name] = version
-                    child = meta.get("dependencies")
-                    if isinstance(child, dict):
-                        walk(child)
-            walk(deps)
-        
         return out
     
-    def _parse_yarn_lock(self, file_path: Path) -> Dict[str, str]:
-        """Parse yarn.lock file (best-effort, no YAML dependency)."""
-        YARN_ENTRY_RE = re.compile(r'^(?P<key>.+):\s*$')
-        YARN_VERSION_RE = re.compile(r'^\s*version\s+"(?P<ver>[^"]+)"\s*$')
-        
-        out = {}
-        current_keys = []
-        
-        for line in file_path.read_text(encoding="utf-8", errors="ignore").splitlines():
-            m1 = YARN_ENTRY_RE.match(line)
-            if m1:
-                current_keys = [k.strip().strip('"') for k in m1.group("key").split(",")]
-                continue
-            
-            m2 = YARN_VERSION_RE.match(line)
-            if m2 and current_keys:
-                ver = m2.group("ver")
-                for key in current_keys:
-                    # key examples: "next@^15.0.0" or "@scope/pkg@^1.0.0"
-                    if key.startswith("@"):
-                        # Scoped package: split on last @
-                        parts = key.rsplit("@", 1)
-                        pkg = parts[0]
-                    else:
-                        pkg = key.split("@", 1)[0]
-                    
-                    out[pkg] = ver
-                current_keys = []
+    def _parse_yarn_lock(self, file_path: Path) -> Dict[str, List[str]]:
+        """
+        Parse yarn.lock file (v1 and berry, no YAML dependency).
         
-        return out
+        Returns every resolved version per package, since one yarn.lock
+        can resolve the same package to several versions.
+        """
+        return parse_yarn_lock(file_path)
     
     def _parse_pnpm_lock(self, file_path: Path) -> Dict[str, str]:
         """Parse pnpm-lock.yaml (best-effort, no YAML dependency)."""